@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Command-line batch testing for ATL GUI, without the GUI.
+
+    atl_batch.py run <folder or APKs>...      test a new batch
+    atl_batch.py run --resume [JOURNAL]       continue an interrupted batch
+    atl_batch.py run --changed-only <folder>  only test APKs whose inputs changed
+    atl_batch.py flakes                       list APKs with inconsistent verdicts
+    atl_batch.py export [JOURNAL] -f junit    export a batch (csv, jsonl, junit, html, text)
+    atl_batch.py diff [OLD] [NEW]             what changed between two batches
+"""
+import sys
+import os
+import json
+import argparse
+
+# Add the project directory to the Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.insert(0, current_dir)
+
+from src.utils.batch_runner import DEFAULT_TIMEOUT, load_gui_config, find_apk_files, run_batch
+from src.utils.run_journal import RunJournal, load_run, find_resumable_run, list_runs
+from src.utils.result_cache import ResultCache
+from src.utils.test_scheduler import POLICIES, DEFAULT_POLICY, load_history, order_apks
+from src.utils.atl_registry import get_atl_registry
+from src.utils.retry_policy import RetryPolicy
+from src.utils.exporters import EXPORTERS, export, format_for_path, journal_rows
+from src.utils.run_diff import diff_runs, previous_run, format_diff
+from src.utils.log_setup import setup_logging, LEVEL_NAMES, LOG_LEVEL_ENV
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(
+        description="ATL GUI batch tester - test APKs headlessly with checkpointing"
+    )
+    parser.add_argument(
+        "--log-level",
+        choices=LEVEL_NAMES,
+        help=f"Diagnostic messages to print (default: ${LOG_LEVEL_ENV} or warning)"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Test a folder of APKs")
+    run_parser.add_argument(
+        "paths",
+        nargs="*",
+        help="APK files or folders containing APKs"
+    )
+    run_parser.add_argument(
+        "--atl",
+        help="ATL executable (default: the path configured in the GUI)"
+    )
+    run_parser.add_argument(
+        "--timeout", "-t",
+        type=float,
+        default=DEFAULT_TIMEOUT,
+        help=f"Seconds each app is left running before it is judged (default: {DEFAULT_TIMEOUT})"
+    )
+    run_parser.add_argument(
+        "--resume",
+        nargs="?",
+        const="latest",
+        metavar="JOURNAL",
+        help="Resume an interrupted batch (default: the most recent one)"
+    )
+    run_parser.add_argument(
+        "--changed-only",
+        action="store_true",
+        help="Reuse the last verdict of APKs whose file, ATL build, options and environment are unchanged"
+    )
+    run_parser.add_argument(
+        "--order",
+        choices=sorted(POLICIES),
+        default=DEFAULT_POLICY,
+        help=f"Test order of a new batch, based on earlier runs (default: {DEFAULT_POLICY})"
+    )
+    run_parser.add_argument(
+        "--workers", "-j",
+        type=int,
+        default=1,
+        help="Number of APKs tested at the same time (default: 1)"
+    )
+    run_parser.add_argument(
+        "--attempts",
+        type=int,
+        help="Attempts for apps detected as not working, decided by majority (default: from the GUI settings)"
+    )
+    run_parser.add_argument(
+        "--backoff",
+        type=float,
+        help="Seconds before the first retry, doubled after each one (default: from the GUI settings)"
+    )
+    run_parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Neither read nor update the result cache"
+    )
+
+    flakes_parser = subparsers.add_parser("flakes", help="List APKs whose verdict changed between attempts")
+    flakes_parser.add_argument(
+        "--runs",
+        type=int,
+        default=20,
+        help="Number of recent batches to look at (default: 20)"
+    )
+
+    export_parser = subparsers.add_parser("export", help="Export the results of a batch")
+    export_parser.add_argument(
+        "journal",
+        nargs="?",
+        help="Run journal to export (default: the most recent batch)"
+    )
+    export_parser.add_argument(
+        "--format", "-f",
+        choices=sorted(EXPORTERS),
+        help="Output format (default: from the output file extension, else text)"
+    )
+    export_parser.add_argument(
+        "--output", "-o",
+        help="Output file (default: print to console)"
+    )
+
+    diff_parser = subparsers.add_parser("diff", help="Compare two batches")
+    diff_parser.add_argument(
+        "journals",
+        nargs="*",
+        metavar="JOURNAL",
+        help="Old and new run journals (default: the two most recent finished batches)"
+    )
+    diff_parser.add_argument(
+        "--by-name",
+        action="store_true",
+        default=None,
+        help="Match APKs by file name instead of full path (default: only if the runs tested different folders)"
+    )
+    diff_parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print the diff as JSON"
+    )
+
+    return parser.parse_args()
+
+def print_progress(index, total, apk_path, outcome):
+    """Print one line per tested APK"""
+    if outcome.get("cached"):
+        note = " (cached)"
+    elif outcome.get("flaky"):
+        note = f" (flaky: {', '.join(outcome['attempts'])})"
+    else:
+        note = ""
+    print(f"[{index + 1}/{total}] {outcome['result']:<12} {outcome['duration']:>7.1f}s  {os.path.basename(apk_path)}{note}")
+
+def run_command(args):
+    """Run a new batch or resume an interrupted one"""
+    config = load_gui_config()
+    history = None
+
+    if args.resume:
+        state = find_resumable_run() if args.resume == "latest" else load_run(args.resume)
+        if not state:
+            print("No interrupted batch to resume")
+            return 1
+        if state["finished"] or not state["pending"]:
+            print(f"Batch {state['run_id']} is already complete")
+            return 1
+
+        metadata = state["metadata"]
+        atl_executable = args.atl or metadata.get("atl_executable_path") or config.get("atl_executable_path") or "android-translation-layer"
+        launch_options = metadata.get("launch_options", {})
+        env_vars = metadata.get("environment_variables", config.get("environment_variables", {}))
+        apk_files = state["pending"]
+        journal = RunJournal.reopen(state["path"])
+        print(f"Resuming batch {state['run_id']}: {len(state['results'])} done, {len(apk_files)} to test")
+    else:
+        apk_files = find_apk_files(args.paths)
+        if not apk_files:
+            print("No APK files given")
+            return 1
+        atl_executable = args.atl or config.get("atl_executable_path") or "android-translation-layer"
+        # Durations measured with this ATL build are preferred
+        history = load_history(atl_fingerprint=get_atl_registry().fingerprint(atl_executable))
+        apk_files = order_apks(apk_files, args.order, history)
+        launch_options = {}
+        env_vars = config.get("environment_variables", {})
+        journal = None
+
+    retry_policy = RetryPolicy.from_config(config)
+    if args.attempts is not None:
+        retry_policy.max_attempts = max(1, args.attempts)
+    if args.backoff is not None:
+        retry_policy.backoff = max(0.0, args.backoff)
+
+    cache = None if args.no_cache else ResultCache()
+    try:
+        results = run_batch(apk_files, atl_executable, launch_options, env_vars,
+                            timeout=args.timeout, journal=journal, progress=print_progress,
+                            cache=cache, changed_only=args.changed_only,
+                            workers=args.workers, history=history,
+                            retry_policy=retry_policy)
+    except KeyboardInterrupt:
+        print("\nInterrupted - continue with: atl_batch.py run --resume")
+        return 130
+
+    working = sum(1 for outcome in results.values() if outcome["result"] == "working")
+    reused = sum(1 for outcome in results.values() if outcome.get("cached"))
+    flaky = sum(1 for outcome in results.values() if outcome.get("flaky"))
+    print(f"\nWorking: {working}, Not working: {len(results) - working}, Reused: {reused}, Flaky: {flaky}")
+    return 0
+
+def flakes_command(args):
+    """Print the flake rate of every APK that was flaky at least once"""
+    history = load_history(max_runs=args.runs)
+    flaky = sorted(
+        ((entry.flake_rate, entry.flaky_runs, entry.runs, apk_path)
+         for apk_path, entry in history.items() if entry.flaky_runs),
+        reverse=True,
+    )
+    if not flaky:
+        print("No flaky APKs in the recent batches")
+        return 0
+    for rate, flaky_runs, runs, apk_path in flaky:
+        print(f"{rate:>6.0%}  {flaky_runs}/{runs} runs  {apk_path}")
+    return 0
+
+def export_command(args):
+    """Stream the results of a journal to a file or the console"""
+    journal = args.journal
+    if not journal:
+        runs = list_runs()
+        if not runs:
+            print("No batches recorded yet")
+            return 1
+        journal = runs[0]
+
+    format_name = args.format or (format_for_path(args.output) if args.output else "text")
+    title = f"ATL GUI results - {os.path.basename(journal)}"
+    if args.output:
+        with open(args.output, "w", newline="") as f:
+            count = export(lambda: journal_rows(journal), format_name, f, title)
+        print(f"Exported {count} results to {args.output}")
+    else:
+        export(lambda: journal_rows(journal), format_name, sys.stdout, title)
+    return 0
+
+def diff_command(args):
+    """Print what changed between two batches"""
+    journals = list(args.journals)
+    if len(journals) > 2:
+        print("Give at most two journals: OLD NEW")
+        return 1
+    if not journals:
+        runs = list_runs()
+        if not runs:
+            print("No batches recorded yet")
+            return 1
+        journals = [runs[0]]
+    if len(journals) == 1:
+        old_path = previous_run(journals[0])
+        if not old_path:
+            print(f"No finished batch before {journals[0]}")
+            return 1
+        journals.insert(0, old_path)
+
+    diff = diff_runs(journals[0], journals[1], by_name=args.by_name)
+    if args.json:
+        print(json.dumps(diff, indent=2))
+    else:
+        print("\n".join(format_diff(diff)))
+    return 0
+
+def main():
+    """Main function"""
+    args = parse_args()
+    setup_logging(args.log_level)
+    if args.command == "run":
+        return run_command(args)
+    if args.command == "flakes":
+        return flakes_command(args)
+    if args.command == "export":
+        return export_command(args)
+    if args.command == "diff":
+        return diff_command(args)
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
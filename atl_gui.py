@@ -6,119 +6,15 @@ This is the main entry point that starts the application
 import sys
 import os
 import argparse
-import tempfile
-import atexit
-import time
-
-# GLOBAL EXECUTION GUARD - Exit immediately if another instance is running with the same flags
-if "--force-main-window" in sys.argv and "--skip-setup" in sys.argv:
-    # Check if we're being launched via subprocess
-    if 'ATL_SINGLETON_PID' in os.environ:
-        # Make sure we're actually a duplicate process
-        parent_pid = os.environ.get('ATL_SINGLETON_PID')
-        # If our parent already exited, allow this process to continue
-        try:
-            # Try to check if parent process exists on Unix
-            if sys.platform != "win32" and parent_pid and int(parent_pid) > 0:
-                try:
-                    # Check if the process exists by sending signal 0 (no effect)
-                    os.kill(int(parent_pid), 0)
-                    # If we get here, the parent is still running - this is a duplicate
-                    print(f"[DEBUG] Detected duplicate app launch (parent PID {parent_pid} still running)")
-                    print("[DEBUG] Exiting immediately to prevent multiple windows")
-                    sys.exit(0)
-                except OSError:
-                    # Parent process no longer exists - allow this one to continue
-                    print(f"[DEBUG] Parent process {parent_pid} no longer exists, allowing this instance to run")
-            elif parent_pid:
-                # For Windows or other platforms, just print a message and continue
-                print(f"[DEBUG] Launched by process {parent_pid} but will continue since parent may have exited")
-        except Exception as e:
-            print(f"[DEBUG] Error checking parent process: {e}")
-            # Continue anyway in case of error
-    
-    # We're the first instance with these flags or our parent exited, set environment variable
-    os.environ['ATL_SINGLETON_PID'] = str(os.getpid())
-    print(f"[DEBUG] Set ATL_SINGLETON_PID={os.getpid()}")
 
 # Add the project directory to the Python path
 current_dir = os.path.dirname(os.path.abspath(__file__))
 if current_dir not in sys.path:
     sys.path.insert(0, current_dir)
 
-# Create a singleton lock file
-def create_singleton_lock():
-    """Create a lock file to prevent multiple instances"""
-    lock_file = os.path.join(tempfile.gettempdir(), "atl-gui.lock")
-    
-    # Check if the lock file exists
-    if os.path.exists(lock_file):
-        try:
-            # Read the PID from the lock file
-            with open(lock_file, 'r') as f:
-                pid_str = f.read().strip()
-                if pid_str and pid_str.isdigit():
-                    pid = int(pid_str)
-                    # Check if the process is still running
-                    try:
-                        if sys.platform != "win32":
-                            # Unix-like - send signal 0 to check process exists
-                            os.kill(pid, 0)
-                            # Process exists
-                            file_age = time.time() - os.path.getmtime(lock_file)
-                            if file_age < 30:  # Lock is recent (30 seconds)
-                                print(f"[DEBUG] Another instance is already running (PID: {pid}, lock file age: {file_age:.1f}s)")
-                                return False
-                            else:
-                                print(f"[DEBUG] Found stale lock file from PID {pid} ({file_age:.1f}s old)")
-                        else:
-                            # On Windows, we can't easily check if a process exists
-                            file_age = time.time() - os.path.getmtime(lock_file)
-                            if file_age < 30:  # Consider the lock valid if it's less than 30 seconds old
-                                print(f"[DEBUG] Found recent lock file (age: {file_age:.1f}s), assuming another instance is running")
-                                return False
-                    except OSError:
-                        # Process doesn't exist, we can remove the lock file
-                        print(f"[DEBUG] Process {pid} from lock file no longer exists")
-        except Exception as e:
-            print(f"[DEBUG] Error reading lock file: {e}")
-        
-        # If we got here, try to remove the lock file
-        try:
-            os.remove(lock_file)
-            print(f"[DEBUG] Removed stale lock file: {lock_file}")
-        except Exception as e:
-            print(f"[WARNING] Could not remove stale lock file: {e}")
-    
-    # Create the lock file
-    try:
-        with open(lock_file, 'w') as f:
-            f.write(str(os.getpid()))
-        
-        # Register cleanup to remove the lock file when we exit
-        def cleanup_lock():
-            try:
-                if os.path.exists(lock_file):
-                    # Make sure it's our lock file by checking the PID
-                    try:
-                        with open(lock_file, 'r') as f:
-                            pid_str = f.read().strip()
-                            if pid_str and pid_str.isdigit() and int(pid_str) == os.getpid():
-                                os.remove(lock_file)
-                                print(f"[DEBUG] Removed our lock file at exit: {lock_file}")
-                    except Exception:
-                        # If we can't read it, just try to remove it
-                        os.remove(lock_file)
-            except Exception as e:
-                print(f"[WARNING] Failed to remove lock file at exit: {e}")
-        
-        atexit.register(cleanup_lock)
-        
-        print(f"[DEBUG] Created lock file: {lock_file}")
-        return True
-    except Exception as e:
-        print(f"[ERROR] Failed to create lock file: {e}")
-        return False
+# Imported first: the startup timeline starts with this import
+from src.utils import startup_profiler
+from src.utils.log_setup import setup_logging, LEVEL_NAMES, LOG_LEVEL_ENV
 
 def parse_args():
     """Parse command-line arguments"""
@@ -185,12 +81,38 @@ def parse_args():
         help="Skip setup even if first run"
     )
     
+    parser.add_argument(
+        "--log-level",
+        choices=LEVEL_NAMES,
+        help=f"Diagnostic messages to print (default: ${LOG_LEVEL_ENV} or warning)"
+    )
+    
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Print how long each startup phase takes once the first frame is drawn, then exit"
+    )
+    
     parser.add_argument(
         "--allow-multiple-instances",
         action="store_true",
         help="Allow multiple instances of the application to run simultaneously"
     )
     
+    parser.add_argument(
+        "--watch",
+        action="append",
+        default=[],
+        metavar="FOLDER",
+        help="Test the APKs that land in FOLDER from now on (can be repeated)"
+    )
+    
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        help="APK files or folders to test; if ATL GUI is already running they are added to its queue"
+    )
+    
     return parser.parse_args()
 
 def run_debug_tool(args):
@@ -268,27 +190,35 @@ def configure_display_backend(args):
     
     return backend
 
-from src.app import main
-
 if __name__ == "__main__":
     args = parse_args()
     
-    # Check if we should enforce singleton behavior
-    if not args.allow_multiple_instances:
-        # Create lock file to prevent multiple instances
-        if not create_singleton_lock():
-            print("[ERROR] Failed to create singleton lock, but continuing anyway")
+    # Logging first, so everything after it honours --log-level
+    setup_logging(args.log_level)
+    
+    if args.profile_startup:
+        startup_profiler.enable()
+    
+    # A running ATL GUI takes the APKs over; this process then has nothing
+    # left to do and exits before GTK is even loaded
+    debugging = args.debug or args.debug_advanced or args.debug_interactive
+    if (args.paths or args.watch) and not (args.allow_multiple_instances or args.show_backend or debugging):
+        from src.utils.single_instance import forward_to_primary, WATCH_HINT
+        forwarded = forward_to_primary(args.watch, WATCH_HINT) if args.watch else True
+        if forwarded and (not args.paths or forward_to_primary(args.paths)):
+            sys.exit(0)
     
     # Configure display backend first
-    configure_display_backend(args)
+    with startup_profiler.phase("display backend"):
+        configure_display_backend(args)
     
     # Run the debug tool if requested
-    if args.debug or args.debug_advanced or args.debug_interactive:
+    if debugging:
         run_debug_tool(args)
         print("Debug mode completed. Exiting without starting application.")
         sys.exit(0)
     
-    # Start the main application 
+    # Start the main application
     if args.force_main_window or args.skip_setup:
         print("Starting with special flags:", end=" ")
         if args.force_main_window:
@@ -296,12 +226,7 @@ if __name__ == "__main__":
         if args.skip_setup:
             print("skip-setup", end=" ")
         print()
-        
-        # Import the app module and force main window
-        from src.app import AtlGUIApp
-        app = AtlGUIApp()
-        app.do_activate(force_main_window=True)
-        sys.exit(app.run(None))
-    else:
-        # Normal startup
-        sys.exit(main()) 
\ No newline at end of file
+    
+    with startup_profiler.phase("imports"):
+        from src.app import main
+    sys.exit(main(args.paths, args.allow_multiple_instances, args.watch))
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Benchmark the app status detector against a corpus of labeled ATL logs.
+
+The corpus directory holds one log file per run, sorted by the verdict a
+human gave it:
+
+    corpus/
+        working/       *.log
+        not_working/   *.log
+
+The script runs the log analyzer over every log and reports
+precision, recall and F1 (with "working" as the positive class) together
+with the scoring throughput in MB/s.
+"""
+import sys
+import os
+import time
+import argparse
+
+# Add the project directory to the Python path
+project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_dir not in sys.path:
+    sys.path.insert(0, project_dir)
+
+from src.utils.detection_scoring import DetectionScorer, DEFAULT_WEIGHTS_FILE
+from src.utils.log_analysis import LogRules, analyze_text, ERROR_CATEGORIES, IGNORED_LINE_MARKERS
+
+LABELS = {"working": True, "not_working": False}
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(
+        description="Measure detection accuracy and throughput on labeled ATL logs"
+    )
+
+    parser.add_argument(
+        "corpus",
+        help="Directory containing working/ and not_working/ log folders"
+    )
+
+    parser.add_argument(
+        "--weights", "-w",
+        default=DEFAULT_WEIGHTS_FILE,
+        help="Detection rule file (default: res/detection_weights.json)"
+    )
+
+    parser.add_argument(
+        "--repeat", "-r",
+        type=int,
+        default=3,
+        help="Number of timed passes over the corpus (default: 3)"
+    )
+
+    parser.add_argument(
+        "--sweep",
+        action="store_true",
+        help="Also report metrics for every threshold from 0 to 100 in steps of 5"
+    )
+
+    parser.add_argument(
+        "--show-misses",
+        action="store_true",
+        help="List the logs the detector got wrong"
+    )
+
+    return parser.parse_args()
+
+def load_corpus(corpus_dir):
+    """
+    Load all labeled logs.
+
+    Returns:
+        list: (path, text, size in bytes, expected working flag) tuples
+    """
+    samples = []
+    for label, expected in LABELS.items():
+        label_dir = os.path.join(corpus_dir, label)
+        if not os.path.isdir(label_dir):
+            continue
+        for name in sorted(os.listdir(label_dir)):
+            path = os.path.join(label_dir, name)
+            if not os.path.isfile(path):
+                continue
+            with open(path, "rb") as f:
+                data = f.read()
+            samples.append((path, data.decode("utf-8", errors="replace"), len(data), expected))
+    return samples
+
+def compute_metrics(expected, predicted):
+    """Confusion counts and precision/recall/F1 for the working class"""
+    tp = sum(1 for e, p in zip(expected, predicted) if e and p)
+    fp = sum(1 for e, p in zip(expected, predicted) if not e and p)
+    fn = sum(1 for e, p in zip(expected, predicted) if e and not p)
+    tn = sum(1 for e, p in zip(expected, predicted) if not e and not p)
+
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    accuracy = (tp + tn) / len(expected) if expected else 0.0
+
+    return {
+        "tp": tp, "fp": fp, "fn": fn, "tn": tn,
+        "precision": precision, "recall": recall, "f1": f1, "accuracy": accuracy,
+    }
+
+def main():
+    """Main function"""
+    args = parse_args()
+
+    scorer = DetectionScorer.from_file(args.weights)
+    # Same rule table as the GUI, so the timing includes error extraction
+    rules = LogRules(scorer, ERROR_CATEGORIES, IGNORED_LINE_MARKERS)
+    samples = load_corpus(args.corpus)
+    if not samples:
+        print(f"No labeled logs found in {args.corpus} (expected working/ and not_working/ folders)")
+        return 1
+
+    total_bytes = sum(size for _, _, size, _ in samples)
+
+    # Timed passes - only the scoring is measured, not the file reading
+    results = None
+    best_time = None
+    for _ in range(max(1, args.repeat)):
+        start = time.perf_counter()
+        results = [analyze_text(text, rules) for _, text, _, _ in samples]
+        elapsed = time.perf_counter() - start
+        best_time = elapsed if best_time is None else min(best_time, elapsed)
+
+    expected = [label for _, _, _, label in samples]
+    predicted = [result["working"] for result in results]
+    metrics = compute_metrics(expected, predicted)
+
+    megabytes = total_bytes / (1024 * 1024)
+    throughput = megabytes / best_time if best_time > 0 else float("inf")
+
+    print(f"Rules:      {args.weights}")
+    print(f"Corpus:     {len(samples)} logs ({sum(expected)} working, {len(expected) - sum(expected)} not working), {megabytes:.2f} MB")
+    print(f"Threshold:  {scorer.threshold}")
+    print()
+    print(f"Precision:  {metrics['precision']:.3f}")
+    print(f"Recall:     {metrics['recall']:.3f}")
+    print(f"F1:         {metrics['f1']:.3f}")
+    print(f"Accuracy:   {metrics['accuracy']:.3f}")
+    print(f"Confusion:  TP={metrics['tp']} FP={metrics['fp']} FN={metrics['fn']} TN={metrics['tn']}")
+    print()
+    print(f"Throughput: {throughput:.1f} MB/s (best of {max(1, args.repeat)}, {best_time * 1000:.1f} ms per pass)")
+
+    if args.sweep:
+        # Scores don't depend on the threshold, so reuse them
+        scores = [result["score"] for result in results]
+        print()
+        print("Threshold  Precision  Recall  F1")
+        for threshold in range(0, 101, 5):
+            sweep = compute_metrics(expected, [score >= threshold for score in scores])
+            marker = "  <- current" if threshold == scorer.threshold else ""
+            print(f"{threshold:>9}  {sweep['precision']:>9.3f}  {sweep['recall']:>6.3f}  {sweep['f1']:.3f}{marker}")
+
+    if args.show_misses:
+        print()
+        print("Misclassified logs:")
+        for (path, _, _, label), result in zip(samples, results):
+            if result["working"] != label:
+                expected_label = "working" if label else "not_working"
+                print(f"  {path}: expected {expected_label}, score {result['score']}")
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
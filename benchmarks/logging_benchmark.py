@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark the cost of diagnostic messages on a hot path.
+
+Compares, per message:
+
+    print          - the unconditional print("[DEBUG] ...") the code used to do
+    disabled       - logger.debug("...", args) below the configured level
+    disabled-eager - logger.debug(f"...") below the level (the f-string is
+                     still built, which is why the code passes arguments)
+    ring-buffer    - logger.info("...", args) kept by the ring buffer only
+    enabled        - logger.debug("...", args) written to the console
+
+Console output goes to /dev/null, so the numbers are a lower bound for
+writing to a real terminal or to journald.
+"""
+import sys
+import os
+import time
+import logging
+import argparse
+
+# Add the project directory to the Python path
+project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_dir not in sys.path:
+    sys.path.insert(0, project_dir)
+
+from src.utils import log_setup
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(
+        description="Measure the per-message cost of print and of the logging layer"
+    )
+
+    parser.add_argument(
+        "--count", "-n",
+        type=int,
+        default=200000,
+        help="Messages per case (default: 200000)"
+    )
+
+    return parser.parse_args()
+
+def timed(count, func):
+    """Nanoseconds per call of func"""
+    start = time.perf_counter_ns()
+    for index in range(count):
+        func(index)
+    return (time.perf_counter_ns() - start) / count
+
+def main():
+    args = parse_args()
+    command = ["android-translation-layer", "app.apk", "-w", "540", "-h", "960"]
+
+    devnull = open(os.devnull, "w")
+    stderr = sys.stderr
+    sys.stderr = devnull
+    try:
+        log_setup.setup_logging("warning")
+        logger = logging.getLogger("benchmark")
+
+        results = {}
+
+        stdout = sys.stdout
+        sys.stdout = devnull
+        try:
+            results["print"] = timed(args.count, lambda index: print(f"[DEBUG] Sending execute command {index}: {command}"))
+        finally:
+            sys.stdout = stdout
+
+        results["disabled"] = timed(args.count, lambda index: logger.debug("Sending execute command %s: %s", index, command))
+        results["disabled-eager"] = timed(args.count, lambda index: logger.debug(f"Sending execute command {index}: {command}"))
+        results["ring-buffer"] = timed(args.count, lambda index: logger.info("Sending execute command %s: %s", index, command))
+
+        log_setup.setup_logging("debug")
+        results["enabled"] = timed(args.count, lambda index: logger.debug("Sending execute command %s: %s", index, command))
+    finally:
+        sys.stderr = stderr
+
+    print(f"{'case':<16}{'ns/message':>12}{'vs print':>10}")
+    for name, nanoseconds in results.items():
+        print(f"{name:<16}{nanoseconds:>12.0f}{nanoseconds / results['print']:>10.2f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
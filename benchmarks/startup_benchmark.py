@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark the time from launching ATL GUI to its first frame.
+
+Starts atl_gui.py --profile-startup several times, reads the startup
+timeline it prints and reports the median start and duration of every
+phase. "first frame" is the time-to-first-frame; track it across changes
+that touch startup (imports, CSS, views built at launch).
+
+Needs a display (Wayland or X11) like the GUI itself.
+"""
+import sys
+import os
+import re
+import argparse
+import subprocess
+import statistics
+
+# Add the project directory to the Python path
+project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_dir not in sys.path:
+    sys.path.insert(0, project_dir)
+
+TIMELINE_ROW_RE = re.compile(r"^\s*(\d+\.\d+)\s+(\d+\.\d+|-)\s+(\S.*)$")
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(
+        description="Measure ATL GUI startup phases and time-to-first-frame"
+    )
+
+    parser.add_argument(
+        "--repeat", "-r",
+        type=int,
+        default=5,
+        help="Number of launches (default: 5)"
+    )
+
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=60,
+        help="Seconds to wait for each launch (default: 60)"
+    )
+
+    parser.add_argument(
+        "gui_args",
+        nargs="*",
+        help="Extra arguments for atl_gui.py (e.g. --x11)"
+    )
+
+    return parser.parse_args()
+
+def launch(extra_args, timeout):
+    """Run the GUI once and return its timeline as {phase: (start ms, took ms)}"""
+    command = [sys.executable, os.path.join(project_dir, "atl_gui.py"),
+               "--profile-startup", "--force-main-window", "--allow-multiple-instances"] + extra_args
+    result = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                            text=True, timeout=timeout, cwd=project_dir)
+
+    phases = {}
+    in_timeline = False
+    for line in result.stderr.splitlines():
+        if line.startswith("Startup timeline:"):
+            in_timeline = True
+            continue
+        match = TIMELINE_ROW_RE.match(line) if in_timeline else None
+        if match:
+            start, took, name = match.groups()
+            phases[name.strip()] = (float(start), 0.0 if took == "-" else float(took))
+
+    if "first frame" not in phases:
+        raise RuntimeError(f"no startup timeline in the output:\n{result.stderr[-2000:]}")
+    return phases
+
+def main():
+    args = parse_args()
+
+    runs = [launch(args.gui_args, args.timeout) for _ in range(args.repeat)]
+
+    names = []
+    for phases in runs:
+        names.extend(name for name in phases if name not in names)
+    names.sort(key=lambda name: statistics.median(run[name][0] for run in runs if name in run))
+
+    print(f"{'phase':<20}{'start ms':>10}{'took ms':>10}")
+    for name in names:
+        samples = [run[name] for run in runs if name in run]
+        start = statistics.median(sample[0] for sample in samples)
+        took = statistics.median(sample[1] for sample in samples)
+        print(f"{name:<20}{start:>10.1f}{took:>10.1f}")
+
+    first_frame = [run["first frame"][0] for run in runs]
+    print(f"\ntime-to-first-frame: median {statistics.median(first_frame):.1f} ms, "
+          f"min {min(first_frame):.1f} ms, max {max(first_frame):.1f} ms ({len(runs)} launches)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Benchmark how fast the terminal process starts and how much memory it uses.
+
+For each multiprocessing start method the script starts a TerminalManager,
+waits for the answer to a ping, runs a short command and stops it again.
+It reports the time until the process answers, the command round trip and
+the resident / proportional memory of the terminal process.
+
+Use --with-gtk to load GTK and libadwaita first, as the GUI does, so that
+"fork" copies a realistic parent process, and --heap-mb to grow the parent
+further (fork time grows with the size of the parent, forkserver and
+spawn do not).
+"""
+import sys
+import os
+import time
+import argparse
+import statistics
+
+# Add the project directory to the Python path
+project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_dir not in sys.path:
+    sys.path.insert(0, project_dir)
+
+from src.utils.terminal_module import TerminalManager
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(
+        description="Measure terminal process startup time and memory per start method"
+    )
+
+    parser.add_argument(
+        "--methods", "-m",
+        default="fork,forkserver,spawn",
+        help="Comma separated start methods to compare (default: fork,forkserver,spawn)"
+    )
+
+    parser.add_argument(
+        "--repeat", "-r",
+        type=int,
+        default=5,
+        help="Number of starts per method (default: 5)"
+    )
+
+    parser.add_argument(
+        "--with-gtk",
+        action="store_true",
+        help="Import GTK 4 and libadwaita before starting, like the GUI process"
+    )
+
+    parser.add_argument(
+        "--heap-mb",
+        type=int,
+        default=0,
+        help="Allocate this many MB of Python objects in the parent first (default: 0)"
+    )
+
+    return parser.parse_args()
+
+def read_memory_kb(pid):
+    """Resident and proportional set size of a process, in kB"""
+    memory = {"Rss": 0, "Pss": 0}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in memory:
+                    memory[key] = int(value.split()[0])
+    except OSError:
+        pass
+    return memory["Rss"], memory["Pss"]
+
+def wait_for(manager, status, timeout=30):
+    """Wait for an output message with the given status"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        for message in manager.get_output(timeout=0.005) or []:
+            if message["status"] == status:
+                return True
+    return False
+
+def measure(method):
+    """Start, ping, run one command and stop a terminal process"""
+    manager = TerminalManager(start_method=method)
+
+    start = time.perf_counter()
+    manager.start()
+    manager.command_queue.put({"action": "ping"})
+    if not wait_for(manager, "alive"):
+        manager.stop()
+        raise RuntimeError(f"terminal process did not answer ({method})")
+    ready = time.perf_counter() - start
+
+    rss, pss = read_memory_kb(manager.terminal_process.pid)
+
+    start = time.perf_counter()
+    manager.execute_command(["true"], shell=False)
+    wait_for(manager, "completed")
+    command = time.perf_counter() - start
+
+    manager.stop()
+    return ready, command, rss, pss
+
+def main():
+    args = parse_args()
+
+    if args.with_gtk:
+        import gi
+        gi.require_version('Gtk', '4.0')
+        gi.require_version('Adw', '1')
+        from gi.repository import Gtk, Adw
+
+    # Many small objects, like a GUI heap, so fork has page tables to copy
+    heap = [str(index) * 10 for index in range(args.heap_mb * 1024 * 1024 // 100)]
+
+    # Silence the debug output of the terminal module
+    devnull = open(os.devnull, "w")
+
+    print(f"{'method':<12}{'ready ms':>10}{'first ms':>10}{'command ms':>12}{'RSS MB':>9}{'PSS MB':>9}")
+    for method in args.methods.split(","):
+        samples = []
+        stdout = sys.stdout
+        sys.stdout = devnull
+        try:
+            for _ in range(args.repeat):
+                samples.append(measure(method))
+        finally:
+            sys.stdout = stdout
+
+        ready = [sample[0] * 1000 for sample in samples]
+        command = [sample[1] * 1000 for sample in samples]
+        print(
+            f"{method:<12}{statistics.median(ready):>10.1f}{ready[0]:>10.1f}"
+            f"{statistics.median(command):>12.1f}"
+            f"{samples[-1][2] / 1024:>9.1f}{samples[-1][3] / 1024:>9.1f}"
+        )
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,9 +3,7 @@ import gi
 import os
 import sys
 import time
-import json
-from pathlib import Path
-import subprocess
+import logging
 import tempfile
 
 # Import our display_backend module for Wayland/X11 support
@@ -16,11 +14,28 @@ display_backend.configure_backend()
 
 gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
-from gi.repository import Gtk, Adw, GLib, GdkPixbuf, Gdk
+from gi.repository import Gtk, Adw, Gio, GLib, GdkPixbuf, Gdk
 
 from src.window import AtlGUIWindow
 from src.utils.css_provider import setup_css
-from src.utils.initial_setup import check_first_run, SetupAssistant
+from src.utils.initial_setup import SetupAssistant
+from src.utils.config_service import get_config
+from src.utils.atl_registry import get_atl_registry
+from src.utils import startup_profiler
+from src.utils.single_instance import APPLICATION_ID, WATCH_HINT
+from src.utils.test_scheduler import DEFAULT_POLICY
+from src.utils.retry_policy import DEFAULT_MAX_ATTEMPTS
+
+logger = logging.getLogger(__name__)
+
+# Test order policies offered in the settings (see test_scheduler.py)
+TEST_ORDER_CHOICES = [
+    ("smart", "Failing, new, then fastest"),
+    ("failing_first", "Previously failing first"),
+    ("untested_first", "Never tested first"),
+    ("shortest_first", "Fastest first"),
+    ("listing", "Folder order"),
+]
 
 class SetupWindow(Adw.Window):
     """A setup window that properly handles closing"""
@@ -81,8 +96,8 @@ class SetupWindow(Adw.Window):
         content_box.set_margin_end(8)
         scrolled.set_child(content_box)
         
-        # Load configuration
-        self.config = self.load_config()
+        # Shared configuration
+        self.config = get_config()
         
         # 1. ATL Executable Path group
         atl_group = Adw.PreferencesGroup()
@@ -143,7 +158,7 @@ class SetupWindow(Adw.Window):
         self.env_text_view.set_monospace(True)
         
         # Set environment variables from config
-        env_vars = self.config.get("environment_variables", {})
+        env_vars = self.config.get_dict("environment_variables")
         env_text = "\n".join([f"{key}={value}" for key, value in env_vars.items()])
         self.env_text_view.get_buffer().set_text(env_text if env_text else "SCALE=2\nLOG_LEVEL=debug")
         
@@ -185,6 +200,61 @@ class SetupWindow(Adw.Window):
         
         display_group.add(self.display_row)
         
+        # 4. Testing group
+        testing_group = Adw.PreferencesGroup()
+        testing_group.set_title("Testing")
+        testing_group.set_description("How long to wait for an application to draw its window, and in which order to test a folder.")
+        content_box.append(testing_group)
+        
+        # Maximum wait before the Working/Not Working prompt
+        prompt_wait_row = Adw.ActionRow()
+        prompt_wait_row.set_title("Maximum Prompt Wait")
+        prompt_wait_row.set_subtitle("Seconds to wait for window signals before asking whether the app works.")
+        
+        self.prompt_wait_spin = Gtk.SpinButton.new_with_range(1, 300, 1)
+        self.prompt_wait_spin.set_valign(Gtk.Align.CENTER)
+        self.prompt_wait_spin.set_value(self.config.get_float("prompt_max_wait_seconds", 10))
+        prompt_wait_row.add_suffix(self.prompt_wait_spin)
+        testing_group.add(prompt_wait_row)
+        
+        # Test order of a folder, based on earlier runs
+        self.test_order_row = Adw.ComboRow()
+        self.test_order_row.set_title("Test Order")
+        self.test_order_row.set_subtitle("Which APKs of a folder are tested first.")
+        
+        test_order_model = Gtk.StringList()
+        for _, label in TEST_ORDER_CHOICES:
+            test_order_model.append(label)
+        self.test_order_row.set_model(test_order_model)
+        
+        test_order = self.config.get("test_order", DEFAULT_POLICY)
+        order_names = [name for name, _ in TEST_ORDER_CHOICES]
+        self.test_order_row.set_selected(order_names.index(test_order) if test_order in order_names else 0)
+        testing_group.add(self.test_order_row)
+        
+        # Retries of launches detected as not working
+        retry_row = Adw.ActionRow()
+        retry_row.set_title("Attempts for Failing Apps")
+        retry_row.set_subtitle("Apps detected as not working are launched again; the majority verdict counts.")
+        
+        self.retry_attempts_spin = Gtk.SpinButton.new_with_range(1, 9, 1)
+        self.retry_attempts_spin.set_valign(Gtk.Align.CENTER)
+        self.retry_attempts_spin.set_value(self.config.get_int("retry_attempts", DEFAULT_MAX_ATTEMPTS))
+        retry_row.add_suffix(self.retry_attempts_spin)
+        testing_group.add(retry_row)
+        
+        # Run ATL on a pseudo-terminal so its output is not block-buffered
+        pty_row = Adw.ActionRow()
+        pty_row.set_title("Live Output")
+        pty_row.set_subtitle("Run ATL on a pseudo-terminal so log lines arrive as they are printed.")
+        
+        self.use_pty_switch = Gtk.Switch()
+        self.use_pty_switch.set_valign(Gtk.Align.CENTER)
+        self.use_pty_switch.set_active(self.config.get_bool("use_pty", True))
+        pty_row.add_suffix(self.use_pty_switch)
+        pty_row.set_activatable_widget(self.use_pty_switch)
+        testing_group.add(pty_row)
+        
         # Buttons
         button_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=8)
         button_box.set_margin_top(24)
@@ -234,57 +304,6 @@ class SetupWindow(Adw.Window):
         except Exception as e:
             print(f"[ERROR] Error in set_window_icon: {e}")
     
-    def load_config(self):
-        """Load configuration or create default if it doesn't exist"""
-        config_dir = os.path.join(str(Path.home()), ".config", "atl-gui")
-        config_file = os.path.join(config_dir, "config.json")
-        
-        if not os.path.exists(config_dir):
-            os.makedirs(config_dir, exist_ok=True)
-            
-        if os.path.exists(config_file):
-            try:
-                with open(config_file, 'r') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"Error loading config: {e}")
-                return self.get_default_config()
-        else:
-            return self.get_default_config()
-    
-    def get_default_config(self):
-        """Return default configuration"""
-        return {
-            "first_run": False,
-            "atl_executable_path": "",
-            "environment_variables": {
-                "SCALE": "2",
-                "LOG_LEVEL": "debug"
-            },
-            "display_mode": "auto",  # auto, wayland, x11
-            "last_used_directory": str(Path.home()),
-            "recent_apks": []
-        }
-    
-    def save_config(self):
-        """Save configuration to file"""
-        config_dir = os.path.join(str(Path.home()), ".config", "atl-gui")
-        config_file = os.path.join(config_dir, "config.json")
-        
-        # Make sure directory exists
-        os.makedirs(config_dir, exist_ok=True)
-        
-        # Log what we're about to save
-        print(f"[DEBUG] Saving config to {config_file}")
-        print(f"[DEBUG] Config contains ATL executable path: '{self.config.get('atl_executable_path', '')}'")
-        
-        try:
-            with open(config_file, 'w') as f:
-                json.dump(self.config, f, indent=2)
-            print(f"[DEBUG] Config successfully saved to {config_file}")
-        except Exception as e:
-            print(f"[ERROR] Error saving config: {e}")
-    
     def on_browse_atl_clicked(self, button):
         """Handle browse button click for ATL executable"""
         file_chooser = Gtk.FileDialog()
@@ -406,12 +425,17 @@ class SetupWindow(Adw.Window):
         else:
             self.config["display_mode"] = "auto"
         
-        # Save config
-        self.save_config()
+        # Save prompt timing
+        self.config["prompt_max_wait_seconds"] = int(self.prompt_wait_spin.get_value())
+        self.config["test_order"] = TEST_ORDER_CHOICES[self.test_order_row.get_selected()][0]
+        self.config["retry_attempts"] = int(self.retry_attempts_spin.get_value())
+        self.config["use_pty"] = self.use_pty_switch.get_active()
         
         # Mark first run as false
         self.config["first_run"] = False
-        self.save_config()
+        
+        # Setup is complete, write it out without waiting for the debounce
+        self.config.flush()
         
         # Get application reference
         app = self.get_application()
@@ -429,50 +453,12 @@ class SetupWindow(Adw.Window):
     
     def auto_detect_atl_path(self):
         """Auto-detect the android-translation-layer binary path"""
-        # Common locations to check
-        common_paths = [
-            "/usr/bin/android-translation-layer",
-            "/usr/local/bin/android-translation-layer",
-            "/opt/android-translation-layer/android-translation-layer",
-            "/opt/android-translation-layer/bin/android-translation-layer",
-            os.path.expanduser("~/.local/bin/android-translation-layer"),
-            os.path.expanduser("~/bin/android-translation-layer"),
-            os.path.expanduser("~/Android/android-translation-layer/android-translation-layer"),
-            os.path.expanduser("~/android-translation-layer/android-translation-layer")
-        ]
-        
-        # Check if the binary exists in common locations
-        for path in common_paths:
-            if os.path.exists(path) and os.access(path, os.X_OK):
-                print(f"[DEBUG] Found android-translation-layer at: {path}")
-                return path
-        
-        # Try to find it using 'which' command
-        try:
-            result = subprocess.run(["which", "android-translation-layer"], 
-                                   capture_output=True, text=True, check=False)
-            if result.returncode == 0 and result.stdout.strip():
-                path = result.stdout.strip()
-                print(f"[DEBUG] Found android-translation-layer using 'which': {path}")
-                return path
-        except Exception as e:
-            print(f"[DEBUG] Error using 'which' command: {e}")
-        
-        # Try with executable name variations
-        try:
-            for exe_name in ["android-translation-layer", "android_translation_layer", "atl"]:
-                result = subprocess.run(["which", exe_name], 
-                                      capture_output=True, text=True, check=False)
-                if result.returncode == 0 and result.stdout.strip():
-                    path = result.stdout.strip()
-                    print(f"[DEBUG] Found {exe_name} using 'which': {path}")
-                    return path
-        except Exception as e:
-            print(f"[DEBUG] Error using 'which' for variations: {e}")
-            
-        # Not found
-        print("[DEBUG] Could not auto-detect android-translation-layer path")
-        return ""
+        path = get_atl_registry().detect()
+        if path:
+            logger.info("Found android-translation-layer at: %s", path)
+        else:
+            logger.debug("Could not auto-detect android-translation-layer path")
+        return path
 
     def _on_destroy(self, window):
         """Ensure main window is shown if we're closed"""
@@ -644,19 +630,7 @@ class SplashScreen(Gtk.Window):
         self.close()
         
         # Mark first run as false
-        config = check_first_run(None, show_dialog=False)
-        config["first_run"] = False
-        
-        # Save config
-        try:
-            config_dir = os.path.join(str(Path.home()), ".config", "atl-gui")
-            os.makedirs(config_dir, exist_ok=True)
-            config_file = os.path.join(config_dir, "config.json")
-            with open(config_file, 'w') as f:
-                json.dump(config, f, indent=2)
-            print(f"[DEBUG] Config saved to {config_file}")
-        except Exception as e:
-            print(f"Error saving config: {e}")
+        get_config()["first_run"] = False
         
         print("[DEBUG] Creating setup window after splash screen")
         # Create setup window
@@ -676,22 +650,6 @@ class SplashScreen(Gtk.Window):
         """Show main window after setup is completed"""
         print("[DEBUG] Setup window closed, opening main window in current process")
         
-        # Check if we're already in a subprocess with special flags
-        if "--force-main-window" in sys.argv and "--skip-setup" in sys.argv:
-            print("[DEBUG] Already in a subprocess with special flags, not showing main window twice")
-            return
-        
-        # Force reload of configuration before showing main window
-        try:
-            config_dir = os.path.join(str(Path.home()), ".config", "atl-gui")
-            config_file = os.path.join(config_dir, "config.json")
-            if os.path.exists(config_file):
-                with open(config_file, 'r') as f:
-                    config = json.load(f)
-                    print(f"[DEBUG] Reloaded config: ATL executable path = '{config.get('atl_executable_path', '')}'")
-        except Exception as e:
-            print(f"[ERROR] Failed to reload config: {e}")
-        
         # Show main window immediately in current process
         if self.app:
             self.app.show_main_window()
@@ -750,8 +708,18 @@ class SplashScreen(Gtk.Window):
         return False  # Don't repeat
 
 class AtlGUIApp(Adw.Application):
-    def __init__(self):
-        super().__init__(application_id='org.example.atlgui')
+    def __init__(self, allow_multiple_instances=False):
+        # Unique by default: a later `atl-gui foo.apk` hands its APKs to
+        # this process (do_open) instead of starting a second GUI
+        flags = Gio.ApplicationFlags.HANDLES_OPEN
+        if allow_multiple_instances:
+            flags |= Gio.ApplicationFlags.NON_UNIQUE
+        super().__init__(application_id=APPLICATION_ID, flags=flags)
+        
+        # APKs to open and folders to watch once the main window is shown
+        # (e.g. after first-run setup)
+        self._pending_paths = []
+        self._pending_watch = []
         # Set backend-specific application properties if needed
         self.backend = display_backend.get_current_backend()
         
@@ -794,6 +762,7 @@ class AtlGUIApp(Adw.Application):
                 if isinstance(window, AtlGUIWindow):
                     print("[DEBUG] Found existing main window, presenting it")
                     window.present()
+                    self._open_pending_paths(window)
                     
                     # Force additional present call after a short delay
                     GLib.timeout_add(300, lambda win=window: win.present() or False)
@@ -802,29 +771,15 @@ class AtlGUIApp(Adw.Application):
             
             print("[DEBUG] No existing main window found, creating new one")
             
-            # Ensure we're using the latest config by re-reading from disk
-            config_dir = os.path.join(str(Path.home()), ".config", "atl-gui")
-            config_file = os.path.join(config_dir, "config.json")
-            fresh_config = None
-            
-            if os.path.exists(config_file):
-                try:
-                    with open(config_file, 'r') as f:
-                        fresh_config = json.load(f)
-                        print(f"[DEBUG] Loaded fresh config for main window: ATL path = '{fresh_config.get('atl_executable_path', '')}'")
-                except Exception as e:
-                    print(f"[ERROR] Failed to load fresh config: {e}")
-            
             # Create the window with the application
-            win = AtlGUIWindow(application=self)
-            
-            # Explicitly set the ATL executable path from fresh config if available
-            if fresh_config and 'atl_executable_path' in fresh_config:
-                win.atl_executable_path = fresh_config['atl_executable_path']
-                print(f"[DEBUG] Explicitly set ATL path on window: '{win.atl_executable_path}'")
+            with startup_profiler.phase("main window"):
+                win = AtlGUIWindow(application=self)
             
             display_backend.apply_backend_specific_settings(win)
             
+            if startup_profiler.is_enabled():
+                self.report_first_frame(win)
+            
             # Present window immediately and schedule another present call
             win.present()
             GLib.timeout_add(200, lambda win=win: win.present() or False)
@@ -832,6 +787,8 @@ class AtlGUIApp(Adw.Application):
             # Set a flag to track that we've shown the main window
             self._main_window_shown = True
             
+            self._open_pending_paths(win)
+            
             return win
         except Exception as e:
             print(f"[ERROR] Failed to show main window: {e}")
@@ -846,6 +803,21 @@ class AtlGUIApp(Adw.Application):
                 print(f"[ERROR] Even fallback window creation failed: {e}")
                 return None
 
+    def report_first_frame(self, win):
+        """Print the startup timeline once the window has drawn its first frame, then quit"""
+        def on_after_paint(frame_clock):
+            frame_clock.disconnect(handlers.pop("after-paint"))
+            startup_profiler.mark("first frame")
+            startup_profiler.report()
+            self.quit()
+        
+        def on_map(widget):
+            widget.disconnect(handlers.pop("map"))
+            frame_clock = widget.get_frame_clock()
+            handlers["after-paint"] = frame_clock.connect("after-paint", on_after_paint)
+        
+        handlers = {"map": win.connect("map", on_map)}
+
     def do_activate(self, force_main_window=False):
         """Activate the application and show the appropriate window"""
         print(f"[DEBUG] do_activate called with force_main_window={force_main_window}")
@@ -858,19 +830,7 @@ class AtlGUIApp(Adw.Application):
         if "--skip-setup" in sys.argv:
             print("[DEBUG] --skip-setup argument detected")
             # Mark first run as false in config 
-            try:
-                config_dir = os.path.join(str(Path.home()), ".config", "atl-gui")
-                config_file = os.path.join(config_dir, "config.json")
-                if os.path.exists(config_file):
-                    with open(config_file, 'r') as f:
-                        config = json.load(f)
-                        config["first_run"] = False
-                    os.makedirs(config_dir, exist_ok=True)
-                    with open(config_file, 'w') as f:
-                        json.dump(config, f, indent=2)
-                    print("[DEBUG] Config updated to skip first run")
-            except Exception as e:
-                print(f"[ERROR] Failed to update config: {e}")
+            get_config()["first_run"] = False
             
             # Force main window to show
             force_main_window = True
@@ -884,13 +844,11 @@ class AtlGUIApp(Adw.Application):
                 if isinstance(window, AtlGUIWindow):
                     print("[DEBUG] Found existing main window, presenting it")
                     window.present()
+                    self._open_pending_paths(window)
                     return
         
-        # Check if it's the first run
-        config = check_first_run(None, show_dialog=False)
-        
         # If force_main_window is True, skip the first-run check
-        if force_main_window or not config.get("first_run", True):
+        if force_main_window or not get_config().get_bool("first_run", True):
             print("[DEBUG] Opening main window")
             self.show_main_window()
         else:
@@ -902,6 +860,31 @@ class AtlGUIApp(Adw.Application):
             # Add a fallback timer to ensure main window appears even if setup flow fails
             GLib.timeout_add(120000, self._ensure_main_window_shown)
     
+    def do_open(self, files, n_files, hint):
+        """
+        Open APK files or folders given on the command line.
+        
+        Also runs for the paths of a later invocation, which are sent here
+        over D-Bus while that process exits.
+        """
+        paths = [file.get_path() for file in files if file.get_path()]
+        logger.debug("do_open called with %d path(s), hint %r", len(paths), hint)
+        if hint == WATCH_HINT:
+            self._pending_watch.extend(paths)
+        else:
+            self._pending_paths.extend(paths)
+        # Shows the main window (or the first-run setup), which opens them
+        self.activate()
+    
+    def _open_pending_paths(self, win):
+        """Hand the paths received by do_open to the main window"""
+        if self._pending_paths:
+            paths, self._pending_paths = self._pending_paths, []
+            GLib.idle_add(lambda: win.open_apk_paths(paths) or False)
+        for folder in self._pending_watch:
+            win.watch_folder(folder)
+        self._pending_watch = []
+    
     def _ensure_main_window_shown(self):
         """Ensure the main window is shown as a fallback if no windows are visible"""
         windows = self.get_windows()
@@ -915,60 +898,30 @@ class AtlGUIApp(Adw.Application):
             
         return False  # Don't repeat this timeout
 
-def find_main_script():
-    """Find the main ATL-GUI script"""
-    try:
-        # Get direct paths
-        src_dir = os.path.dirname(os.path.abspath(__file__))
-        project_dir = os.path.dirname(src_dir)
-        
-        # Look for the main entry point in standard locations
-        main_script_candidates = [
-            os.path.join(project_dir, "atl_gui.py"),  # Most likely location
-            os.path.join(project_dir, "main.py"),
-            os.path.join(project_dir, "run.py"),
-            os.path.join(project_dir, "app.py"),
-            os.path.abspath(sys.argv[0])  # Current script as fallback
-        ]
-        
-        # Find the first existing, executable candidate
-        for candidate in main_script_candidates:
-            if os.path.exists(candidate) and os.path.isfile(candidate):
-                print(f"[DEBUG] Found main script: {candidate}")
-                if candidate.endswith('.py') and os.access(candidate, os.X_OK):
-                    return candidate
-        
-        # Return current script as last resort
-        return os.path.abspath(sys.argv[0])
-    except Exception as e:
-        print(f"[ERROR] Error finding main script: {e}")
-        return os.path.abspath(sys.argv[0])
-
-def main():
+def main(paths=None, allow_multiple_instances=False, watch_folders=None):
+    """
+    Run the GUI.
+    
+    Args:
+        paths: APK files or folders to test once the main window is up
+        allow_multiple_instances: Run even if another ATL GUI is running,
+            instead of handing the paths over to it
+        watch_folders: Folders whose new APKs are tested as they land
+    """
     # Check if we should skip launching the app (for debug tools)
     if os.environ.get('ATL_NO_LAUNCH') == '1':
         print("Application launch skipped due to ATL_NO_LAUNCH environment variable.")
         return 0
     
-    # Check if we're already running with special flags
-    # If we are, we were likely launched by another process using subprocess
-    # and should not create another app instance
-    if "--force-main-window" in sys.argv and "--skip-setup" in sys.argv:
-        # We only skip if BOTH flags are present to distinguish from user-provided flags
-        print("[DEBUG] Detected existing subprocess with special flags.")
-        print("[DEBUG] Will not create another app instance to prevent duplication.")
-        
-        # Create an environment variable to mark that we skipped
-        # This helps with debugging if needed
-        os.environ['ATL_SKIPPED_LAUNCH'] = '1'
-        return 0
-        
-    app = AtlGUIApp()
+    app = AtlGUIApp(allow_multiple_instances)
+    app._pending_watch.extend(os.path.abspath(folder) for folder in watch_folders or [])
     
     # Add a safety timeout to ensure a main window is shown
     GLib.timeout_add(3000, lambda: ensure_main_window_shown(app) or False)
     
-    return app.run(None)
+    # GApplication gets only the paths: they become do_open() here, or are
+    # sent to the running instance (the other options are ours, not its)
+    return app.run([sys.argv[0]] + [os.path.abspath(path) for path in paths or []])
 
 def ensure_main_window_shown(app):
     """Global fallback to ensure a main window is visible"""
@@ -44,6 +44,7 @@ def on_file_selected(self, dialog, result):
             self.parse_env_variables()
 
             # Test görünümünü göster, karşılama görünümünü gizle
+            self.ensure_testing_view()
             self.welcome_view.set_visible(False)
             self.testing_view.set_visible(True)
 
@@ -94,6 +95,7 @@ def on_folder_selected(self, dialog, result):
 
             if self.apk_files:
                 # Show test view, hide welcome view
+                self.ensure_testing_view()
                 self.welcome_view.set_visible(False)
                 self.testing_view.set_visible(True)
 
@@ -115,6 +117,81 @@ def on_folder_selected(self, dialog, result):
         toast = Adw.Toast.new(f"Could not select folder: {str(e)}")
         self.toast_overlay.add_toast(toast)
         
+def open_apk_paths(self, paths):
+    """
+    Test APK files and folders handed over on the command line
+    (atl-gui foo.apk), also by a later invocation while this one runs.
+    
+    If a batch is being tested, the APKs not already waiting are added to
+    the end of its queue; otherwise they start a new batch.
+    """
+    from src.utils.batch_runner import find_apk_files as expand_apk_paths
+    
+    apk_files = [path for path in expand_apk_paths(paths) if path.lower().endswith('.apk')]
+    if not apk_files:
+        toast = Adw.Toast.new("No APK files found!")
+        toast.set_timeout(3)
+        self.toast_overlay.add_toast(toast)
+        return
+    
+    testing = self.testing_view is not None and self.testing_view.get_visible()
+    if testing and self.current_apk_index < len(self.apk_files):
+        waiting = set(self.apk_files[self.current_apk_index:])
+        added = [path for path in dict.fromkeys(apk_files) if path not in waiting]
+        if added:
+            # Same list as the journal's batch, so the journal records them too
+            self.apk_files.extend(added)
+            journal = getattr(self, 'run_journal', None)
+            if journal:
+                journal.record_enqueue(added)
+            self.progress_label.set_text(f"Progress: {self.current_apk_index + 1}/{len(self.apk_files)}")
+            self.progress_bar.set_fraction(self.current_apk_index / len(self.apk_files))
+        if not added:
+            toast = Adw.Toast.new("Already in the queue")
+        elif len(added) == 1:
+            toast = Adw.Toast.new(f"Added to the queue: {os.path.basename(added[0])}")
+        else:
+            toast = Adw.Toast.new(f"Added {len(added)} APK files to the queue")
+        self.toast_overlay.add_toast(toast)
+        return
+    
+    # Start over from the welcome view if the last batch is finished
+    if self.results_view is not None and self.results_view.get_visible():
+        self.on_new_test_clicked(None)
+    
+    self.apk_files = list(dict.fromkeys(apk_files))
+    self.current_apk_index = 0
+    self.parse_env_variables()
+    
+    from src.views.welcome_view import change_to_test_view
+    change_to_test_view(self, self.apk_files)
+    
+def watch_folder(self, folder):
+    """Test the APKs that land in a folder from now on (hot folder, --watch)"""
+    from src.utils.folder_watcher import FolderWatcher
+    
+    folder = os.path.abspath(folder)
+    if not hasattr(self, 'folder_watchers'):
+        self.folder_watchers = {}
+    if folder in self.folder_watchers:
+        return
+    
+    if not os.path.isdir(folder):
+        toast = Adw.Toast.new(f"Not a folder: {folder}")
+        toast.set_timeout(3)
+        self.toast_overlay.add_toast(toast)
+        return
+    
+    watcher = FolderWatcher(folder, self.open_apk_paths)
+    if not watcher.start():
+        toast = Adw.Toast.new(f"Could not watch {os.path.basename(folder)}")
+        self.toast_overlay.add_toast(toast)
+        return
+    self.folder_watchers[folder] = watcher
+    
+    toast = Adw.Toast.new(f"Watching {os.path.basename(folder)} for new APKs")
+    self.toast_overlay.add_toast(toast)
+
 def parse_env_variables(self):
     buffer = self.env_text_view.get_buffer()
     start_iter = buffer.get_start_iter()
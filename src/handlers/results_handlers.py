@@ -1,144 +1,34 @@
 import gi
 import os
+import logging
 import datetime
 gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
-from gi.repository import Gtk, Adw, Pango, Gdk, GObject, GLib
-import re
+from gi.repository import Gtk, Adw, Pango, Gdk, GObject, GLib, Gio
 from src.utils.css_provider import load_css_data
+from src.utils.launch_timing import format_timeline
+from src.utils.log_analysis import analyze_text
+from src.utils.failure_clustering import cluster_failures
+from src.utils.exporters import EXPORTERS, export, format_for_path, journal_rows
+from src.utils.run_diff import diff_runs, previous_run, has_changes, format_diff, describe_build
 
-def extract_errors_from_log(log_text):
-    """Extract and categorize error lines from a log text, returning structured error data."""
-    error_groups = []
-    
-    # Common error indicators by severity - removed UI Issues and General Warnings
-    error_indicators = {
-        "File Not Found": ["Failed to open file", "No such file or directory"],
-        "Failed Execution": ["Failed execv", "non-0 exit status", "Error terminating process"],
-        "Dex Compilation": ["dex2oat", "Failed to compile dex file"],
-        "Package Parsing": ["PackageParser", "Unknown element", "Binary XML file"],
-        "Java Exceptions": ["java.lang.", "Exception:", "Caused by:"],
-        "Native Errors": ["E/", "ERROR:", "Error:", "error:"],
-        "Asset Errors": ["AssetsProvider", "Failed to load", "Could not load"],
-        "Permissions": ["Permission denied", "requires permission"]
-    }
-    
-    # Process the log line by line to find errors
-    for line in log_text.splitlines():
-        # Check each error category
-        for error_type, indicators in error_indicators.items():
-            for indicator in indicators:
-                if indicator in line:
-                    # Ignore common less important messages that cause noise
-                    if any(ignore in line for ignore in [
-                        "Gtk-WARNING", "Theme parser error", "gtk.css",
-                        "libadwaita", "gtk-application-prefer-dark-theme",
-                        "Failed to load module", "Warning: Unable to load"
-                    ]):
-                        continue
-                        
-                    # Try to extract a more specific error cause
-                    error_cause = extract_error_cause(line, indicator)
-                    
-                    # Create a new error entry
-                    error_entry = {
-                        "type": error_type,
-                        "cause": error_cause,
-                        "line": line,
-                        "details": []  # Will contain related lines
-                    }
-                    
-                    # Look for related lines (context) - up to 5 lines before and after
-                    lines = log_text.splitlines()
-                    try:
-                        line_index = lines.index(line)
-                        start = max(0, line_index - 5)
-                        end = min(len(lines), line_index + 5)
-                        
-                        # Add context lines
-                        for i in range(start, end + 1):
-                            if i != line_index and i < len(lines):  # Skip the main error line
-                                error_entry["details"].append(lines[i])
-                    except ValueError:
-                        # If line not found, just continue
-                        pass
-                    
-                    # Add to error groups
-                    error_groups.append(error_entry)
-                    break
-            else:
-                # Continue if the inner loop wasn't broken
-                continue
-            # Inner loop was broken, break the outer loop too
-            break
-    
-    # Sort errors by type
-    error_groups.sort(key=lambda x: x["type"])
-    
-    return error_groups
+logger = logging.getLogger(__name__)
 
-def extract_error_cause(line, indicator):
-    """Extract a more specific error cause from an error line."""
-    try:
-        # Try to extract what's after the indicator
-        if indicator in line:
-            parts = line.split(indicator, 1)
-            if len(parts) > 1:
-                # Special case for file not found errors - include path
-                if indicator in ["Failed to open file", "No such file or directory"]:
-                    # Try to extract file path
-                    path_match = extract_file_path(parts[1])
-                    if path_match:
-                        return f"Path: {path_match}"
-                
-                # Special case for dex file errors
-                if "dex" in indicator.lower():
-                    path_match = extract_file_path(parts[1])
-                    if path_match:
-                        return f"Dex file: {path_match}"
-                        
-                # Check for asset errors
-                if any(asset_indicator in indicator for asset_indicator in ["Failed to load", "Could not load", "AssetsProvider"]):
-                    path_match = extract_file_path(parts[1])
-                    if path_match:
-                        return f"Asset: {path_match}"
-                
-                # Get what's after the indicator until the end of line or first :
-                cause = parts[1].strip()
-                if ":" in cause:
-                    cause = cause.split(":", 1)[0].strip()
-                # Truncate if too long
-                return cause[:50] + ("..." if len(cause) > 50 else "")
-    except Exception:
-        pass
-    
-    # If all else fails, return a general message
-    return "See details for more information"
+# Rows shown per failure cluster before collapsing the rest into a count
+MAX_CLUSTER_APK_ROWS = 50
 
-def extract_file_path(text):
-    """Extract a file path from text using regex patterns."""
-    # Try different patterns to extract file paths
-    # Pattern 1: Quoted paths
-    path_matches = re.findall(r"['\"]([^'\"]*?(?:/|\\)[^'\"]*?)['\"]", text)
-    if path_matches:
-        return path_matches[0]
-        
-    # Pattern 2: Common Unix paths starting with /
-    path_matches = re.findall(r"(/[^ :,\"']*)", text)
-    if path_matches:
-        return path_matches[0]
-        
-    # Pattern 3: Paths with extension
-    path_matches = re.findall(r"(\S+\.(apk|dex|so|jar|xml|png|jpg))", text)
-    if path_matches:
-        return path_matches[0][0]
-        
-    # Pattern 4: Windows-style paths
-    path_matches = re.findall(r"([A-Za-z]:\\[^ :,\"']*)", text)
-    if path_matches:
-        return path_matches[0]
-    
-    return None
+# File types offered by the export dialog
+EXPORT_FORMAT_LABELS = [
+    ("text", "Text Report (.txt)"),
+    ("csv", "CSV (.csv)"),
+    ("jsonl", "JSON Lines (.jsonl)"),
+    ("junit", "JUnit XML (.xml)"),
+    ("html", "HTML (.html)"),
+]
+
+def extract_errors_from_log(log_text):
+    """Extract and categorize error lines from a log text, returning structured error data."""
+    return analyze_text(log_text)["errors"]
 
 def show_test_results(self):
     # Forcefully kill any running terminal process to ensure it's not running in the background
@@ -146,9 +36,14 @@ def show_test_results(self):
         print("[DEBUG] Forcefully killing terminal process before showing results")
         self.terminal_manager.kill_terminal()
     
+    # The batch is over - it no longer needs to be resumable
+    self.finish_run_journal()
+    
     # Görünümleri değiştir
+    self.ensure_results_view()
     self.welcome_view.set_visible(False)
-    self.testing_view.set_visible(False)
+    if self.testing_view is not None:
+        self.testing_view.set_visible(False)
     self.results_view.set_visible(True)
     
     # Önceki sonuçları temizle - GTK4 uyumlu şekilde
@@ -163,6 +58,13 @@ def show_test_results(self):
     not_working_count = 0
     skipped_count = 0
     
+    # One analysis per log gives both the verdict and the error count
+    log_analyses = {}
+    def get_log_analysis(apk_path):
+        if apk_path not in log_analyses:
+            log_analyses[apk_path] = analyze_text(self.terminal_logs[apk_path])
+        return log_analyses[apk_path]
+    
     # Auto-detect working/not working based on error logs
     for apk_path, result in self.test_results.items():
         # If it's already set to working or not_working, leave it alone
@@ -171,37 +73,23 @@ def show_test_results(self):
             
         # Check logs for auto-detection of working status
         if hasattr(self, 'terminal_logs') and apk_path in self.terminal_logs:
-            log_text = self.terminal_logs[apk_path]
-            
-            # Check for success indicators
-            successful_launch = False
-            common_errors = False
-            
-            # Success indicators
-            if "Successfully launched" in log_text or "app started" in log_text.lower():
-                successful_launch = True
-                
-            # Common error indicators that suggest the app didn't work
-            error_indicators = [
-                "FATAL EXCEPTION", 
-                "Java.lang.RuntimeException",
-                "app has stopped",
-                "ANR in",
-                "process crashed",
-                "Failed to launch",
-                "Unable to start activity"
-            ]
-            
-            for indicator in error_indicators:
-                if indicator in log_text:
-                    common_errors = True
-                    break
-                    
-            # Make the determination
-            if successful_launch and not common_errors:
-                self.test_results[apk_path] = "working"
-            elif common_errors:
-                self.test_results[apk_path] = "not_working"
+            analysis = get_log_analysis(apk_path)
+            if result == "unknown":
+                # Score the log with the same rules as the live detection;
+                # results between the two thresholds are left undecided
+                verdict = analysis["verdict"]
+            else:
+                # A skip is the user's choice: only an explicit launch
+                # failure or success in the log overrides it
+                matches = analysis.get("matches", {})
+                if matches.get("launch_failure"):
+                    verdict = "not_working"
+                elif matches.get("launch_success"):
+                    verdict = "working"
+                else:
+                    verdict = None
+            if verdict:
+                self.test_results[apk_path] = verdict
                 
     # Her APK için sonuçları ekle
     for apk_path, result in self.test_results.items():
@@ -238,9 +126,7 @@ def show_test_results(self):
         
         if not is_result_file and hasattr(self, 'terminal_logs') and apk_path in self.terminal_logs:
             # Get error count
-            log_text = self.terminal_logs[apk_path]
-            error_groups = extract_errors_from_log(log_text)
-            error_count = len(error_groups)
+            error_count = len(get_log_analysis(apk_path)["errors"])
             
             errors_button = Gtk.Button(label=f"Errors ({error_count})")
             errors_button.add_css_class("pill")
@@ -254,6 +140,17 @@ def show_test_results(self):
             # Add button to row
             expander.add_suffix(errors_button)
             
+        # Launch timeline of the last run, if one was recorded
+        timeline = getattr(self, 'launch_timings', {}).get(apk_path)
+        if timeline and timeline.marks:
+            timeline_row = Adw.ActionRow()
+            timeline_row.set_title("Launch Timeline")
+            timeline_row.set_subtitle("  →  ".join(format_timeline(timeline.to_dict())))
+            timeline_row.set_subtitle_selectable(True)
+            timeline_icon = Gtk.Image.new_from_icon_name("preferences-system-time-symbolic")
+            timeline_row.add_prefix(timeline_icon)
+            expander.add_row(timeline_row)
+        
         # Terminal loglarını ekle - terminal_logs olup olmadığını kontrol et
         if hasattr(self, 'terminal_logs') and apk_path in self.terminal_logs:
             # Terminal logu varsa, bir metin görünümü içinde göster
@@ -309,10 +206,134 @@ def show_test_results(self):
         
         self.results_list_box.append(expander)
     
+    # Group not working APKs by the error they fail on
+    failed_errors = {}
+    for apk_path, result in self.test_results.items():
+        if result == "not_working" and hasattr(self, 'terminal_logs') and apk_path in self.terminal_logs:
+            failed_errors[apk_path] = get_log_analysis(apk_path)["errors"]
+    update_failure_clusters(self, failed_errors)
+    
+    # Compare with the previous batch
+    update_run_diff(self)
+    
     # Özet bilgisini güncelle
     total = working_count + not_working_count + skipped_count
     self.summary_label.set_text(f"Total: {total} APKs | Working: {working_count} | Not Working: {not_working_count} | Skipped: {skipped_count}")
 
+def update_failure_clusters(self, errors_by_apk):
+    """
+    Show not working APKs grouped by normalized error signature.
+    
+    Args:
+        errors_by_apk: Dictionary of APK path -> error entries from the log analysis
+    """
+    # Remove the rows of the previous results
+    for row in getattr(self, 'failure_cluster_rows', []):
+        self.failure_clusters_group.remove(row)
+    self.failure_cluster_rows = []
+    
+    # APKs without any recognized error don't form a useful cluster
+    self.failure_clusters = [cluster for cluster in cluster_failures(errors_by_apk) if cluster["signature"]]
+    self.failure_clusters_group.set_visible(bool(self.failure_clusters))
+    
+    for cluster in self.failure_clusters:
+        count = len(cluster["apks"])
+        expander = Adw.ExpanderRow()
+        expander.set_title(GLib.markup_escape_text(f"{count} APK{'s' if count != 1 else ''} fail on {cluster['label']}"))
+        expander.set_subtitle(GLib.markup_escape_text(cluster["type"]))
+        
+        icon = Gtk.Image.new_from_icon_name("dialog-error-symbolic")
+        icon.add_css_class("error")
+        expander.add_prefix(icon)
+        
+        # One row per APK with a shortcut to its error dialog
+        for apk_path in cluster["apks"][:MAX_CLUSTER_APK_ROWS]:
+            apk_row = Adw.ActionRow()
+            apk_row.set_title(GLib.markup_escape_text(os.path.basename(apk_path)))
+            
+            errors_button = Gtk.Button(label="Errors")
+            errors_button.add_css_class("flat")
+            errors_button.set_valign(Gtk.Align.CENTER)
+            errors_button.apk_path = apk_path
+            errors_button.connect("clicked", self.show_apk_errors)
+            apk_row.add_suffix(errors_button)
+            
+            expander.add_row(apk_row)
+        
+        if count > MAX_CLUSTER_APK_ROWS:
+            more_row = Adw.ActionRow()
+            more_row.set_title(f"and {count - MAX_CLUSTER_APK_ROWS} more")
+            more_row.add_css_class("dim-label")
+            expander.add_row(more_row)
+        
+        self.failure_clusters_group.add(expander)
+        self.failure_cluster_rows.append(expander)
+
+def update_run_diff(self):
+    """Show what changed between this batch and the previous one"""
+    for row in getattr(self, 'run_diff_rows', []):
+        self.run_diff_group.remove(row)
+    self.run_diff_rows = []
+    self.run_diff = None
+    
+    run_path = getattr(self, 'last_run_path', None)
+    try:
+        old_path = previous_run(run_path) if run_path else None
+        if old_path:
+            self.run_diff = diff_runs(old_path, run_path)
+    except Exception as e:
+        logger.warning("Could not compare with the previous run: %s", e)
+    
+    # Runs without any APK in common are not worth comparing
+    if not self.run_diff or not self.run_diff["common"] or not has_changes(self.run_diff):
+        self.run_diff_group.set_visible(False)
+        return
+    
+    diff = self.run_diff
+    description = f"Compared with {os.path.basename(diff['old_run'])}"
+    if diff.get("atl_changed"):
+        description += f" (ATL build changed: {describe_build(diff['old_atl'])} → {describe_build(diff['new_atl'])})"
+    self.run_diff_group.set_description(GLib.markup_escape_text(description))
+    self.run_diff_group.set_visible(True)
+    
+    sections = [
+        ("Newly broken", "dialog-error-symbolic", "error",
+         [(os.path.basename(event["apk"]), event.get("label", "")) for event in diff["newly_broken"]]),
+        ("Newly fixed", "emblem-ok-symbolic", "success",
+         [(os.path.basename(event["apk"]), "") for event in diff["newly_fixed"]]),
+        ("New error signatures", "dialog-warning-symbolic", "warning",
+         [(entry["label"], f"{len(entry['apks'])} APK{'s' if len(entry['apks']) != 1 else ''}")
+          for entry in diff["new_signatures"].values()]),
+        ("Score changes", "view-sort-descending-symbolic", None,
+         [(os.path.basename(key), f"{old_score} → {new_score}") for key, old_score, new_score in diff["score_deltas"]]),
+    ]
+    
+    for title, icon_name, css_class, items in sections:
+        if not items:
+            continue
+        expander = Adw.ExpanderRow()
+        expander.set_title(GLib.markup_escape_text(f"{title} ({len(items)})"))
+        icon = Gtk.Image.new_from_icon_name(icon_name)
+        if css_class:
+            icon.add_css_class(css_class)
+        expander.add_prefix(icon)
+        
+        for item_title, item_subtitle in items[:MAX_CLUSTER_APK_ROWS]:
+            item_row = Adw.ActionRow()
+            item_row.set_title(GLib.markup_escape_text(item_title))
+            if item_subtitle:
+                item_row.set_subtitle(GLib.markup_escape_text(item_subtitle))
+            expander.add_row(item_row)
+        
+        if len(items) > MAX_CLUSTER_APK_ROWS:
+            more_row = Adw.ActionRow()
+            more_row.set_title(f"and {len(items) - MAX_CLUSTER_APK_ROWS} more")
+            more_row.add_css_class("dim-label")
+            expander.add_row(more_row)
+        
+        self.run_diff_group.add(expander)
+        self.run_diff_rows.append(expander)
+
 def show_apk_errors(self, button):
     print("DEBUG: show_apk_errors called")
     apk_path = button.apk_path
@@ -660,7 +681,8 @@ def show_apk_errors(self, button):
                 details_box.set_margin_bottom(8)
                 
                 # Original error line
-                error_line_label = Gtk.Label(label="<b>Error Line:</b>")
+                error_line_title = f"Error Line {error['line_number']}:" if error.get('line_number') else "Error Line:"
+                error_line_label = Gtk.Label(label=f"<b>{error_line_title}</b>")
                 error_line_label.set_use_markup(True)
                 error_line_label.set_xalign(0)
                 error_line_label.set_margin_top(8)
@@ -969,14 +991,17 @@ def show_full_apk_logs(self, apk_path):
 
 def on_new_test_clicked(self, button):
     # Hide result view and show welcome view for new test
-    self.results_view.set_visible(False)
-    self.testing_view.set_visible(False)
+    self.ensure_results_view().set_visible(False)
+    self.ensure_testing_view().set_visible(False)
     self.welcome_view.set_visible(True)
     
     # Reset variables
     self.apk_files = []
     self.current_apk_index = 0
     self.test_results = {}
+    self.launch_timings = {}
+    self.failure_clusters = []
+    self.run_diff = None
     self.current_apk_ready = False
     
     # Reset drag & drop UI state if we came from there
@@ -1011,10 +1036,15 @@ def on_export_clicked(self, button):
     file_dialog.set_title("Save Results")
     file_dialog.set_initial_name("android_translation_layer_results.txt")
     
-    # Filtre ekle
-    text_filter = Gtk.FileFilter()
-    text_filter.set_name("Text Files")
-    text_filter.add_mime_type("text/plain")
+    # Filtre ekle - the format is picked from the file extension
+    filters = Gio.ListStore.new(Gtk.FileFilter)
+    for name, label in EXPORT_FORMAT_LABELS:
+        file_filter = Gtk.FileFilter()
+        file_filter.set_name(label)
+        for extension in EXPORTERS[name].extensions:
+            file_filter.add_suffix(extension.lstrip("."))
+        filters.append(file_filter)
+    file_dialog.set_filters(filters)
     
     # Diyaloğu göster
     file_dialog.save(self, None, self.on_export_dialog_response)
@@ -1036,33 +1066,53 @@ def on_export_dialog_response(self, dialog, result):
         toast = Adw.Toast.new(f"Could not export results: {str(e)}")
         self.toast_overlay.add_toast(toast)
 
+def result_rows(self):
+    """
+    Export rows (see exporters.py) for the results of this session.
+    
+    Rows come from the batch journal, so they carry the score, duration
+    and error signature recorded for each APK; the result is the one shown
+    on the results screen, and APKs the journal does not have are added
+    from the screen's results.
+    """
+    timings = getattr(self, 'launch_timings', {})
+    def with_screen_data(row):
+        if row["apk"] in self.test_results:
+            row["result"] = self.test_results[row["apk"]]
+        timeline = timings.get(row["apk"])
+        if timeline and timeline.marks:
+            row["timings"] = timeline.to_dict()
+        return row
+    
+    exported = set()
+    journal_path = getattr(self, 'last_run_path', None)
+    if journal_path and os.path.exists(journal_path):
+        for row in journal_rows(journal_path):
+            exported.add(row["apk"])
+            yield with_screen_data(row)
+    
+    for apk_path, result in self.test_results.items():
+        if apk_path not in exported:
+            yield with_screen_data({"apk": apk_path, "result": result})
+
+def export_sections(self):
+    """Failure clusters and changes since the last run, for the text report"""
+    sections = []
+    failure_clusters = getattr(self, 'failure_clusters', [])
+    if failure_clusters:
+        lines = []
+        for cluster in failure_clusters:
+            lines.append(f"{len(cluster['apks'])} x {cluster['type']}: {cluster['label']}")
+            lines.extend(f"    {os.path.basename(apk_path)}" for apk_path in cluster["apks"])
+        sections.append(("FAILURE CLUSTERS", lines))
+    
+    run_diff = getattr(self, 'run_diff', None)
+    if run_diff and has_changes(run_diff):
+        sections.append(("CHANGES SINCE LAST RUN", format_diff(run_diff)))
+    return sections
+
 def export_results_to_file(self, file_path):
-    # Çalışma zamanı bilgisi
-    now = datetime.datetime.now()
-    date_str = now.strftime("%Y-%m-%d %H:%M:%S")
-    
-    # Özet sayıları hesapla
-    working_count = sum(1 for result in self.test_results.values() if result == "working")
-    not_working_count = sum(1 for result in self.test_results.values() if result == "not_working")
-    skipped_count = sum(1 for result in self.test_results.values() if result == "skipped")
-    total = len(self.test_results)
-    
-    with open(file_path, 'w') as f:
-        # Başlık ve tarih
-        f.write("===== ANDROID TRANSLATION LAYER - APPLICATION RESULTS =====\n")
-        f.write(f"Date: {date_str}\n\n")
-        
-        # Özet
-        f.write("===== SUMMARY =====\n")
-        f.write(f"Total Applications: {total}\n")
-        f.write(f"Working: {working_count}\n")
-        f.write(f"Not Working: {not_working_count}\n")
-        f.write(f"Skipped: {skipped_count}\n\n")
-        
-        # Detaylı sonuçlar
-        f.write("===== DETAILED RESULTS =====\n")
-        
-        for apk_path, result in self.test_results.items():
-            apk_name = os.path.basename(apk_path)
-            result_text = "Working" if result == "working" else "Not Working" if result == "not_working" else "Skipped"
-            f.write(f"{apk_name}: {result_text}\n") 
\ No newline at end of file
+    """Write the results in the format chosen by the file extension (text by default)"""
+    with open(file_path, 'w', newline='') as f:
+        export(lambda: result_rows(self), format_for_path(file_path), f,
+               title="Android Translation Layer results", sections=export_sections(self))
@@ -3,8 +3,9 @@ gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
 from gi.repository import Gtk, Adw, GLib
 
-# Import detect_app_status function from test_handlers
-from src.handlers.test_handlers import detect_app_status
+# Import detection helpers from test_handlers
+from src.handlers.test_handlers import detect_app_status, analysis_to_status
+from src.utils.terminal_module import OutputDecoder
 
 def process_terminal_output(self):
     """
@@ -44,29 +45,65 @@ def process_terminal_output(self):
     buffer = self.terminal_output.get_buffer()
     current_apk = self.apk_files[self.current_apk_index] if self.current_apk_index < len(self.apk_files) else None
     
+    timeline = getattr(self, 'launch_timeline', None)
+    
+    # Output arrives as bytes and is decoded only here, where it is shown
+    if getattr(self, 'output_decoder', None) is None:
+        self.output_decoder = OutputDecoder()
+    
+    def append_output(text, timestamp):
+        if timeline:
+            timeline.mark("first_output", timestamp)
+            self.track_launch_signals(text, timestamp)
+        
+        buffer.insert(buffer.get_end_iter(), text)
+        self.terminal_output.scroll_to_iter(buffer.get_end_iter(), 0, False, 0, 0)
+        
+        # Save to terminal logs
+        if current_apk and current_apk in self.terminal_logs:
+            self.terminal_logs[current_apk] += text
+    
     for message in output_messages:
-        if message["status"] == "output":
+        if message["status"] == "started":
+            # Process was spawned
+            self.output_decoder.reset()
+            if timeline:
+                timeline.mark("spawn", message.get("timestamp"))
+                
+        elif message["status"] == "output":
             # Normal output from command
-            buffer.insert(buffer.get_end_iter(), message["message"])
-            self.terminal_output.scroll_to_iter(buffer.get_end_iter(), 0, False, 0, 0)
-            
-            # Save to terminal logs
-            if current_apk and current_apk in self.terminal_logs:
-                self.terminal_logs[current_apk] += message["message"]
+            text = self.output_decoder.decode(message)
+            if text:
+                append_output(text, message.get("timestamp"))
                 
         elif message["status"] == "completed":
             # Command finished
+            text = self.output_decoder.flush()
+            if text:
+                append_output(text, message.get("timestamp"))
+            if timeline:
+                timeline.mark("exit", message.get("timestamp"))
+            
             buffer.insert(buffer.get_end_iter(), f"\n[COMMAND COMPLETE] Exit code: {message['exit_code']}\n")
             
+            # The app has exited - no reason to keep waiting for window signals
+            if getattr(self, 'prompt_pending', False):
+                self.show_test_buttons()
+            
             # Process terminal output for auto-detection
             if hasattr(self, 'current_apk_ready') and self.current_apk_ready and current_apk:
-                # Get terminal output
-                start_iter = buffer.get_start_iter()
-                end_iter = buffer.get_end_iter()
-                output_text = buffer.get_text(start_iter, end_iter, True)
-                
-                # Check output using app detection logic
-                auto_detected, success_probability, detection_reason = detect_app_status(output_text)
+                analyzer = getattr(self, 'launch_analyzer', None)
+                if analyzer is not None:
+                    # The output was already analyzed while it streamed in
+                    auto_detected, success_probability, detection_reason = analysis_to_status(analyzer.finish())
+                else:
+                    # Get terminal output
+                    start_iter = buffer.get_start_iter()
+                    end_iter = buffer.get_end_iter()
+                    output_text = buffer.get_text(start_iter, end_iter, True)
+                    
+                    # Check output using app detection logic
+                    auto_detected, success_probability, detection_reason = detect_app_status(output_text)
                 
                 # Add detection results to terminal
                 buffer.insert(buffer.get_end_iter(), f"\n\n[AUTO DETECTION] App analysis complete. Score: {success_probability}%\n")
@@ -80,6 +117,12 @@ def process_terminal_output(self):
                     # Application likely not working
                     GLib.idle_add(self.auto_mark_as_not_working)
         
+        elif message["status"] == "terminated":
+            # Command was killed (user verdict or skip)
+            self.output_decoder.reset()
+            if timeline:
+                timeline.mark("exit", message.get("timestamp"))
+        
         elif message["status"] == "error":
             # Error from terminal process
             buffer.insert(buffer.get_end_iter(), f"\n[ERROR] {message['message']}\n")
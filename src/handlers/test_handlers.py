@@ -1,11 +1,27 @@
 import gi
 import os
+import time
+import logging
+import threading
 import subprocess
-import shlex
 gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
 from gi.repository import Gtk, Adw, GLib
 from src.utils.recent_apks import save_recent_apk
+from src.utils.launch_command import build_atl_argv, build_launch_command
+from src.utils.launch_timing import LaunchTimeline
+from src.utils.log_analysis import LogAnalyzer, analyze_text
+from src.utils.run_journal import RunJournal, find_resumable_run, COMPLETED_RESULTS
+from src.utils.result_cache import ResultCache
+from src.utils.test_scheduler import DEFAULT_POLICY, order_apks, load_history
+from src.utils.atl_registry import get_atl_registry
+from src.utils.retry_policy import RetryPolicy, is_flaky
+from src.utils.failure_clustering import failure_signature
+
+logger = logging.getLogger(__name__)
+
+# Default upper bound for waiting on window signals before prompting
+DEFAULT_PROMPT_MAX_WAIT_SECONDS = 10
 
 def test_next_apk(self):
     if self.current_apk_index >= len(self.apk_files):
@@ -28,12 +44,23 @@ def test_next_apk(self):
         self.show_test_results()
         return
 
+    # Order a new batch and checkpoint it so it can be resumed after a crash
+    if getattr(self, 'run_journal_files', None) is not self.apk_files:
+        if self.current_apk_index == 0:
+            order_test_batch(self)
+        start_run_journal(self)
+    
+    # A prompt armed for the previous run must not fire for this one
+    cancel_test_prompt(self)
+    self.current_apk_ready = False
+    
     # Get the next APK to test
     apk_path = self.apk_files[self.current_apk_index]
     apk_name = os.path.basename(apk_path)
     folder_path = os.path.dirname(apk_path)
 
     # Update UI - For modified status section
+    self.ensure_testing_view()
     self.apk_value_label.set_text(apk_name)
     self.status_value_label.set_text("Ready")
     self.status_icon.set_from_icon_name("media-playback-pause-symbolic")
@@ -73,10 +100,7 @@ def on_skip_clicked(self, button):
 
     # Save result as skipped
     current_apk = self.apk_files[self.current_apk_index]
-    self.test_results[current_apk] = "skipped"
-    
-    # Save to recent APKs
-    save_recent_apk(current_apk, "skipped")
+    self.record_test_result(current_apk, "skipped")
     
     # Check terminal logs
     if not hasattr(self, 'terminal_logs'):
@@ -163,12 +187,12 @@ def on_output(self, source, condition):
 def auto_mark_as_working(self):
     # If still in test waiting state (buttons are still visible)
     if self.test_button_box.get_visible():
-        # Mark APK as working
+        # Mark APK as working - unless earlier attempts still need a quorum
         current_apk = self.apk_files[self.current_apk_index]
-        self.test_results[current_apk] = "working"
-        
-        # Save to recent APKs
-        save_recent_apk(current_apk, "working")
+        verdict = resolve_auto_verdict(self, current_apk, "working")
+        if verdict is None:
+            return False
+        self.record_test_result(current_apk, verdict)
         
         # Update status information
         self.status_value_label.set_text("Success (Auto)")
@@ -209,12 +233,12 @@ def auto_mark_as_working(self):
 def auto_mark_as_not_working(self):
     # If still in test waiting state (buttons are still visible)
     if self.test_button_box.get_visible():
-        # Mark APK as not working
+        # Mark APK as not working - unless it gets another attempt
         current_apk = self.apk_files[self.current_apk_index]
-        self.test_results[current_apk] = "not_working"
-        
-        # Save to recent APKs
-        save_recent_apk(current_apk, "not_working")
+        verdict = resolve_auto_verdict(self, current_apk, "not_working")
+        if verdict is None:
+            return False
+        self.record_test_result(current_apk, verdict)
         
         # Update status information
         self.status_value_label.set_text("Failed (Auto)")
@@ -263,7 +287,7 @@ def kill_current_process(self):
             except subprocess.TimeoutExpired:
                 self.current_process.kill()
         except Exception as e:
-            print(f"Error terminating process: {e}")
+            logger.error("Error terminating process: %s", e)
             # Update status information
             self.status_value_label.set_text("Error")
             self.status_icon.set_from_icon_name("dialog-error-symbolic")
@@ -285,10 +309,7 @@ def on_working_clicked(self, button):
     
     # Save result
     current_apk = self.apk_files[self.current_apk_index]
-    self.test_results[current_apk] = "working"
-    
-    # Save to recent APKs
-    save_recent_apk(current_apk, "working")
+    self.record_test_result(current_apk, "working")
     
     # Terminate the process if it's still running
     self.kill_current_process()
@@ -330,10 +351,7 @@ def on_not_working_clicked(self, button):
     
     # Save result
     current_apk = self.apk_files[self.current_apk_index]
-    self.test_results[current_apk] = "not_working"
-    
-    # Save to recent APKs
-    save_recent_apk(current_apk, "not_working")
+    self.record_test_result(current_apk, "not_working")
     
     # Terminate the process if it's still running
     self.kill_current_process()
@@ -362,6 +380,236 @@ def on_not_working_clicked(self, button):
     self.test_button_box.set_visible(False)
     self.test_question_label.set_visible(False)
 
+def record_test_result(self, apk_path, result):
+    """
+    Store the verdict of an APK.
+    
+    The result is kept for the results screen, saved to the recent APKs
+    list, checkpointed in the batch journal and stored in the result cache.
+    """
+    self.test_results[apk_path] = result
+    save_recent_apk(apk_path, result)
+    
+    attempts = getattr(self, 'retry_attempts', {}).pop(apk_path, [])
+    flaky = is_flaky(attempts)
+    
+    journal = getattr(self, 'run_journal', None)
+    if journal:
+        details = {}
+        timeline = getattr(self, 'launch_timings', {}).get(apk_path)
+        if timeline:
+            details["duration"] = round(time.monotonic() - timeline.start, 3)
+            details["timings"] = timeline.to_dict()
+        if len(attempts) > 1:
+            details["attempts"] = attempts
+            details["flaky"] = flaky
+        # Score and error signature let later runs be compared with this one
+        analyzer = getattr(self, 'launch_analyzer', None)
+        if analyzer is not None and result in ("working", "not_working"):
+            analysis = analyzer.result()
+            details["score"] = analysis.get("score")
+            if result == "not_working":
+                signature, label = failure_signature(analysis["errors"])
+                if signature:
+                    details["signature"] = signature
+                    details["label"] = label
+        journal.record_result(apk_path, result, **details)
+    
+    # A flaky verdict is not worth reusing - test it again next time
+    if result in ("working", "not_working") and not flaky:
+        cache_test_result(self, apk_path, result)
+
+def resolve_auto_verdict(self, apk_path, result):
+    """
+    Add an automatic verdict to the attempts of an APK.
+    
+    Failed launches are retried (see retry_policy.py) until one verdict
+    reaches a quorum. Manual verdicts always decide at once.
+    
+    Returns:
+        str or None: The final verdict, or None if the APK is being
+        launched again
+    """
+    if not hasattr(self, 'retry_attempts'):
+        self.retry_attempts = {}
+    attempts = self.retry_attempts.setdefault(apk_path, [])
+    attempts.append(result)
+    
+    policy = RetryPolicy.from_config(getattr(self, 'config', None))
+    if not policy.needs_retry(attempts):
+        return policy.verdict(attempts)
+    
+    delay = policy.delay(len(attempts))
+    logger.debug("Retrying %s in %.1fs (attempts so far: %s)", apk_path, delay, attempts)
+    
+    self.test_button_box.set_visible(False)
+    self.test_question_label.set_visible(False)
+    self.status_value_label.set_text(f"Retrying ({len(attempts) + 1}/{policy.max_attempts})")
+    self.status_icon.set_from_icon_name("view-refresh-symbolic")
+    
+    buffer = self.terminal_output.get_buffer()
+    buffer.insert(buffer.get_end_iter(), f"\n\n[AUTO ASSESSMENT: Attempt {len(attempts)} {result.replace('_', ' ')} - retrying in {delay:.0f}s]\n")
+    self.terminal_output.scroll_to_iter(buffer.get_end_iter(), 0, False, 0, 0)
+    
+    toast = Adw.Toast.new(f"Launch failed, retrying ({len(attempts) + 1}/{policy.max_attempts})")
+    self.toast_overlay.add_toast(toast)
+    
+    GLib.timeout_add(int(delay * 1000), retry_test, self, apk_path, self.current_apk_index)
+    return None
+
+def retry_test(self, apk_path, apk_index):
+    """Launch an APK again, unless the user has moved on meanwhile"""
+    if self.current_apk_index == apk_index and apk_index < len(self.apk_files) and self.apk_files[apk_index] == apk_path:
+        self.start_test(apk_path)
+    return False
+
+def cache_test_result(self, apk_path, result):
+    """
+    Remember a verdict for incremental re-testing (atl_batch.py --changed-only).
+    
+    Hashing a large APK takes a moment, so the cache is updated on a
+    background thread.
+    """
+    if getattr(self, 'result_cache', None) is None:
+        self.result_cache = ResultCache()
+    cache = self.result_cache
+    atl_executable = getattr(self, 'atl_executable_path', "") or "android-translation-layer"
+    launch_options = collect_launch_options(self)
+    env_vars = dict(getattr(self, 'env_variables', {}))
+    
+    def store():
+        try:
+            key = cache.make_key(apk_path, cache.atl_fingerprint(atl_executable), launch_options, env_vars)
+            cache.store(key, apk_path, result)
+            cache.save()
+        except Exception as e:
+            logger.warning("Could not cache result of %s: %s", apk_path, e)
+    
+    threading.Thread(target=store, daemon=True).start()
+
+def order_test_batch(self):
+    """Sort a new batch with the configured test order policy"""
+    if len(self.apk_files) < 2:
+        return
+    policy = (getattr(self, 'config', None) or {}).get("test_order", DEFAULT_POLICY)
+    try:
+        atl_executable = getattr(self, 'atl_executable_path', "") or "android-translation-layer"
+        history = load_history(atl_fingerprint=get_atl_registry().fingerprint(atl_executable))
+        self.apk_files = order_apks(self.apk_files, policy, history)
+        logger.debug("Test order '%s': %s", policy, [os.path.basename(apk) for apk in self.apk_files])
+    except Exception as e:
+        logger.warning("Could not order the batch: %s", e)
+
+def start_run_journal(self):
+    """Open a checkpoint journal for the batch in self.apk_files"""
+    finish_run_journal(self, completed=False)
+    self.last_run_path = None
+    try:
+        atl_executable = getattr(self, 'atl_executable_path', "")
+        self.run_journal = RunJournal.create(self.apk_files, {
+            "atl_executable_path": atl_executable,
+            "atl_build": get_atl_registry().describe(atl_executable or "android-translation-layer"),
+            "launch_options": collect_launch_options(self),
+            "environment_variables": dict(getattr(self, 'env_variables', {})),
+        })
+        logger.debug("Batch journal: %s", self.run_journal.path)
+    except Exception as e:
+        logger.warning("Could not create batch journal: %s", e)
+        self.run_journal = None
+    self.run_journal_files = self.apk_files
+
+def finish_run_journal(self, completed=True):
+    """
+    Close the batch journal.
+    
+    Args:
+        completed: True to mark the batch as done, False to leave it
+            resumable (e.g. the window is closing mid-batch)
+    """
+    journal = getattr(self, 'run_journal', None)
+    if journal:
+        if completed:
+            journal.finish()
+            self.last_run_path = journal.path
+        else:
+            journal.close()
+    self.run_journal = None
+    self.run_journal_files = None
+
+def offer_resume_run(self):
+    """Offer to resume the last batch if it was interrupted"""
+    try:
+        state = find_resumable_run()
+    except Exception as e:
+        logger.warning("Could not check for interrupted batches: %s", e)
+        state = None
+    
+    if state:
+        total = len(state["apk_files"])
+        remaining = len(state["pending"])
+        toast = Adw.Toast.new(f"Previous batch was interrupted ({remaining} of {total} applications left)")
+        toast.set_button_label("Resume")
+        toast.set_timeout(15)
+        toast.connect("button-clicked", lambda toast: resume_run(self, state))
+        self.toast_overlay.add_toast(toast)
+    
+    return False  # Don't repeat the idle callback
+
+def resume_run(self, state):
+    """
+    Continue an interrupted batch from its journal.
+    
+    Completed APKs keep their recorded results; the APK that was in
+    flight and the ones never started are tested again.
+    """
+    try:
+        journal = RunJournal.reopen(state["path"])
+    except Exception as e:
+        logger.warning("Could not reopen batch journal: %s", e)
+        return
+    
+    finish_run_journal(self, completed=False)
+    self.run_journal = journal
+    self.apk_files = list(state["pending"])
+    self.run_journal_files = self.apk_files
+    self.current_apk_index = 0
+    
+    # Results of the completed APKs, in batch order
+    self.test_results = {
+        apk: state["results"][apk]
+        for apk in state["apk_files"]
+        if state["results"].get(apk) in COMPLETED_RESULTS
+    }
+    
+    self.parse_env_variables()
+    
+    # Show test view, hide welcome view
+    self.ensure_testing_view()
+    self.welcome_view.set_visible(False)
+    if self.results_view is not None:
+        self.results_view.set_visible(False)
+    self.testing_view.set_visible(True)
+    
+    toast = Adw.Toast.new(f"Resuming batch: {len(self.apk_files)} applications left")
+    self.toast_overlay.add_toast(toast)
+    
+    self.test_next_apk()
+
+def collect_launch_options(self):
+    """Collect the ATL launch options currently set on the window"""
+    return {
+        "activity_name": self.activity_name,
+        "instrumentation_class": self.instrumentation_class,
+        "window_width": self.window_width,
+        "window_height": self.window_height,
+        "uri_value": self.uri_value,
+        "jvm_options": self.jvm_options,
+        "string_keys": self.string_keys,
+        "install_flag": getattr(self, 'install_flag', False),
+        "install_internal": getattr(self, 'install_internal', False),
+        "gapplication_app_id": getattr(self, 'gapplication_app_id', ""),
+    }
+
 def on_start_test_clicked(self, button):
     # Mevcut APK için test başlatma işlemi
     if self.current_apk_index < len(self.apk_files):
@@ -371,29 +619,29 @@ def on_start_test_clicked(self, button):
 def start_test(self, apk_path):
     try:
         # SELF-TEST: Print the direct attribute value to verify it's been properly set
-        print(f"[SELF-TEST] Direct ATL path attribute: '{getattr(self, 'atl_executable_path', 'NOT FOUND')}'")
-        print(f"[SELF-TEST] Config contains ATL path: '{self.config.get('atl_executable_path', 'NOT IN CONFIG')}'")
+        logger.debug("Direct ATL path attribute: '%s'", getattr(self, 'atl_executable_path', 'NOT FOUND'))
+        logger.debug("Config contains ATL path: '%s'", self.config.get('atl_executable_path', 'NOT IN CONFIG'))
         
         # Use the configured ATL executable path or fall back to "android-translation-layer" in PATH
         # Check if the attribute exists and has a non-empty value
         if hasattr(self, 'atl_executable_path') and self.atl_executable_path:
             atl_executable = self.atl_executable_path
-            print(f"[DEBUG] Using configured ATL executable path: '{atl_executable}'")
+            logger.debug("Using configured ATL executable path: '%s'", atl_executable)
         else:
             atl_executable = "android-translation-layer"
-            print(f"[DEBUG] No ATL executable path configured, falling back to: '{atl_executable}'")
+            logger.debug("No ATL executable path configured, falling back to: '%s'", atl_executable)
         
         # Add enhanced debugging information
-        print("\nDEBUG: ======= STARTING TEST WITH FINAL SETTINGS =======")
-        print(f"DEBUG: APK Path: {apk_path}")
-        print(f"DEBUG: Using ATL Binary: '{atl_executable}' (exact path from settings)")
-        print(f"DEBUG: Activity name: '{self.activity_name}' (use: {self.use_activity})")
-        print(f"DEBUG: Instrumentation class: '{self.instrumentation_class}' (use: {self.use_instrumentation})")
-        print(f"DEBUG: URI value: '{self.uri_value}' (use: {self.use_uri})")
-        print(f"DEBUG: Window dimensions: {self.window_width}x{self.window_height}")
-        print(f"DEBUG: JVM options count: {len(self.jvm_options) if hasattr(self, 'jvm_options') else 0}")
-        print(f"DEBUG: String keys count: {len(self.string_keys) if hasattr(self, 'string_keys') else 0}")
-        print("DEBUG: ===============================================\n")
+        logger.debug("======= STARTING TEST WITH FINAL SETTINGS =======")
+        logger.debug("APK Path: %s", apk_path)
+        logger.debug("Using ATL Binary: '%s' (exact path from settings)", atl_executable)
+        logger.debug("Activity name: '%s' (use: %s)", self.activity_name, self.use_activity)
+        logger.debug("Instrumentation class: '%s' (use: %s)", self.instrumentation_class, self.use_instrumentation)
+        logger.debug("URI value: '%s' (use: %s)", self.uri_value, self.use_uri)
+        logger.debug("Window dimensions: %sx%s", self.window_width, self.window_height)
+        logger.debug("JVM options count: %s", len(self.jvm_options) if hasattr(self, 'jvm_options') else 0)
+        logger.debug("String keys count: %s", len(self.string_keys) if hasattr(self, 'string_keys') else 0)
+        logger.debug("===============================================")
         
         # Get environment variables
         env_vars = self.env_variables.copy()
@@ -409,14 +657,14 @@ def start_test(self, apk_path):
             env_vars.update(self.additional_env_vars)
             
         # Debugging: Print attributes for troubleshooting
-        print("DEBUG: Checking settings attributes:")
-        print(f"activity_name: {self.activity_name}")
-        print(f"instrumentation_class: {self.instrumentation_class}")
-        print(f"uri_value: {self.uri_value}")
-        print(f"window_width: {self.window_width}")
-        print(f"window_height: {self.window_height}")
-        print(f"jvm_options: {self.jvm_options}")
-        print(f"string_keys: {self.string_keys}")
+        logger.debug("Checking settings attributes:")
+        logger.debug("activity_name: %s", self.activity_name)
+        logger.debug("instrumentation_class: %s", self.instrumentation_class)
+        logger.debug("uri_value: %s", self.uri_value)
+        logger.debug("window_width: %s", self.window_width)
+        logger.debug("window_height: %s", self.window_height)
+        logger.debug("jvm_options: %s", self.jvm_options)
+        logger.debug("string_keys: %s", self.string_keys)
             
         # Check if script is specified and exists
         script_error = None
@@ -445,106 +693,35 @@ def start_test(self, apk_path):
             error_dialog.present()
             return
         
-        # Create command arguments - first element is the executable itself
-        command_args = [atl_executable]
-        
-        # Add the APK path
-        command_args.append(apk_path)
+        # Build the ATL argument vector - first element is the executable itself
+        command_args, flags = build_atl_argv(atl_executable, apk_path, collect_launch_options(self))
         
-        # Track flags for better display
-        flags = []
-        
-        # Add activity launcher option if activity name is provided
-        if self.activity_name:
-            command_args.extend(["-l", self.activity_name])
-            flags.append(f"-l {self.activity_name}")
-        
-        # Add instrumentation option if provided
-        if self.instrumentation_class:
-            command_args.extend(["--instrument", self.instrumentation_class])
-            flags.append(f"--instrument={self.instrumentation_class}")
-        
-        # Add width and height if specified
-        if self.window_width:
-            command_args.extend(["-w", str(self.window_width)])
-            flags.append(f"-w {self.window_width}")
-        
-        if self.window_height:
-            command_args.extend(["-h", str(self.window_height)])
-            flags.append(f"-h {self.window_height}")
-        
-        # Add URI if specified
-        if self.uri_value:
-            command_args.extend(["-u", self.uri_value])
-            flags.append(f"-u {self.uri_value}")
-        
-        # Add extra JVM options
-        if self.jvm_options:
-            for option in self.jvm_options:
-                command_args.extend(["-X", option])
-                flags.append(f"-X \"{option}\"")
-        
-        # Add extra string key/value pairs
-        if self.string_keys:
-            for key, value in self.string_keys.items():
-                command_args.extend(["-e", f"{key}={value}"])
-                flags.append(f"-e {key}={value}")
-        
-        # Add any other flags if needed
-        if hasattr(self, 'install_flag') and self.install_flag:
-            command_args.append("-i")
-            flags.append("-i (install)")
-            
-        if hasattr(self, 'install_internal') and self.install_internal:
-            command_args.append("--install-internal")
-            flags.append("--install-internal")
-        
-        # Add GApplication options if enabled
-        if hasattr(self, 'gapplication_app_id') and self.gapplication_app_id:
-            command_args.append(f"--gapplication-app-id={self.gapplication_app_id}")
-            flags.append(f"--gapplication-app-id={self.gapplication_app_id}")
-        
-        # Script handling code
-        if self.script_path and os.path.exists(self.script_path):
-            # Environment variables need to be properly exported
-            env_vars_string = " ".join([f"export {key}={shlex.quote(str(value))}" for key, value in env_vars.items()])
-            
-            # Print debug information
-            print(f"[DEBUG] Using script: {self.script_path}")
-            print(f"[DEBUG] Script will execute binary: {atl_executable}")
-            
-            # Command with script (with or without sudo)
-            if self.sudo_password:
-                # With sudo - pass as environment variables
-                env_vars_exports = "; ".join([f"export {key}={shlex.quote(str(value))}" for key, value in env_vars.items()])
-                # Use the exact binary path without modifications
-                command = f"echo {shlex.quote(self.sudo_password)} | sudo -S bash -c '{env_vars_exports}; {self.script_path} {shlex.quote(atl_executable)} {' '.join(shlex.quote(arg) for arg in command_args[1:])}'"
-            else:
-                # Without sudo - pass as environment variables
-                env_vars_exports = "; ".join([f"export {key}={shlex.quote(str(value))}" for key, value in env_vars.items()])
-                # Use the exact binary path without modifications
-                command = f"bash -c '{env_vars_exports}; {self.script_path} {shlex.quote(atl_executable)} {' '.join(shlex.quote(arg) for arg in command_args[1:])}'"
+        # Decide how to launch: direct exec, or through the wrapper script
+        use_script = bool(self.script_path and os.path.exists(self.script_path))
+        if use_script:
+            logger.debug("Using script: %s", self.script_path)
+            logger.debug("Script will execute binary: %s", atl_executable)
         else:
-            # Basic command without script, but with environment variables
-            env_vars_exports = " ".join([f"{key}={shlex.quote(str(value))}" for key, value in env_vars.items()])
-            
-            # Print debug info
-            print(f"[DEBUG] Running direct command (no script)")
-            print(f"[DEBUG] Binary to execute: {atl_executable}")
-            
-            # Use the exact executable path without modifications - ensure it's properly quoted
-            command = f"{env_vars_exports} {shlex.quote(atl_executable)} {' '.join(shlex.quote(arg) for arg in command_args[1:])}"
+            logger.debug("Running direct command (no script)")
+            logger.debug("Binary to execute: %s", atl_executable)
+        
+        launch = build_launch_command(
+            command_args,
+            env_vars,
+            script_path=self.script_path if use_script else "",
+            sudo_password=self.sudo_password if use_script else ""
+        )
         
         # Run command using the terminal module from the window
         # Ensure terminal module is running - the terminal_manager is already initialized in the window class
-        print(f"[DEBUG] Terminal manager: {hasattr(self, 'terminal_manager')}")
+        logger.debug("Terminal manager: %s", hasattr(self, 'terminal_manager'))
         if hasattr(self, 'terminal_manager'):
-            print(f"[DEBUG] Terminal manager type: {type(self.terminal_manager).__name__}")
-            print(f"[DEBUG] Terminal manager running: {self.terminal_manager.is_running}")
+            logger.debug("Terminal manager type: %s", type(self.terminal_manager).__name__)
+            logger.debug("Terminal manager running: %s", self.terminal_manager.is_running)
             
         if not self.terminal_manager.is_running:
             self.terminal_manager.start()
-            print(f"[DEBUG] Started terminal manager, running: {self.terminal_manager.is_running}")
+            logger.debug("Started terminal manager, running: %s", self.terminal_manager.is_running)
         
         # Mark that we're using the terminal module
         self.using_terminal_module = True
@@ -555,12 +732,8 @@ def start_test(self, apk_path):
         # Add command info to terminal output in a more readable format
         buffer = self.terminal_output.get_buffer()
         
-        # Hide sudo password for security
-        if "sudo" in command:
-            # Mask the sudo password completely
-            display_command = command.replace(f"echo {shlex.quote(self.sudo_password)} | sudo -S", "sudo")
-        else:
-            display_command = command
+        # Display form of the command (never contains the sudo password)
+        display_command = launch["display"]
         
         # Create a more readable format for the command display
         command_summary = f"Command being executed:\n"
@@ -591,8 +764,20 @@ def start_test(self, apk_path):
         
         buffer.set_text(command_summary)
         
-        # Execute command in separate process
-        self.terminal_manager.execute_command(command, shell=True, env_vars=env_vars)
+        # Start the launch timeline for this run
+        self.launch_timeline = LaunchTimeline()
+        self.launch_analyzer = LogAnalyzer()
+        if not hasattr(self, 'launch_timings'):
+            self.launch_timings = {}
+        self.launch_timings[self.apk_files[self.current_apk_index]] = self.launch_timeline
+        
+        # Checkpoint: this APK is now in flight
+        if getattr(self, 'run_journal', None):
+            self.run_journal.record_start(self.apk_files[self.current_apk_index])
+        
+        # Execute command in separate process, on a pseudo-terminal unless disabled
+        use_pty = self.config.get_bool("use_pty", True)
+        self.terminal_manager.execute_command(launch["command"], shell=launch["shell"], env=launch["env"], pty=use_pty, input=launch["input"])
         
         # Set up GLib timeout to check for output from terminal module
         GLib.timeout_add(100, self.process_terminal_output)
@@ -611,8 +796,9 @@ def start_test(self, apk_path):
             self.terminal_logs = {}
         self.terminal_logs[current_apk] = command_summary
         
-        # Show test question and buttons after a short delay
-        GLib.timeout_add(2000, self.show_test_buttons)
+        # Show test question and buttons once the app draws a window,
+        # or after the configured maximum wait
+        self.schedule_test_prompt()
         
         # Show toast
         toast = Adw.Toast.new(f"Application started: {os.path.basename(apk_path)}")
@@ -629,20 +815,20 @@ def validate_options(self):
     invalid_options = []
     
     # Debug message to show what we're validating
-    print("DEBUG: VALIDATING OPTIONS:")
-    print(f"  activity_name: {self.activity_name}")
-    print(f"  instrumentation_class: {self.instrumentation_class}")
-    print(f"  uri_value: {self.uri_value}")
-    print(f"  window_width: {self.window_width}")
-    print(f"  window_height: {self.window_height}")
-    print(f"  jvm_options: {self.jvm_options}")
-    print(f"  string_keys: {self.string_keys}")
+    logger.debug("VALIDATING OPTIONS:")
+    logger.debug("  activity_name: %s", self.activity_name)
+    logger.debug("  instrumentation_class: %s", self.instrumentation_class)
+    logger.debug("  uri_value: %s", self.uri_value)
+    logger.debug("  window_width: %s", self.window_width)
+    logger.debug("  window_height: %s", self.window_height)
+    logger.debug("  jvm_options: %s", self.jvm_options)
+    logger.debug("  string_keys: %s", self.string_keys)
     
     # Validate activity name
     if self.activity_name:
         # Basic validation for activity name format (should be in format com.package.ActivityName)
         if not '.' in self.activity_name or len(self.activity_name.split('.')) < 2:
-            print(f"DEBUG: Invalid activity_name: {self.activity_name}")
+            logger.debug("Invalid activity_name: %s", self.activity_name)
             invalid_options.append(("Activity Name", 
                                     "Invalid activity name format. Should be in format 'com.package.ActivityName'",
                                     "activity_name"))
@@ -651,7 +837,7 @@ def validate_options(self):
     if self.instrumentation_class:
         # Basic validation for instrumentation class format
         if not '.' in self.instrumentation_class or len(self.instrumentation_class.split('.')) < 2:
-            print(f"DEBUG: Invalid instrumentation_class: {self.instrumentation_class}")
+            logger.debug("Invalid instrumentation_class: %s", self.instrumentation_class)
             invalid_options.append(("Instrumentation Class", 
                                     "Invalid instrumentation class format. Should be in format 'com.package.TestClass'",
                                     "instrumentation_class"))
@@ -660,7 +846,7 @@ def validate_options(self):
     if self.uri_value:
         # Basic validation for URI format (should start with a scheme like http://, https://, etc.)
         if not '://' in self.uri_value:
-            print(f"DEBUG: Invalid uri_value: {self.uri_value}")
+            logger.debug("Invalid uri_value: %s", self.uri_value)
             invalid_options.append(("URI", 
                                     "Invalid URI format. URI should include a scheme (e.g., http://, https://, content://)",
                                     "uri_value"))
@@ -670,12 +856,12 @@ def validate_options(self):
         try:
             width = int(self.window_width)
             if width <= 0 or width > 5000:
-                print(f"DEBUG: Invalid window_width: {self.window_width}")
+                logger.debug("Invalid window_width: %s", self.window_width)
                 invalid_options.append(("Window Width", 
                                         f"Invalid window width: {self.window_width}. Value should be between 1 and 5000.",
                                         "window_width"))
         except (ValueError, TypeError):
-            print(f"DEBUG: Invalid window_width type: {self.window_width}")
+            logger.debug("Invalid window_width type: %s", self.window_width)
             invalid_options.append(("Window Width", 
                                     f"Invalid window width: {self.window_width}. Must be a valid number.",
                                     "window_width"))
@@ -684,12 +870,12 @@ def validate_options(self):
         try:
             height = int(self.window_height)
             if height <= 0 or height > 5000:
-                print(f"DEBUG: Invalid window_height: {self.window_height}")
+                logger.debug("Invalid window_height: %s", self.window_height)
                 invalid_options.append(("Window Height", 
                                         f"Invalid window height: {self.window_height}. Value should be between 1 and 5000.",
                                         "window_height"))
         except (ValueError, TypeError):
-            print(f"DEBUG: Invalid window_height type: {self.window_height}")
+            logger.debug("Invalid window_height type: %s", self.window_height)
             invalid_options.append(("Window Height", 
                                     f"Invalid window height: {self.window_height}. Must be a valid number.",
                                     "window_height"))
@@ -698,7 +884,7 @@ def validate_options(self):
     if self.jvm_options:
         for i, option in enumerate(self.jvm_options):
             if not option.strip():
-                print(f"DEBUG: Invalid jvm_option at index {i}: '{option}'")
+                logger.debug("Invalid jvm_option at index %s: '%s'", i, option)
                 invalid_options.append(("JVM Option", 
                                         f"Empty JVM option at line {i+1}",
                                         "jvm_options"))
@@ -707,14 +893,14 @@ def validate_options(self):
     if self.string_keys:
         for key, value in self.string_keys.items():
             if not key.strip():
-                print(f"DEBUG: Invalid string_key: '{key}'")
+                logger.debug("Invalid string_key: '%s'", key)
                 invalid_options.append(("String Key", 
                                         "Empty key found in string key/value pairs",
                                         "string_keys"))
     
-    print(f"DEBUG: Validation complete. Found {len(invalid_options)} invalid options.")
+    logger.debug("Validation complete. Found %s invalid options.", len(invalid_options))
     if invalid_options:
-        print(f"DEBUG: Invalid options: {[option[0] for option in invalid_options]}")
+        logger.debug("Invalid options: %s", [option[0] for option in invalid_options])
     
     return invalid_options
 
@@ -776,33 +962,33 @@ def handle_invalid_options_response(dialog, response, window, apk_path, invalid_
         window.toast_overlay.add_toast(toast)
         
         # Debug message - before changes
-        print("DEBUG: BEFORE handling invalid options:")
-        print(f"  activity_name: {window.activity_name}")
-        print(f"  instrumentation_class: {window.instrumentation_class}")
-        print(f"  uri_value: {window.uri_value}")
-        print(f"  window_width: {window.window_width}")
-        print(f"  window_height: {window.window_height}")
-        print(f"  jvm_options: {window.jvm_options}")
-        print(f"  string_keys: {window.string_keys}")
-        print(f"  Invalid options to handle: {[option[0] for option in invalid_options]}")
+        logger.debug("BEFORE handling invalid options:")
+        logger.debug("  activity_name: %s", window.activity_name)
+        logger.debug("  instrumentation_class: %s", window.instrumentation_class)
+        logger.debug("  uri_value: %s", window.uri_value)
+        logger.debug("  window_width: %s", window.window_width)
+        logger.debug("  window_height: %s", window.window_height)
+        logger.debug("  jvm_options: %s", window.jvm_options)
+        logger.debug("  string_keys: %s", window.string_keys)
+        logger.debug("  Invalid options to handle: %s", [option[0] for option in invalid_options])
         
         # Store invalid options in the window object for later use in error display
         window.invalid_options = invalid_options
         
         # Just log the invalid options but don't modify them
         for option_name, error_message, option_attr in invalid_options:
-            print(f"DEBUG: Found invalid option: {option_name} - {option_attr}")
-            print(f"DEBUG: Keeping value: {getattr(window, option_attr)}")
+            logger.debug("Found invalid option: %s - %s", option_name, option_attr)
+            logger.debug("Keeping value: %s", getattr(window, option_attr))
         
         # Debug message - after changes (should be same as before)
-        print("DEBUG: AFTER handling invalid options:")
-        print(f"  activity_name: {window.activity_name}")
-        print(f"  instrumentation_class: {window.instrumentation_class}")
-        print(f"  uri_value: {window.uri_value}")
-        print(f"  window_width: {window.window_width}")
-        print(f"  window_height: {window.window_height}")
-        print(f"  jvm_options: {window.jvm_options}")
-        print(f"  string_keys: {window.string_keys}")
+        logger.debug("AFTER handling invalid options:")
+        logger.debug("  activity_name: %s", window.activity_name)
+        logger.debug("  instrumentation_class: %s", window.instrumentation_class)
+        logger.debug("  uri_value: %s", window.uri_value)
+        logger.debug("  window_width: %s", window.window_width)
+        logger.debug("  window_height: %s", window.window_height)
+        logger.debug("  jvm_options: %s", window.jvm_options)
+        logger.debug("  string_keys: %s", window.string_keys)
         
         # Show confirmation that settings are saved
         toast = Adw.Toast.new("Settings saved with invalid options preserved")
@@ -817,8 +1003,51 @@ def handle_invalid_options_response(dialog, response, window, apk_path, invalid_
             apk_name = os.path.basename(apk_path)
             window.show_test_settings_dialog(apk_name)
 
+def get_prompt_max_wait_ms(self):
+    """Maximum time to wait for window signals before showing the prompt"""
+    config = getattr(self, 'config', None) or {}
+    try:
+        seconds = float(config.get("prompt_max_wait_seconds", DEFAULT_PROMPT_MAX_WAIT_SECONDS))
+    except (TypeError, ValueError):
+        seconds = DEFAULT_PROMPT_MAX_WAIT_SECONDS
+    return max(0, int(seconds * 1000))
+
+def schedule_test_prompt(self):
+    """
+    Arm the Working/Not Working prompt for a new run.
+    
+    The prompt is shown as soon as the streaming detector sees the window
+    being created, when the process exits, or when the maximum wait
+    expires - whichever comes first.
+    """
+    cancel_test_prompt(self)
+    self.current_apk_ready = False
+    self.prompt_pending = True
+    self.prompt_run_id = getattr(self, 'prompt_run_id', 0) + 1
+    self.prompt_timeout_id = GLib.timeout_add(
+        get_prompt_max_wait_ms(self), on_prompt_max_wait, self, self.prompt_run_id
+    )
+
+def cancel_test_prompt(self):
+    """Disarm a pending prompt (the run was skipped or replaced)"""
+    self.prompt_pending = False
+    timeout_id = getattr(self, 'prompt_timeout_id', None)
+    if timeout_id:
+        GLib.source_remove(timeout_id)
+    self.prompt_timeout_id = None
+
+def on_prompt_max_wait(self, run_id):
+    """Maximum wait expired without window signals"""
+    if run_id == getattr(self, 'prompt_run_id', None):
+        self.prompt_timeout_id = None
+        if self.prompt_pending:
+            logger.debug("No window signals before maximum wait, showing prompt")
+            self.show_test_buttons()
+    return False  # Don't repeat the timeout
+
 def show_test_buttons(self):
     # Show test question and buttons
+    cancel_test_prompt(self)
     self.test_question_label.set_visible(True)
     self.test_button_box.set_visible(True)
     self.start_test_button.set_visible(False)
@@ -826,206 +1055,43 @@ def show_test_buttons(self):
     self.current_apk_ready = True
     return False  # Don't repeat the timeout 
 
-def detect_app_status(output_text):
-    """Improved detection of app status using multiple indicators"""
-    success_probability = 20  # Start with a base score of 20
-    detailed_reasons = []
-    
-    # 1. Window Creation Check - More relaxed indicators
-    window_created = check_window_creation(output_text)
-    if window_created:
-        success_probability += 25
-        detailed_reasons.append("Window creation signals detected")
-    else:
-        # Don't penalize too harshly - some logs might not show all signals
-        success_probability -= 10
-        detailed_reasons.append("Limited window creation signals")
-    
-    # 2. Crash Detection - This remains critical
-    crashes = check_for_crashes(output_text)
-    if crashes:
-        success_probability -= 60  # Stronger penalty for crashes
-        detailed_reasons.append(f"Application crashed: {crashes}")
-    else:
-        success_probability += 25  # Reward for no crashes
-        detailed_reasons.append("No crashes detected")
-    
-    # 3. UI Responsiveness Check - Made more lenient
-    ui_responsive = check_ui_responsiveness(output_text)
-    if ui_responsive:
-        success_probability += 20
-        detailed_reasons.append("UI appears responsive")
-    else:
-        # No penalty if we're not sure
-        detailed_reasons.append("UI responsiveness inconclusive")
-    
-    # 4. Proper Initialization - Essential check
-    proper_init = check_proper_initialization(output_text)
-    if proper_init:
-        success_probability += 20
-        detailed_reasons.append("Application initialized correctly")
-    else:
-        # Small penalty for lack of initialization signals
-        success_probability -= 10
-        detailed_reasons.append("Incomplete initialization signals")
-    
-    # 5. Check for activity creation - good indicator
-    if "Activity:" in output_text or "Starting activity" in output_text:
-        success_probability += 15
-        detailed_reasons.append("Activity startup detected")
+def track_launch_signals(self, text, timestamp=None):
+    """
+    Feed new terminal output to the streaming log analyzer.
     
-    # 6. Check for common success signals
-    if check_common_success_signals(output_text):
-        success_probability += 20
-        detailed_reasons.append("Common success signals detected")
-    
-    # Ensure we stay in the 0-100 range
-    success_probability = max(0, min(100, success_probability))
+    Only the new text is scanned, so the first window-creation and
+    UI-responsiveness hits can be marked on the launch timeline as soon
+    as they arrive. The same analyzer gives the final verdict on exit.
+    """
+    timeline = getattr(self, 'launch_timeline', None)
+    analyzer = getattr(self, 'launch_analyzer', None)
+    if timeline is None or analyzer is None:
+        return
     
-    # Format reasons into readable text
-    detailed_reason = ", ".join(detailed_reasons)
+    analyzer.feed(text)
     
-    # Determine final status - lower threshold to 40%
-    auto_detected = success_probability >= 40
+    if not timeline.has_mark("window_created") and analyzer.has_signal("window_created"):
+        timeline.mark("window_created", timestamp)
+        
+        # The app is on screen, ask the user right away
+        if getattr(self, 'prompt_pending', False):
+            self.show_test_buttons()
     
-    return auto_detected, success_probability, detailed_reason
+    if not timeline.has_mark("ui_responsive") and analyzer.has_signal("ui_responsive"):
+        timeline.mark("ui_responsive", timestamp)
 
-def check_window_creation(output_text):
-    """Check if application window was successfully created - expanded indicators"""
-    window_indicators = [
-        "createSurface",
-        "Surface created",
-        "ViewRootImpl",
-        "DecorView",
-        "WindowManager",
-        "addView",
-        "window visible",
-        "I/ActivityTaskManager",
-        "display added",
-        "Displayed",
-        "added window",
-        "shown window",
-        "Creating view",
-        "HwBinder",
-        "startActivity",
-        "ActivityRecord",
-        "SurfaceView",
-        "I/art",
-        "Starting display",
-        "starting window",
-        "relayoutWindow"
-    ]
-    
-    # Count how many window creation indicators are found
-    found_count = sum(1 for indicator in window_indicators if indicator in output_text)
-    return found_count >= 2  # Need at least 2 indicators to confirm window creation
-
-def check_for_crashes(output_text):
-    """Check for crash indicators in the output"""
-    crash_patterns = [
-        "FATAL EXCEPTION",
-        "Fatal signal",
-        "Force finishing activity",
-        "ANR ",
-        "Application Not Responding",
-        "Crash",
-        "java.lang.NullPointerException",
-        "SIGSEGV",
-        "SIGABRT",
-        "kernel panic",
-        "The application may be doing too much work on its main thread"
-    ]
-    
-    for pattern in crash_patterns:
-        if pattern in output_text:
-            return pattern
+def detect_app_status(output_text):
+    """
+    Detect app status from terminal output.
     
-    return None
-
-def check_ui_responsiveness(output_text):
-    """Check for indicators that UI is responsive and interactive - more indicators"""
-    responsive_indicators = [
-        "onDraw", 
-        "dispatchTouchEvent",
-        "ViewGroup.dispatchDraw",
-        "ViewGroup.updateDisplayListIfDirty",
-        "choreographer",
-        "onMeasure",
-        "onLayout",
-        "I/chatty",
-        "I/InputReader",
-        "I/InputDispatcher",
-        "drawFrame",
-        "animating",
-        "handle motion",
-        "MotionEvent",
-        "reportFocus",
-        "focus changed",
-        "setFocusedWindow",
-        "I/BufferQueue",
-        "Vsync",
-        "renderThread",
-        "draw()"
-    ]
-    
-    # Count how many responsiveness indicators are found
-    found_count = sum(1 for indicator in responsive_indicators if indicator in output_text)
-    return found_count >= 1  # Need only 1 indicator to suggest responsiveness
-
-def check_proper_initialization(output_text):
-    """Check if application initialized correctly - more indicators"""
-    init_indicators = [
-        "onCreate",
-        "onStart",
-        "onResume",
-        "Activity started",
-        "ApplicationInfo",
-        "PackageManager.getApplicationInfo",
-        "LoadedApk.makeApplication",
-        "Added application",
-        "ActivityThread.handleBindApplication",
-        "Initializing",
-        "ActivityManager",
-        "activityIdle",
-        "Starting: Intent",
-        "initializeProcessState",
-        "preload",
-        "initializing",
-        "Running ClassVerifier",
-        "initialized",
-        "ClassLoader",
-        "Starting activity"
-    ]
-    
-    found_count = sum(1 for indicator in init_indicators if indicator in output_text)
-    return found_count >= 2  # Need only 2 indicators to confirm initialization
+    Indicators, weights and the threshold are loaded from
+    res/detection_weights.json.
+    
+    Returns:
+        tuple: (auto_detected, success_probability, detailed_reason)
+    """
+    return analysis_to_status(analyze_text(output_text))
 
-def check_common_success_signals(output_text):
-    """Check for common signals that indicate successful app operation"""
-    success_signals = [
-        "I/zygote",
-        "I/ActivityManager", 
-        "I/art", 
-        "I/System", 
-        "I/OpenGLRenderer", 
-        "I/SurfaceFlinger",
-        "I/ActivityTaskManager",
-        "D/libEGL",
-        "D/gralloc",
-        "D/SurfaceControl",
-        "onConfigurationChanged",
-        "updateConfiguration",
-        "I/Choreographer",
-        "I/audio",
-        "I/media",
-        "I/MediaPlayer",
-        "I/TextInputI",
-        "I/ViewRootImpl",
-        "I/StatusBar",
-        "prepared",
-        "I/Timeline"
-    ]
-    
-    # Count how many success signals are found
-    found_count = sum(1 for signal in success_signals if signal in output_text)
-    return found_count >= 3  # Need at least 3 success signals 
\ No newline at end of file
+def analysis_to_status(analysis):
+    """Convert a log analysis to the (auto_detected, probability, reason) form"""
+    return analysis["working"], analysis["score"], ", ".join(analysis["reasons"])
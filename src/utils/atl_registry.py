@@ -0,0 +1,252 @@
+"""
+Registry of the android-translation-layer binaries seen by ATL GUI.
+
+Every ATL binary is probed once: its --version output, the commit hash
+the version string carries (for git builds) and the SHA-256 of the file
+are stored with the size and mtime of the binary in
+~/.config/atl-gui/atl_registry.json. While size and mtime stay the same,
+the stored probe is reused instead of starting ATL again, so opening the
+setup dialog or starting a batch does not spawn ATL or `which`.
+
+The fingerprint of a build (hash of the binary and its version output)
+keys cached verdicts (result_cache.py) and is recorded in every run
+journal, so results, durations and regressions can be tied to the ATL
+build that produced them.
+
+This module has no GTK dependency so it can be used from scripts.
+"""
+import os
+import re
+import json
+import logging
+import shutil
+import hashlib
+import threading
+import subprocess
+from pathlib import Path
+
+from src.utils.recent_apks import get_config_dir
+
+logger = logging.getLogger(__name__)
+
+# Read size used when hashing files
+HASH_BLOCK_SIZE = 1024 * 1024
+
+# Seconds ATL gets to print its version
+VERSION_TIMEOUT = 2
+
+# Bump when the stored probe changes to probe every binary again
+REGISTRY_VERSION = 1
+
+# Names the ATL executable is installed under, looked up in PATH
+ATL_NAMES = ["android-translation-layer", "android_translation_layer", "atl"]
+
+# Places ATL is installed to outside of PATH
+COMMON_LOCATIONS = [
+    "/usr/bin/android-translation-layer",
+    "/usr/local/bin/android-translation-layer",
+    "/opt/android-translation-layer/android-translation-layer",
+    "/opt/android-translation-layer/bin/android-translation-layer",
+    os.path.join(str(Path.home()), ".local/bin/android-translation-layer"),
+    os.path.join(str(Path.home()), "bin/android-translation-layer"),
+    os.path.join(str(Path.home()), "Android/android-translation-layer/android-translation-layer"),
+    os.path.join(str(Path.home()), "android-translation-layer/android-translation-layer"),
+]
+
+# Commit hash in a version string such as "0.1.0-r123.gabc1234" or "(git abc1234def)"
+COMMIT_RE = re.compile(r"(?:\bg|\bgit[ -]|[+.-]g?)(?=[0-9]*[a-f])([0-9a-f]{7,40})\b")
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry_file():
+    """Get the path to the ATL registry file."""
+    return os.path.join(get_config_dir(), "atl_registry.json")
+
+
+def file_digest(path):
+    """SHA-256 of a file, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def probe_atl_version(atl_path, timeout=VERSION_TIMEOUT):
+    """
+    Run ATL with --version.
+
+    Returns:
+        tuple: (version output or "", error message or None)
+    """
+    try:
+        result = subprocess.run([atl_path, "--version"], capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return "", "Timeout"
+    except OSError as e:
+        return "", f"Error: {e}"
+    if result.returncode != 0:
+        return "", "Failed to execute"
+    return result.stdout.strip(), None
+
+
+def parse_commit(version):
+    """Commit hash carried by a version string, or an empty string"""
+    match = COMMIT_RE.search(version or "")
+    return match.group(1) if match else ""
+
+
+def build_fingerprint(binary_hash, version):
+    """Identifier of an ATL build: hash of the binary and its version output"""
+    return hashlib.sha256(f"{binary_hash}\n{version}".encode("utf-8")).hexdigest()
+
+
+class AtlRegistry:
+    """Probes of ATL binaries, reused until a binary changes on disk"""
+
+    def __init__(self, path=None):
+        self.path = path or get_registry_file()
+        self._lock = threading.Lock()
+        self._binaries = {}
+        self.load()
+
+    def load(self):
+        """Read the registry file (a missing or corrupt file gives an empty registry)"""
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning("Error loading ATL registry %s: %s", self.path, e)
+            return
+        if not isinstance(data, dict):
+            logger.warning("Ignoring ATL registry %s: not a JSON object", self.path)
+            return
+        if data.get("version") == REGISTRY_VERSION:
+            self._binaries = data.get("binaries", {})
+
+    def save(self):
+        """Write the registry atomically"""
+        with self._lock:
+            data = {"version": REGISTRY_VERSION, "binaries": self._binaries}
+            temp_path = f"{self.path}.{os.getpid()}.tmp"
+            try:
+                with open(temp_path, "w") as f:
+                    json.dump(data, f, indent=2)
+                os.replace(temp_path, self.path)
+            except OSError as e:
+                logger.error("Error saving ATL registry %s: %s", self.path, e)
+
+    @staticmethod
+    def resolve(atl_executable):
+        """Absolute path of an ATL executable given as a path or a command name, or None"""
+        if not atl_executable:
+            return None
+        path = shutil.which(atl_executable) if os.sep not in atl_executable else atl_executable
+        if not path or not os.path.isfile(path):
+            return None
+        return os.path.realpath(path)
+
+    def probe(self, atl_executable):
+        """
+        Version and identity of an ATL binary.
+
+        Returns:
+            dict: path, size, mtime_ns, version, commit, sha256, fingerprint
+            and error (None if ATL printed its version), or None if the
+            executable does not exist
+        """
+        path = self.resolve(atl_executable)
+        if path is None:
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+
+        with self._lock:
+            known = self._binaries.get(path)
+        if known and known["size"] == stat.st_size and known["mtime_ns"] == stat.st_mtime_ns:
+            return dict(known)
+
+        try:
+            binary_hash = file_digest(path)
+        except OSError:
+            return None
+        version, error = probe_atl_version(path)
+        entry = {
+            "path": path,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "version": version,
+            "commit": parse_commit(version),
+            "sha256": binary_hash,
+            "fingerprint": build_fingerprint(binary_hash, version),
+            "error": error,
+        }
+        # A timeout may pass on the next try, so only keep definite answers
+        if error != "Timeout":
+            with self._lock:
+                self._binaries[path] = entry
+            self.save()
+        return dict(entry)
+
+    def fingerprint(self, atl_executable):
+        """
+        Identify an ATL build.
+
+        Returns:
+            str: The build fingerprint, or the plain name if the binary
+            could not be found
+        """
+        entry = self.probe(atl_executable)
+        return entry["fingerprint"] if entry else atl_executable
+
+    def describe(self, atl_executable):
+        """
+        Short record of an ATL build for run journals.
+
+        Returns:
+            dict: fingerprint, version and commit (empty strings when unknown)
+        """
+        entry = self.probe(atl_executable) or {}
+        return {
+            "fingerprint": entry.get("fingerprint", atl_executable),
+            "version": entry.get("version", ""),
+            "commit": entry.get("commit", ""),
+        }
+
+    def candidates(self):
+        """Existing executable ATL binaries: PATH entries first, then common locations"""
+        found = []
+        for location in [shutil.which(name) for name in ATL_NAMES] + COMMON_LOCATIONS:
+            if location and location not in found and os.path.isfile(location) and os.access(location, os.X_OK):
+                found.append(location)
+        return found
+
+    def detect(self):
+        """
+        Find an ATL binary that runs.
+
+        Returns:
+            str: Path of the first candidate that prints its version, else
+            the first candidate, else ""
+        """
+        candidates = self.candidates()
+        for location in candidates:
+            entry = self.probe(location)
+            if entry and entry["error"] is None:
+                return location
+        return candidates[0] if candidates else ""
+
+
+def get_atl_registry():
+    """The ATL registry of this process"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = AtlRegistry()
+        return _registry
@@ -0,0 +1,319 @@
+"""
+Headless batch testing for ATL GUI.
+
+Runs APKs one after another without the GUI: each APK is launched with
+the same argv and environment the testing view would use, left running
+for a fixed time, then stopped and judged from its output by the log
+analyzer. Every step is checkpointed in a run journal (see run_journal.py),
+so an interrupted batch can be resumed from the GUI or from atl_batch.py.
+
+This module has no GTK dependency so it can be used from scripts.
+"""
+import os
+import time
+import heapq
+import signal
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from src.utils.config_service import get_config, get_config_file
+from src.utils.atl_registry import get_atl_registry
+from src.utils.launch_command import build_atl_argv, build_launch_command
+from src.utils.log_analysis import LogAnalyzer
+from src.utils.run_journal import RunJournal
+from src.utils.test_scheduler import pack_workers
+from src.utils.retry_policy import RetryPolicy, is_flaky
+from src.utils.failure_clustering import failure_signature
+
+# Seconds an APK is left running before it is judged
+DEFAULT_TIMEOUT = 30
+
+# Seconds given to ATL to exit after SIGTERM
+KILL_GRACE = 3
+
+
+def load_gui_config():
+    """Read the GUI configuration (ATL path, environment variables...)"""
+    if not os.path.exists(get_config_file()):
+        return {}
+    return get_config().as_dict()
+
+
+def find_apk_files(paths):
+    """Expand folders into the APK files they contain, in sorted order"""
+    apk_files = []
+    for path in paths:
+        path = os.path.abspath(path)
+        if os.path.isdir(path):
+            apk_files.extend(sorted(
+                os.path.join(path, name) for name in os.listdir(path)
+                if name.lower().endswith(".apk")
+            ))
+        elif os.path.isfile(path):
+            apk_files.append(path)
+        else:
+            print(f"[WARNING] Not found: {path}")
+    return apk_files
+
+
+def _stop_process(process):
+    """Terminate the process group of a launch, then kill it if needed"""
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=KILL_GRACE)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+    except ProcessLookupError:
+        pass
+
+
+def run_apk(apk_path, atl_executable, launch_options=None, env_vars=None, timeout=DEFAULT_TIMEOUT):
+    """
+    Launch one APK and judge it from its output.
+
+    Args:
+        apk_path: APK to test
+        atl_executable: Path or name of the ATL binary
+        launch_options: Launch options as collected by the testing view
+        env_vars: Launch environment variables
+        timeout: Seconds to let the app run before stopping it
+
+    Returns:
+        dict: result ("working" or "not_working"), duration, score,
+        reasons and the exit code (None if ATL was still running)
+    """
+    argv, _ = build_atl_argv(atl_executable, apk_path, launch_options or {})
+    launch = build_launch_command(argv, env_vars or {})
+
+    analyzer = LogAnalyzer()
+    start = time.monotonic()
+    try:
+        process = subprocess.Popen(
+            launch["command"],
+            env=launch["env"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            stdin=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+    except OSError as e:
+        analyzer.feed(f"Failed to execute {atl_executable}: {e}\n")
+        return _verdict(analyzer, time.monotonic() - start, None)
+
+    exit_code = None
+    try:
+        output, _ = process.communicate(timeout=timeout)
+        exit_code = process.returncode
+    except subprocess.TimeoutExpired:
+        # Still running after the timeout - stop it and keep what it printed
+        _stop_process(process)
+        output, _ = process.communicate()
+    analyzer.feed(output.decode("utf-8", errors="replace"))
+    return _verdict(analyzer, time.monotonic() - start, exit_code)
+
+
+def _verdict(analyzer, duration, exit_code):
+    """Build the outcome of a launch from its analyzed output"""
+    analysis = analyzer.finish()
+    outcome = {
+        "result": "working" if analysis["working"] else "not_working",
+        "duration": round(duration, 3),
+        "score": analysis["score"],
+        "reasons": analysis["reasons"],
+        "exit_code": exit_code,
+    }
+    if outcome["result"] == "not_working":
+        outcome["signature"], outcome["label"] = failure_signature(analysis["errors"])
+    return outcome
+
+
+def run_batch(apk_files, atl_executable, launch_options=None, env_vars=None,
+              timeout=DEFAULT_TIMEOUT, journal=None, progress=None,
+              cache=None, changed_only=False, workers=1, history=None,
+              retry_policy=None):
+    """
+    Test a batch of APKs, checkpointing each verdict.
+
+    Args:
+        apk_files: APKs to test, in order
+        atl_executable: Path or name of the ATL binary
+        launch_options: Launch options shared by the whole batch
+        env_vars: Launch environment variables
+        timeout: Seconds each app is left running
+        journal: RunJournal to write to (a new one is created if None)
+        progress: Optional callback(index, total, apk_path, outcome)
+        cache: Optional ResultCache that receives every new verdict
+        changed_only: Reuse the cached verdict of APKs whose inputs did
+            not change instead of launching them again
+        workers: Number of APKs tested at the same time. The batch is
+            split with pack_workers() so the workers finish together.
+        history: Timing history for pack_workers() (loaded when None)
+        retry_policy: RetryPolicy for failed launches (no retries if None).
+            Retries are queued and picked up by workers that have finished
+            their share of the batch, so they don't delay first attempts.
+
+    Returns:
+        dict: APK path -> outcome (see run_apk), with the attempts list and
+        a flaky flag. Reused verdicts have "cached" set to True.
+    """
+    if journal is None:
+        journal = RunJournal.create(apk_files, {
+            "atl_executable_path": atl_executable,
+            "atl_build": get_atl_registry().describe(atl_executable),
+            "launch_options": launch_options or {},
+            "environment_variables": env_vars or {},
+        })
+    retry_policy = retry_policy or RetryPolicy(max_attempts=1)
+
+    cached, keys = {}, {}
+    if cache is not None:
+        _, cached, keys = cache.split_changed(apk_files, atl_executable, launch_options, env_vars)
+        if not changed_only:
+            cached = {}
+
+    results = {}
+    attempts = {}
+    first_outcomes = {}
+    condition = threading.Condition()
+    retry_queue = []  # heap of (ready time, sequence, APK path)
+    stop = threading.Event()
+    state = {"lanes_left": 0, "running": 0, "sequence": 0}
+
+    def finish_apk(apk_path, outcome):
+        with condition:
+            results[apk_path] = outcome
+            if progress:
+                progress(len(results) - 1, len(apk_files), apk_path, outcome)
+
+    def use_cached(apk_path):
+        entry = cached[apk_path]
+        outcome = {
+            "result": entry["result"],
+            "duration": entry.get("duration", 0.0),
+            "score": entry.get("score"),
+            "reasons": [],
+            "exit_code": None,
+            "attempts": [entry["result"]],
+            "flaky": False,
+            "cached": True,
+        }
+        journal.record_result(apk_path, outcome["result"], cached=True,
+                              duration=outcome["duration"], score=outcome["score"])
+        finish_apk(apk_path, outcome)
+
+    def attempt(apk_path):
+        tried = attempts.setdefault(apk_path, [])
+        if not tried:
+            journal.record_start(apk_path)
+        outcome = run_apk(apk_path, atl_executable, launch_options, env_vars, timeout)
+        tried.append(outcome["result"])
+        first = first_outcomes.setdefault(apk_path, outcome)
+
+        if retry_policy.needs_retry(tried):
+            journal.append({"event": "attempt", "apk": apk_path, "result": outcome["result"],
+                            "duration": outcome["duration"]})
+            with condition:
+                state["sequence"] += 1
+                ready = time.monotonic() + retry_policy.delay(len(tried))
+                heapq.heappush(retry_queue, (ready, state["sequence"], apk_path))
+                condition.notify_all()
+            return
+
+        verdict = retry_policy.verdict(tried)
+        flaky = is_flaky(tried)
+        # The first attempt's duration is what the scheduler should plan for
+        outcome = dict(outcome, result=verdict, duration=first["duration"],
+                       attempts=list(tried), flaky=flaky)
+        details = {"duration": outcome["duration"], "score": outcome["score"]}
+        if verdict == "not_working" and outcome.get("signature"):
+            details.update(signature=outcome["signature"], label=outcome["label"])
+        if len(tried) > 1:
+            details.update(attempts=list(tried), flaky=flaky)
+        journal.record_result(apk_path, verdict, **details)
+        if apk_path in keys and not flaky:
+            cache.store(keys[apk_path], apk_path, verdict,
+                        duration=outcome["duration"], score=outcome["score"])
+        finish_apk(apk_path, outcome)
+
+    def run_attempt(apk_path):
+        with condition:
+            state["running"] += 1
+        try:
+            attempt(apk_path)
+        finally:
+            with condition:
+                state["running"] -= 1
+                condition.notify_all()
+
+    def next_retry():
+        """Wait for a due retry, or None once no more retries can come"""
+        with condition:
+            while not stop.is_set():
+                if retry_queue:
+                    wait = retry_queue[0][0] - time.monotonic()
+                    if wait <= 0:
+                        return heapq.heappop(retry_queue)[2]
+                    condition.wait(wait)
+                elif state["lanes_left"] == 0 and state["running"] == 0:
+                    return None
+                else:
+                    condition.wait()
+        return None
+
+    def worker(lane):
+        try:
+            for apk_path in lane:
+                if stop.is_set():
+                    return
+                run_attempt(apk_path)
+        finally:
+            with condition:
+                state["lanes_left"] -= 1
+                condition.notify_all()
+
+        # Idle now - help with the retries of the whole batch
+        while True:
+            apk_path = next_retry()
+            if apk_path is None:
+                return
+            run_attempt(apk_path)
+
+    to_run = [apk_path for apk_path in apk_files if apk_path not in cached]
+    if workers > 1:
+        lanes = [lane for lane in pack_workers(to_run, workers, history) if lane]
+    else:
+        lanes = [to_run]
+    state["lanes_left"] = len(lanes)
+
+    executor = ThreadPoolExecutor(max_workers=max(1, len(lanes)))
+    try:
+        for apk_path in apk_files:
+            if apk_path in cached:
+                use_cached(apk_path)
+        futures = [executor.submit(worker, lane) for lane in lanes]
+        for future in futures:
+            # A timeout keeps the main thread responsive to Ctrl+C
+            while True:
+                try:
+                    future.result(timeout=0.5)
+                    break
+                except FutureTimeout:
+                    continue
+    except KeyboardInterrupt:
+        # Let the running launches end, start no new ones and leave the
+        # journal unfinished so the batch can be resumed
+        stop.set()
+        with condition:
+            condition.notify_all()
+        executor.shutdown(wait=True)
+        journal.close()
+        raise
+    finally:
+        executor.shutdown(wait=True)
+        if cache is not None:
+            cache.save()
+
+    journal.finish()
+    return results
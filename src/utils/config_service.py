@@ -0,0 +1,333 @@
+"""
+Configuration service for ATL GUI.
+
+config.json is loaded once per process and kept in memory; every window,
+dialog and handler reads and changes the same ConfigService:
+
+    config = get_config()
+    config.get_int("retry_attempts", 3)
+    config["atl_executable_path"] = path
+
+Changes are written back shortly after the last one (several changes in a
+row become one write), atomically through a temporary file, so a crash or
+a second writer never leaves a half-written file behind. watch() follows
+the file with a Gio.FileMonitor, so edits made with a text editor while
+the GUI runs are picked up and reported to the listeners.
+
+This module has no GTK dependency so it can be used from scripts; Gio is
+only imported by watch().
+"""
+import os
+import json
+import copy
+import atexit
+import logging
+import threading
+from pathlib import Path
+
+from src.utils.recent_apks import get_config_dir
+from src.utils.test_scheduler import DEFAULT_POLICY
+from src.utils.retry_policy import DEFAULT_MAX_ATTEMPTS, DEFAULT_BACKOFF
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for more changes before writing the file
+SAVE_DELAY = 0.5
+
+DEFAULT_CONFIG = {
+    "first_run": True,
+    "atl_executable_path": "",
+    "environment_variables": {
+        "SCALE": "2",
+        "LOG_LEVEL": "debug"
+    },
+    "display_mode": "auto",  # auto, wayland, x11
+    "prompt_max_wait_seconds": 10,
+    "test_order": DEFAULT_POLICY,
+    "retry_attempts": DEFAULT_MAX_ATTEMPTS,
+    "retry_backoff_seconds": DEFAULT_BACKOFF,
+    "use_pty": True,
+    "last_used_directory": str(Path.home()),
+    "recent_apks": []
+}
+
+# Spellings of booleans accepted in a hand-edited config.json
+TRUE_STRINGS = ("true", "1", "yes")
+FALSE_STRINGS = ("false", "0", "no")
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def parse_bool(value):
+    """
+    Read a boolean config value.
+
+    Raises:
+        ValueError: If value is not a bool, 0/1 or one of TRUE_STRINGS and
+        FALSE_STRINGS (in any case)
+    """
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str):
+        text = value.strip().lower()
+        if text in TRUE_STRINGS:
+            return True
+        if text in FALSE_STRINGS:
+            return False
+    raise ValueError(f"not a boolean: {value!r}")
+
+
+def get_config_file():
+    """Get the path to the configuration file."""
+    return os.path.join(get_config_dir(), "config.json")
+
+
+def get_default_config():
+    """A fresh copy of the default configuration"""
+    return copy.deepcopy(DEFAULT_CONFIG)
+
+
+class ConfigService:
+    """
+    In-memory configuration backed by config.json.
+
+    Reads never touch the disk. The service can be used like the dictionary
+    it replaces (config.get(key), config[key] = value), and assigning a
+    value schedules a write.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or get_config_file()
+        self._lock = threading.RLock()
+        self._data = {}
+        self._dirty = set()
+        self._stamp = None
+        self._save_timer = None
+        self._listeners = []
+        self._monitor = None
+        self.load()
+
+    def load(self):
+        """Read the file (a missing or corrupt file gives the defaults)"""
+        data, stamp = self._read()
+        with self._lock:
+            self._data = data if data is not None else get_default_config()
+            self._stamp = stamp
+            self._dirty.clear()
+
+    def _read(self):
+        """Parsed file contents and its (size, mtime), or None if unreadable"""
+        try:
+            stamp = self._file_stamp()
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None, None
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning("Error loading config %s: %s", self.path, e)
+            return None, None
+        if not isinstance(data, dict):
+            logger.warning("Ignoring config %s: not a JSON object", self.path)
+            return None, None
+        return data, stamp
+
+    def _file_stamp(self):
+        stat = os.stat(self.path)
+        return stat.st_size, stat.st_mtime_ns
+
+    # Reading
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._data.get(key, default)
+            # Callers get their own copy of lists and dictionaries
+            return copy.deepcopy(value) if isinstance(value, (dict, list)) else value
+
+    def _get_typed(self, key, default, convert):
+        value = self.get(key, default)
+        try:
+            return convert(value)
+        except (TypeError, ValueError):
+            logger.warning("Config value %s=%r is invalid, using %r", key, value, default)
+            return default
+
+    def get_str(self, key, default=""):
+        return self._get_typed(key, default, str)
+
+    def get_int(self, key, default=0):
+        return self._get_typed(key, default, int)
+
+    def get_float(self, key, default=0.0):
+        return self._get_typed(key, default, float)
+
+    def get_bool(self, key, default=False):
+        return self._get_typed(key, default, parse_bool)
+
+    def get_dict(self, key, default=None):
+        value = self.get(key)
+        return value if isinstance(value, dict) else dict(default or {})
+
+    def as_dict(self):
+        """A copy of the whole configuration"""
+        with self._lock:
+            return copy.deepcopy(self._data)
+
+    def __getitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        return self.get(key)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+    # Writing
+
+    def set(self, key, value):
+        """Change one value and schedule a write"""
+        self.update({key: value})
+
+    __setitem__ = set
+
+    def update(self, values):
+        """Change several values and schedule one write"""
+        with self._lock:
+            changed = [key for key, value in values.items() if self._data.get(key, object()) != value]
+            if not changed:
+                return
+            for key in changed:
+                self._data[key] = copy.deepcopy(values[key])
+            self._dirty.update(changed)
+            self._schedule_save()
+
+    def _schedule_save(self):
+        """Restart the write timer (called with the lock held)"""
+        if self._save_timer is not None:
+            self._save_timer.cancel()
+        self._save_timer = threading.Timer(SAVE_DELAY, self.flush)
+        self._save_timer.daemon = True
+        self._save_timer.start()
+
+    def flush(self):
+        """
+        Write pending changes now.
+
+        Returns:
+            bool: False if the file could not be written
+        """
+        with self._lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            if not self._dirty:
+                return True
+            temp_path = f"{self.path}.tmp"
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with open(temp_path, "w") as f:
+                    json.dump(self._data, f, indent=2)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temp_path, self.path)
+                # Remember our own write so the file monitor ignores it
+                self._stamp = self._file_stamp()
+            except OSError as e:
+                logger.error("Error saving config %s: %s", self.path, e)
+                return False
+            self._dirty.clear()
+            logger.debug("Config saved to %s", self.path)
+            return True
+
+    # External changes
+
+    def connect_changed(self, callback):
+        """
+        Call callback(service, keys) when the file is changed by another
+        program; keys is the set of changed keys.
+        """
+        self._listeners.append(callback)
+
+    def disconnect_changed(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def reload(self):
+        """
+        Re-read the file if someone else changed it.
+
+        Values changed here and not written yet are kept.
+
+        Returns:
+            set: Keys whose values changed
+        """
+        try:
+            if self._file_stamp() == self._stamp:
+                return set()
+        except OSError:
+            return set()
+        data, stamp = self._read()
+        if data is None:
+            # Probably caught halfway through a non-atomic save; the next
+            # change event reads it again
+            return set()
+        with self._lock:
+            for key in self._dirty:
+                if key in self._data:
+                    data[key] = self._data[key]
+            changed = {key for key in set(data) | set(self._data) if data.get(key) != self._data.get(key)}
+            self._data = data
+            self._stamp = stamp
+        if changed:
+            logger.info("Config reloaded, changed: %s", ", ".join(sorted(changed)))
+            for callback in list(self._listeners):
+                try:
+                    callback(self, changed)
+                except Exception:
+                    logger.exception("Error in config listener")
+        return changed
+
+    def watch(self):
+        """Follow external edits of the file with a Gio.FileMonitor (once)"""
+        if self._monitor is not None:
+            return True
+        try:
+            from gi.repository import Gio
+        except ImportError:
+            return False
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._monitor = Gio.File.new_for_path(self.path).monitor_file(Gio.FileMonitorFlags.WATCH_MOVES, None)
+        self._monitor.connect("changed", self._on_file_changed)
+        return True
+
+    def _on_file_changed(self, monitor, file, other_file, event_type):
+        from gi.repository import Gio
+        if event_type in (Gio.FileMonitorEvent.CHANGES_DONE_HINT, Gio.FileMonitorEvent.CREATED,
+                          Gio.FileMonitorEvent.MOVED_IN, Gio.FileMonitorEvent.RENAMED):
+            self.reload()
+
+
+def get_config():
+    """The configuration service of this process"""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = ConfigService()
+        return _service
+
+
+def flush_config():
+    """Write pending configuration changes now (no-op before get_config)"""
+    if _service is None:
+        return True
+    return _service.flush()
+
+
+# Changes made just before exiting are not lost
+atexit.register(flush_config)
@@ -0,0 +1,170 @@
+"""
+App status scoring for ATL GUI.
+
+Scores ATL terminal output to decide whether an application worked. The
+indicators, weights and thresholds are loaded from
+res/detection_weights.json so they can be tuned against labeled logs
+(see benchmarks/detection_benchmark.py) without touching the code.
+
+This module has no GTK dependency so it can be used from scripts.
+"""
+import os
+import json
+
+# Default rule file shipped with the application
+DEFAULT_WEIGHTS_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "res", "detection_weights.json"
+)
+
+
+class DetectionSignal:
+    """One group of indicators and the score it contributes"""
+
+    def __init__(self, spec):
+        self.name = spec["name"]
+        self.ignore_case = bool(spec.get("ignore_case", False))
+        self.indicators = list(spec.get("indicators", []))
+        # Indicators are compared against lowercased text when ignoring case
+        self.patterns = [indicator.lower() for indicator in self.indicators] if self.ignore_case else self.indicators
+        self.min_matches = max(1, int(spec.get("min_matches", 1)))
+        self.weight_present = spec.get("weight_present", 0)
+        self.weight_absent = spec.get("weight_absent", 0)
+        self.reason_present = spec.get("reason_present")
+        self.reason_absent = spec.get("reason_absent")
+
+    def match(self, text, lowered_text=None):
+        """
+        Check the signal against a log.
+
+        Args:
+            text: Log text
+            lowered_text: text.lower(), passed in so it is only computed once
+
+        Returns:
+            list: Matched indicators (stops at min_matches), in rule order
+        """
+        haystack = lowered_text if self.ignore_case else text
+        matched = []
+        for indicator, pattern in zip(self.indicators, self.patterns):
+            if pattern in haystack:
+                matched.append(indicator)
+                if len(matched) >= self.min_matches:
+                    break
+        return matched
+
+
+class DetectionScorer:
+    """Additive scorer driven by a rule dictionary"""
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.base_score = rules.get("base_score", 0)
+        self.threshold = rules.get("threshold", 50)
+        self.not_working_threshold = rules.get("not_working_threshold", self.threshold)
+        self.signals = [DetectionSignal(spec) for spec in rules.get("signals", [])]
+        self._signals_by_name = {signal.name: signal for signal in self.signals}
+        self._needs_lowercase = any(signal.ignore_case for signal in self.signals)
+
+    @classmethod
+    def from_file(cls, path=None):
+        """Create a scorer from a JSON rule file (defaults to the shipped weights)"""
+        with open(path or DEFAULT_WEIGHTS_FILE, "r") as f:
+            return cls(json.load(f))
+
+    def signal(self, name):
+        """Get a signal by name, or None if the rules don't define it"""
+        return self._signals_by_name.get(name)
+
+    def evaluate(self, text, threshold=None):
+        """
+        Score a log.
+
+        Args:
+            text: Log text
+            threshold: Override the working threshold from the rules
+
+        Returns:
+            dict: score (0-100), working flag, reasons list and matched indicators per signal
+        """
+        lowered_text = text.lower() if self._needs_lowercase else None
+        matches = {signal.name: signal.match(text, lowered_text) for signal in self.signals}
+        return self.score_matches(matches, threshold)
+
+    def score_matches(self, matches, threshold=None):
+        """
+        Score already collected indicator matches.
+
+        Args:
+            matches: Dictionary of signal name -> matched indicators in rule order
+            threshold: Override the working threshold from the rules
+
+        Returns:
+            dict: Same as evaluate()
+        """
+        score = self.base_score
+        reasons = []
+
+        for signal in self.signals:
+            matched = matches.get(signal.name, [])
+            present = len(matched) >= signal.min_matches
+
+            if present:
+                score += signal.weight_present
+                reason = signal.reason_present
+            else:
+                score += signal.weight_absent
+                reason = signal.reason_absent
+
+            if reason:
+                reasons.append(reason.format(match=matched[0] if matched else ""))
+
+        # Keep the score in the 0-100 range
+        score = max(0, min(100, score))
+        if threshold is None:
+            threshold = self.threshold
+
+        return {
+            "score": score,
+            "working": score >= threshold,
+            "reasons": reasons,
+            "matches": matches,
+        }
+
+    def score(self, text):
+        """
+        Score a log in the form used by the GUI.
+
+        Returns:
+            tuple: (auto_detected, success_probability, detailed_reason)
+        """
+        result = self.evaluate(text)
+        return result["working"], result["score"], ", ".join(result["reasons"])
+
+    def verdict(self, text):
+        """
+        Decide a result for an untested log.
+
+        Returns:
+            str or None: "working", "not_working", or None when the score
+            falls between the two thresholds
+        """
+        return self.verdict_for_score(self.evaluate(text)["score"])
+
+    def verdict_for_score(self, score):
+        """Map a score to "working", "not_working" or None (see verdict())"""
+        if score >= self.threshold:
+            return "working"
+        if score <= self.not_working_threshold:
+            return "not_working"
+        return None
+
+
+_default_scorer = None
+
+def get_default_scorer():
+    """Get the scorer for the shipped weights (loaded once)"""
+    global _default_scorer
+    if _default_scorer is None:
+        _default_scorer = DetectionScorer.from_file()
+    return _default_scorer
@@ -6,13 +6,155 @@ Provides functions to set up and configure display backends (X11/Wayland)
 import os
 import gi
 import sys
-import subprocess
+import json
+import logging
+import shutil
+import hashlib
 import platform
+from pathlib import Path
 
 gi.require_version('Gtk', '4.0')
 gi.require_version('Gdk', '4.0')
 from gi.repository import Gtk, Gdk
 
+logger = logging.getLogger(__name__)
+
+# Environment variables that identify a desktop session; a probe result is
+# reused as long as none of them changed
+SESSION_ENV_VARS = (
+    'WAYLAND_DISPLAY', 'DISPLAY', 'XDG_SESSION_TYPE', 'XDG_SESSION_ID',
+    'XDG_CURRENT_DESKTOP', 'XDG_RUNTIME_DIR', 'PATH',
+)
+
+PROBE_CACHE_VERSION = 1
+
+# Process names of Wayland compositors, as found in /proc/<pid>/comm
+COMPOSITOR_PROCESSES = {
+    'gnome-shell': 'Mutter (GNOME)',
+    'kwin_wayland': 'KWin (KDE Plasma)',
+    'Hyprland': 'Hyprland',
+    'sway': 'Sway',
+    'weston': 'weston',
+    'wayfire': 'wayfire',
+    'river': 'river',
+    'labwc': 'labwc',
+    'niri': 'niri',
+}
+
+# Compositor commands looked up in PATH when no compositor process is found
+COMPOSITOR_COMMANDS = ['sway', 'hyprctl', 'weston', 'wayfire', 'river']
+
+# Session id of processes outside a login session (/proc/self/sessionid)
+NO_SESSION_ID = '4294967295'
+
+_probe = None
+
+def get_probe_cache_file():
+    """File the display probe is cached in: the session runtime dir if there is one"""
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return os.path.join(runtime_dir, 'atl-gui-display.json')
+    cache_dir = os.path.join(str(Path.home()), '.cache', 'atl-gui')
+    os.makedirs(cache_dir, exist_ok=True)
+    return os.path.join(cache_dir, 'display.json')
+
+def _session_key():
+    """Hash of the session environment variables"""
+    values = [f"{name}={os.environ.get(name, '')}" for name in SESSION_ENV_VARS]
+    return hashlib.sha256("\n".join(values).encode()).hexdigest()
+
+def _read_logind_session_type():
+    """Type of our login session (wayland, x11, tty...) as recorded by systemd-logind, or None"""
+    session_id = os.environ.get('XDG_SESSION_ID')
+    if not session_id:
+        try:
+            with open('/proc/self/sessionid') as f:
+                session_id = f.read().strip()
+        except OSError:
+            return None
+    if not session_id or session_id == NO_SESSION_ID:
+        return None
+    try:
+        with open(os.path.join('/run/systemd/sessions', session_id)) as f:
+            for line in f:
+                if line.startswith('TYPE='):
+                    return line.split('=', 1)[1].strip()
+    except OSError:
+        pass
+    return None
+
+def _find_running_compositor():
+    """Name of a Wayland compositor process of the current user, or None"""
+    uid = os.getuid()
+    try:
+        pids = [entry for entry in os.listdir('/proc') if entry.isdigit()]
+    except OSError:
+        return None
+    for pid in pids:
+        try:
+            if os.stat(f'/proc/{pid}').st_uid != uid:
+                continue
+            with open(f'/proc/{pid}/comm') as f:
+                name = f.read().strip()
+        except OSError:
+            continue
+        if name in COMPOSITOR_PROCESSES:
+            return COMPOSITOR_PROCESSES[name]
+    return None
+
+def _find_installed_compositor():
+    """First compositor command found in PATH, or None"""
+    for command in COMPOSITOR_COMMANDS:
+        if shutil.which(command):
+            return command
+    return None
+
+def probe_display_environment(refresh=False):
+    """
+    Facts about the display session that take more than an environment lookup.
+    
+    The probe reads /proc and the logind session files (no subprocesses) and
+    runs once per session: the result is kept in memory and in a small cache
+    file keyed by the session environment variables.
+    
+    Args:
+        refresh: Probe again even if a cached result exists
+    
+    Returns:
+        dict: session_type (from logind, or None), running_compositor and
+            installed_compositor (or None)
+    """
+    global _probe
+    key = _session_key()
+    if _probe is not None and _probe['key'] == key and not refresh:
+        return _probe['probe']
+    
+    cache_file = get_probe_cache_file()
+    if not refresh:
+        try:
+            with open(cache_file) as f:
+                cached = json.load(f)
+            if cached.get('version') == PROBE_CACHE_VERSION and cached.get('key') == key:
+                _probe = cached
+                return _probe['probe']
+        except (OSError, ValueError):
+            pass
+    
+    probe = {
+        'session_type': _read_logind_session_type(),
+        'running_compositor': _find_running_compositor(),
+        'installed_compositor': _find_installed_compositor(),
+    }
+    _probe = {'version': PROBE_CACHE_VERSION, 'key': key, 'probe': probe}
+    try:
+        temp_file = f"{cache_file}.{os.getpid()}.tmp"
+        with open(temp_file, 'w') as f:
+            json.dump(_probe, f)
+        os.replace(temp_file, cache_file)
+    except OSError as e:
+        logger.warning("Could not cache display probe: %s", e)
+    return probe
+
 def detect_wayland():
     """
     Detect if Wayland is available as the current display server
@@ -26,19 +168,9 @@ def detect_wayland():
     if os.environ.get('XDG_SESSION_TYPE') == 'wayland':
         return True
     
-    # Additional check for current display server
-    try:
-        # Try to detect through loginctl
-        result = subprocess.run(
-            ['loginctl', 'show-session', '$(loginctl | grep $(whoami) | awk \'{print $1}\')', '-p', 'Type'],
-            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, shell=True
-        )
-        if 'wayland' in result.stdout.lower():
-            return True
-    except Exception:
-        pass
-    
-    return False
+    # Additional check for current display server: the session type
+    # systemd-logind recorded (what loginctl show-session -p Type prints)
+    return probe_display_environment()['session_type'] == 'wayland'
 
 def get_display_server_details():
     """
@@ -77,15 +209,11 @@ def get_display_server_details():
             elif 'sway' in details['desktop_session'].lower():
                 details['compositor'] = 'Sway'
                 
-            # Try to detect Wayland compositor through available commands
-            for compositor in ['sway', 'hyprctl', 'weston', 'wayfire', 'river']:
-                try:
-                    subprocess.run(['which', compositor], check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-                    if details['compositor'] == 'unknown':
-                        details['compositor'] = compositor
-                    break
-                except subprocess.CalledProcessError:
-                    pass
+            # Fall back to a running compositor process, then to an
+            # installed compositor command
+            probe = probe_display_environment()
+            if details['compositor'] == 'unknown':
+                details['compositor'] = probe['running_compositor'] or probe['installed_compositor'] or 'unknown'
         except Exception:
             pass
     else:
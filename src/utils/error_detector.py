@@ -1,27 +1,71 @@
 #!/usr/bin/env python3
+import os
 import re
+import sys
+import mmap
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Tuple
 
+from src.utils.log_analysis import PATTERN_RULES
+
+# Newlines are counted in chunks of this size to keep copies small
+CHUNK_SIZE = 4 * 1024 * 1024
+
 class ErrorDetector:
     def __init__(self):
-        self.error_patterns = {
-            'runtime': r'java\.lang\.RuntimeException|java\.lang\.NullPointerException|java\.lang\.ClassNotFoundException',
-            'manifest': r'Unknown element under <manifest>|Failed to open file.*AndroidManifest\.xml',
-            'dex': r'Failed to compile dex file|No dex files in zip file',
-            'activity': r'Failed to find Activity to launch URI',
-            'permission': r'uses-permission-sdk-',
-            'assets': r'Failed to open file.*resources\.arsc'
-        }
-        
-        self.error_categories = {
-            'runtime': 'Runtime Error',
-            'manifest': 'Manifest Error',
-            'dex': 'DEX Error',
-            'activity': 'Activity Error',
-            'permission': 'Permission Error',
-            'assets': 'Assets Error'
-        }
+        self.error_patterns = {name: pattern for name, _, pattern in PATTERN_RULES}
+        self.error_categories = {name: category for name, category, _ in PATTERN_RULES}
+        self._compiled = {}
+
+    def _branches(self, name):
+        """
+        Compiled bytes regexes for the top-level alternatives of a pattern.
+
+        Each alternative starts with a literal, which lets re skip ahead with
+        a fast substring search. A single alternation (of one pattern or of
+        all of them) loses that and is several times slower.
+        """
+        if name not in self._compiled:
+            self._compiled[name] = [re.compile(branch.encode()) for branch in split_alternatives(self.error_patterns[name])]
+        return self._compiled[name]
+
+    def _scan(self, data, size):
+        """
+        Find the first line of each pattern in a bytes-like buffer.
+
+        Returns a dict: pattern name -> line number
+        """
+        first_offsets = {}
+        for name in self.error_patterns:
+            for regex in self._branches(name):
+                match = regex.search(data, 0, size)
+                if match and (name not in first_offsets or match.start() < first_offsets[name]):
+                    first_offsets[name] = match.start()
+
+        # Convert offsets to line numbers in one pass, a chunk at a time
+        hits = {}
+        line_number = 1
+        chunk_start = 0
+        for name, offset in sorted(first_offsets.items(), key=lambda item: item[1]):
+            while chunk_start + CHUNK_SIZE <= offset:
+                line_number += data[chunk_start:chunk_start + CHUNK_SIZE].count(b"\n")
+                chunk_start += CHUNK_SIZE
+            hits[name] = line_number + data[chunk_start:offset].count(b"\n")
+        return hits
+
+    def find_patterns(self, log_file_path: str) -> Dict[str, int]:
+        """
+        Memory-map a log file and find the first line of each error pattern.
+        Bytes are matched directly, so logs that are not valid UTF-8 work too.
+        Returns a dict: pattern name -> line number
+        """
+        with open(log_file_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return {}
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return self._scan(data, size)
 
     def analyze_log_file(self, log_file_path: str) -> List[Tuple[str, str, str]]:
         """
@@ -30,25 +74,41 @@ class ErrorDetector:
         """
         errors = []
         try:
-            with open(log_file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                
-            # Check for each error pattern
-            for pattern_name, pattern in self.error_patterns.items():
-                # Use search instead of finditer since we just want to know if any match exists
-                match = re.search(pattern, content)
-                if match:
+            hits = self.find_patterns(log_file_path)
+
+            # Report categories in rule order
+            for pattern_name in self.error_patterns:
+                if pattern_name in hits:
                     errors.append((
                         self.error_categories[pattern_name],
                         f"Found {pattern_name.replace('_', ' ').title()} Issues",
-                        ""
+                        f"First seen on line {hits[pattern_name]}"
                     ))
-                    
+
         except Exception as e:
             errors.append(('File Error', f'Failed to read log file: {str(e)}', ''))
-            
+
         return errors
 
+    def analyze_many(self, log_file_paths, max_workers=None) -> Dict[str, List[Tuple[str, str, str]]]:
+        """
+        Analyze many log files in parallel using a process pool.
+        Returns a dict: log file path -> list of errors (see analyze_log_file)
+        """
+        paths = [str(path) for path in log_file_paths]
+        if len(paths) < 2:
+            return {path: self.analyze_log_file(path) for path in paths}
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(
+                _analyze_in_worker,
+                paths,
+                [self.error_patterns] * len(paths),
+                [self.error_categories] * len(paths),
+                chunksize=max(1, len(paths) // ((max_workers or os.cpu_count() or 1) * 4)),
+            )
+            return dict(zip(paths, results))
+
     def get_error_summary(self, log_file_path: str) -> Dict[str, int]:
         """
         Get a summary of error counts by category for a log file.
@@ -57,4 +117,67 @@ class ErrorDetector:
         summary = {}
         for category, _, _ in errors:
             summary[category] = summary.get(category, 0) + 1
-        return summary 
\ No newline at end of file
+        return summary
+
+def split_alternatives(pattern):
+    """Split a regex on its top-level | (outside groups and character classes)"""
+    branches = []
+    depth = 0
+    in_class = False
+    escaped = False
+    current = ""
+    for char in pattern:
+        if escaped:
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif in_class:
+            in_class = char != "]"
+        elif char == "[":
+            in_class = True
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "|" and depth == 0:
+            branches.append(current)
+            current = ""
+            continue
+        current += char
+    branches.append(current)
+    return branches
+
+def _analyze_in_worker(log_file_path, error_patterns, error_categories):
+    """Process pool entry point, keeps the caller's pattern table"""
+    detector = ErrorDetector()
+    detector.error_patterns = error_patterns
+    detector.error_categories = error_categories
+    return detector.analyze_log_file(log_file_path)
+
+def collect_log_files(paths):
+    """Expand directories into the log files they contain"""
+    log_files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            log_files.extend(sorted(str(p) for p in path.rglob("*") if p.is_file() and p.suffix in (".log", ".txt")))
+        else:
+            log_files.append(str(path))
+    return log_files
+
+def main():
+    """Triage archived logs: error_detector.py <log file or directory>..."""
+    if len(sys.argv) < 2:
+        print(f"Usage: {sys.argv[0]} <log file or directory>...")
+        return 1
+
+    results = ErrorDetector().analyze_many(collect_log_files(sys.argv[1:]))
+    for path, errors in results.items():
+        print(path)
+        if not errors:
+            print("    No known errors")
+        for category, message, details in errors:
+            print(f"    {category}: {message}" + (f" ({details})" if details else ""))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
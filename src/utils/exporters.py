@@ -0,0 +1,275 @@
+"""
+Result exporters for ATL GUI.
+
+Each exporter writes one row per APK to an open text file as the rows
+arrive, so a run of any size is exported in constant memory. Rows are
+plain dictionaries:
+
+    {"apk": path, "result": "working", "duration": 1.2, "score": 65,
+     "attempts": [...], "flaky": False, "cached": False, "time": ...}
+
+Only "apk" and "result" are required; "timings" (a launch timeline from
+LaunchTimeline.to_dict) is printed by the text report. Formats that need totals before
+the first row (JUnit XML, HTML) get them from a first pass over the rows,
+which is why export() takes a function returning a fresh row iterator
+rather than the iterator itself.
+
+This module has no GTK dependency so it can be used from scripts.
+"""
+import os
+import csv
+import json
+import html
+import datetime
+from xml.sax.saxutils import escape, quoteattr
+
+from src.utils.run_journal import iter_results
+from src.utils.launch_timing import format_timeline
+
+EXPORTERS = {}
+
+RESULT_LABELS = {
+    "working": "Working",
+    "not_working": "Not Working",
+    "skipped": "Skipped",
+}
+
+
+def register_exporter(name):
+    """Decorator adding an exporter class to EXPORTERS"""
+    def decorator(cls):
+        cls.name = name
+        EXPORTERS[name] = cls
+        return cls
+    return decorator
+
+
+def journal_rows(journal_path):
+    """
+    Rows of a run journal, read one line at a time.
+
+    An APK tested again in the same batch has several result events; only
+    its last one is a row. A first pass over the journal counts the
+    superseded events per APK path, so no row is kept in memory.
+    """
+    seen = set()
+    superseded = {}
+    for event in iter_results(journal_path):
+        apk_path = event.get("apk")
+        if apk_path in seen:
+            superseded[apk_path] = superseded.get(apk_path, 0) + 1
+        seen.add(apk_path)
+    del seen
+
+    for event in iter_results(journal_path):
+        apk_path = event.get("apk")
+        if superseded.get(apk_path):
+            superseded[apk_path] -= 1
+            continue
+        row = dict(event)
+        row.pop("event", None)
+        yield row
+
+
+def summarize(rows):
+    """Count the results of a row stream"""
+    summary = {"total": 0, "working": 0, "not_working": 0, "skipped": 0, "flaky": 0, "duration": 0.0}
+    for row in rows:
+        summary["total"] += 1
+        if row.get("result") in summary:
+            summary[row["result"]] += 1
+        if row.get("flaky"):
+            summary["flaky"] += 1
+        summary["duration"] += row.get("duration") or 0.0
+    return summary
+
+
+def format_for_path(path, default="text"):
+    """Pick the exporter from a file extension"""
+    extension = os.path.splitext(path)[1].lower()
+    for name, exporter in EXPORTERS.items():
+        if extension in exporter.extensions:
+            return name
+    return default
+
+
+class Exporter:
+    """Base class: write_header, then write_row per APK, then write_footer"""
+
+    name = None
+    extensions = ()
+    needs_summary = False
+
+    def __init__(self, stream, title="ATL GUI results", sections=()):
+        self.stream = stream
+        self.title = title
+        # (heading, lines) written after the rows by formats meant for reading
+        self.sections = sections
+
+    def write_header(self, summary=None):
+        pass
+
+    def write_row(self, row):
+        raise NotImplementedError
+
+    def write_footer(self):
+        pass
+
+
+@register_exporter("text")
+class TextExporter(Exporter):
+    """Human readable report, as shown by the results view"""
+
+    extensions = (".txt",)
+    needs_summary = True
+
+    def write_header(self, summary=None):
+        self.stream.write("===== ANDROID TRANSLATION LAYER - APPLICATION RESULTS =====\n")
+        self.stream.write(f"Date: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+        self.stream.write("===== SUMMARY =====\n")
+        self.stream.write(f"Total Applications: {summary['total']}\n")
+        self.stream.write(f"Working: {summary['working']}\n")
+        self.stream.write(f"Not Working: {summary['not_working']}\n")
+        self.stream.write(f"Skipped: {summary['skipped']}\n\n")
+        self.stream.write("===== DETAILED RESULTS =====\n")
+
+    def write_row(self, row):
+        label = RESULT_LABELS.get(row["result"], row["result"])
+        flaky = f" (flaky: {', '.join(row['attempts'])})" if row.get("flaky") else ""
+        self.stream.write(f"{os.path.basename(row['apk'])}: {label}{flaky}\n")
+        if row.get("timings"):
+            for line in format_timeline(row["timings"]):
+                self.stream.write(f"    {line}\n")
+
+    def write_footer(self):
+        for heading, lines in self.sections:
+            self.stream.write(f"\n===== {heading} =====\n")
+            for line in lines:
+                self.stream.write(f"{line}\n")
+
+
+@register_exporter("jsonl")
+class JsonLinesExporter(Exporter):
+    """One JSON object per line"""
+
+    extensions = (".jsonl", ".ndjson")
+
+    def write_row(self, row):
+        self.stream.write(json.dumps(row) + "\n")
+
+
+@register_exporter("csv")
+class CsvExporter(Exporter):
+    """Spreadsheet friendly table with a fixed set of columns"""
+
+    extensions = (".csv",)
+    columns = ["apk", "name", "result", "duration", "score", "attempts", "flaky", "cached", "time"]
+
+    def write_header(self, summary=None):
+        self.writer = csv.writer(self.stream)
+        self.writer.writerow(self.columns)
+
+    def write_row(self, row):
+        values = dict(row, name=os.path.basename(row["apk"]))
+        values["attempts"] = " ".join(row.get("attempts") or [])
+        self.writer.writerow(["" if values.get(column) is None else values.get(column) for column in self.columns])
+
+
+@register_exporter("junit")
+class JUnitExporter(Exporter):
+    """JUnit XML with one testcase per APK, for CI dashboards"""
+
+    extensions = (".xml",)
+    needs_summary = True
+
+    def write_header(self, summary=None):
+        self.stream.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        self.stream.write(
+            f"<testsuite name={quoteattr(self.title)} tests=\"{summary['total']}\" "
+            f"failures=\"{summary['not_working']}\" skipped=\"{summary['skipped']}\" "
+            f"time=\"{summary['duration']:.3f}\">\n"
+        )
+
+    def write_row(self, row):
+        name = os.path.basename(row["apk"])
+        self.stream.write(
+            f"  <testcase classname=\"atl\" name={quoteattr(name)} file={quoteattr(row['apk'])} "
+            f"time=\"{row.get('duration') or 0:.3f}\">"
+        )
+        if row["result"] == "not_working":
+            message = "Application does not work"
+            if row.get("attempts"):
+                message += f" ({', '.join(row['attempts'])})"
+            self.stream.write(f"<failure message={quoteattr(message)}/>")
+        elif row["result"] == "skipped":
+            self.stream.write("<skipped/>")
+        if row.get("flaky"):
+            self.stream.write(f"<system-out>{escape('Flaky: ' + ', '.join(row['attempts']))}</system-out>")
+        self.stream.write("</testcase>\n")
+
+    def write_footer(self):
+        self.stream.write("</testsuite>\n")
+
+
+@register_exporter("html")
+class HtmlExporter(Exporter):
+    """Standalone HTML page with a summary and a results table"""
+
+    extensions = (".html", ".htm")
+    needs_summary = True
+
+    def write_header(self, summary=None):
+        title = html.escape(self.title)
+        self.stream.write(
+            "<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\">"
+            f"<title>{title}</title>"
+            "<style>body{font-family:sans-serif}td,th{padding:2px 8px;text-align:left}"
+            ".working{color:#26a269}.not_working{color:#c01c28}.skipped{color:#777}</style>"
+            f"</head><body>\n<h1>{title}</h1>\n"
+            f"<p>Total: {summary['total']} &middot; Working: {summary['working']} &middot; "
+            f"Not working: {summary['not_working']} &middot; Skipped: {summary['skipped']} &middot; "
+            f"Flaky: {summary['flaky']}</p>\n"
+            "<table>\n<tr><th>APK</th><th>Result</th><th>Duration</th><th>Score</th><th>Attempts</th></tr>\n"
+        )
+
+    def write_row(self, row):
+        result = row["result"]
+        duration = f"{row['duration']:.1f}s" if row.get("duration") else ""
+        score = "" if row.get("score") is None else row["score"]
+        attempts = ", ".join(row.get("attempts") or [])
+        self.stream.write(
+            f"<tr><td title=\"{html.escape(row['apk'])}\">{html.escape(os.path.basename(row['apk']))}</td>"
+            f"<td class=\"{html.escape(result)}\">{html.escape(RESULT_LABELS.get(result, result))}</td>"
+            f"<td>{duration}</td><td>{score}</td><td>{html.escape(attempts)}</td></tr>\n"
+        )
+
+    def write_footer(self):
+        self.stream.write("</table>\n</body></html>\n")
+
+
+def export(rows_factory, format_name, stream, title="ATL GUI results", sections=()):
+    """
+    Stream rows to a file in the given format.
+
+    Args:
+        rows_factory: Function returning a new iterator of rows each call
+        format_name: Key of EXPORTERS (text, jsonl, csv, junit, html)
+        stream: Open text file to write to
+        title: Title used by formats that have one
+        sections: (heading, lines) added at the end of the text report
+
+    Returns:
+        int: Number of rows written
+    """
+    exporter_class = EXPORTERS.get(format_name)
+    if exporter_class is None:
+        raise ValueError(f"Unknown export format: {format_name}")
+
+    exporter = exporter_class(stream, title, sections)
+    exporter.write_header(summarize(rows_factory()) if exporter.needs_summary else None)
+    count = 0
+    for row in rows_factory():
+        exporter.write_row(row)
+        count += 1
+    exporter.write_footer()
+    return count
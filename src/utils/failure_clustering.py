@@ -0,0 +1,155 @@
+"""
+Failure clustering for ATL GUI.
+
+Groups not working APKs by the root cause of their failure, so a large
+batch can be triaged once per cause instead of once per APK. Each APK's
+most telling error line (see log_analysis.py for the error format) is
+normalized - addresses, paths, numbers and object ids are replaced by
+placeholders - and hashed into a signature.
+
+This module has no GTK dependency so it can be used from scripts.
+"""
+import re
+import hashlib
+
+# Error categories from the most to the least telling root cause
+CATEGORY_PRIORITY = [
+    "Java Exceptions",
+    "Dex Compilation",
+    "Package Parsing",
+    "File Not Found",
+    "Failed Execution",
+    "Asset Errors",
+    "Permissions",
+    "Native Errors",
+]
+
+# Replacements applied in order
+_NORMALIZERS = [
+    # Memory addresses and long hex values
+    (re.compile(r"\b0x[0-9a-fA-F]+\b"), "<addr>"),
+    # Object identity hashes: Foo@1a2b3c
+    (re.compile(r"@[0-9a-fA-F]{4,}\b"), "@<id>"),
+    # Absolute paths, but not logcat tags like E/Tag
+    (re.compile(r"(?<![\w/.])/[^\s:'\",)\]]+"), "<path>"),
+    # Any remaining numbers: PIDs, TIDs, times, line numbers
+    (re.compile(r"\d+"), "<n>"),
+    (re.compile(r"\s+"), " "),
+]
+
+# Leading logcat noise: "E/Tag( 123): " or "E Tag: " after normalization
+_LOG_PREFIX = re.compile(r"^(?:[VDIWEF]/[^:(]*(?:\(\s*<n>\))?:\s*)")
+
+# Exception class and message: java.lang.ClassNotFoundException: com.x.Y
+_EXCEPTION = re.compile(r"(?:[\w$]+\.)*([\w$]+(?:Exception|Error))\b(.*)")
+
+# Longest label shown for a cluster
+LABEL_LENGTH = 120
+
+
+def normalize_error_text(text):
+    """Replace the run-specific parts of an error line with placeholders"""
+    for pattern, replacement in _NORMALIZERS:
+        text = pattern.sub(replacement, text)
+    text = text.strip()
+    return _LOG_PREFIX.sub("", text)
+
+
+def primary_error(errors):
+    """
+    Pick the error that best explains a failure.
+
+    Java exceptions win over other categories, and within them the last
+    "Caused by:" line is the root cause. Otherwise the earliest error of
+    the most telling category is used.
+
+    Args:
+        errors: Error entries (dicts with type, line and line_number)
+
+    Returns:
+        dict or None: The chosen error entry
+    """
+    if not errors:
+        return None
+
+    causes = [error for error in errors if "Caused by:" in error["line"]]
+    if causes:
+        return max(causes, key=lambda error: error.get("line_number", 0))
+
+    priority = {category: index for index, category in enumerate(CATEGORY_PRIORITY)}
+    return min(errors, key=lambda error: (
+        priority.get(error["type"], len(priority)),
+        error.get("line_number", 0),
+    ))
+
+
+def error_label(normalized_line):
+    """Short human readable label, starting at the exception name when there is one"""
+    label = normalized_line.replace("Caused by: ", "")
+    match = _EXCEPTION.search(label)
+    if match:
+        label = match.group(1) + match.group(2)
+    if len(label) > LABEL_LENGTH:
+        label = label[:LABEL_LENGTH - 3] + "..."
+    return label
+
+
+def error_signature(error):
+    """
+    Signature of an error entry.
+
+    Returns:
+        tuple: (signature hex string, label)
+    """
+    normalized = normalize_error_text(error["line"])
+    label = error_label(normalized)
+    digest = hashlib.blake2b(f"{error['type']}\n{label}".encode("utf-8", errors="replace"), digest_size=8)
+    return digest.hexdigest(), label
+
+
+def failure_signature(errors):
+    """
+    Signature of the primary error of a failed run.
+
+    Returns:
+        tuple: (signature, label), or (None, None) if there are no errors
+    """
+    error = primary_error(errors)
+    if error is None:
+        return None, None
+    return error_signature(error)
+
+
+def cluster_failures(errors_by_apk):
+    """
+    Group APKs by the signature of their primary error.
+
+    Args:
+        errors_by_apk: Dictionary of APK path -> list of error entries
+
+    Returns:
+        list: Clusters sorted by size, each a dict with signature, label,
+        type, example (an original error line) and apks (list of paths).
+        APKs without errors form a cluster with signature None.
+    """
+    clusters = {}
+    for apk_path, errors in errors_by_apk.items():
+        error = primary_error(errors)
+        if error is None:
+            signature, label, error_type, example = None, "No errors found in log", "", ""
+        else:
+            signature, label = error_signature(error)
+            error_type, example = error["type"], error["line"]
+
+        cluster = clusters.get(signature)
+        if cluster is None:
+            cluster = clusters[signature] = {
+                "signature": signature,
+                "label": label,
+                "type": error_type,
+                "example": example,
+                "apks": [],
+            }
+        cluster["apks"].append(apk_path)
+
+    return sorted(clusters.values(), key=lambda cluster: (-len(cluster["apks"]), cluster["label"]))
@@ -0,0 +1,216 @@
+"""
+Hot folder for ATL GUI.
+
+A FolderWatcher follows one folder with a Gio.FileMonitor (inotify) and
+hands the APKs that land in it to a callback, which adds them to the
+running test queue:
+
+    watcher = FolderWatcher(folder, window.open_apk_paths)
+    watcher.start()
+
+The folder is never listed again after start: only the files named by
+monitor events are looked at. A file is handed over once its size and
+mtime have not changed for settle_seconds, so APKs still being
+downloaded or copied are not tested half-written; APKs renamed into the
+folder (e.g. foo.apk.part -> foo.apk) are treated the same way. Settled
+files are hashed on a worker thread and a file whose content was already
+seen (the same APK dropped twice, under any name) is skipped.
+
+One timer checks every file still settling, and all the APKs that are
+ready at the same tick reach the callback as one list, so a burst of
+hundreds of files becomes a few queue updates instead of hundreds.
+
+This module has no GTK dependency so it can be used from scripts; Gio and
+GLib are only imported by start().
+"""
+import os
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from src.utils.atl_registry import file_digest
+from src.utils.batch_runner import find_apk_files
+
+logger = logging.getLogger(__name__)
+
+# Seconds a file must keep the same size and mtime before it is tested
+SETTLE_SECONDS = 2.0
+
+# Milliseconds between checks of the files still settling
+SETTLE_INTERVAL = 500
+
+
+def is_apk_name(path):
+    name = os.path.basename(path)
+    return name.lower().endswith(".apk") and not name.startswith(".")
+
+
+class FolderWatcher:
+    """Hands APKs landing in a folder to a callback once they are complete"""
+
+    def __init__(self, folder, callback, settle_seconds=SETTLE_SECONDS, include_existing=False):
+        """
+        Args:
+            folder: Folder to watch
+            callback: Called from the main loop with a list of new APK paths
+            settle_seconds: How long a file must stay unchanged
+            include_existing: Also hand over the APKs already in the folder
+        """
+        self.folder = os.path.abspath(folder)
+        self.callback = callback
+        self.settle_seconds = settle_seconds
+        self.include_existing = include_existing
+        # path -> (size, mtime_ns, time the file was last seen changing)
+        self._settling = {}
+        # path -> future of its hash
+        self._hashing = {}
+        self._seen_hashes = set()
+        self._executor = None
+        self._monitor = None
+        self._timer_id = None
+
+    @property
+    def busy(self):
+        """Whether files are still settling or being hashed"""
+        return bool(self._settling or self._hashing)
+
+    def start(self):
+        """
+        Start watching.
+
+        Returns:
+            bool: False if the folder can't be watched
+        """
+        if self._monitor is not None:
+            return True
+        try:
+            from gi.repository import Gio, GLib
+        except ImportError:
+            return False
+        try:
+            self._monitor = Gio.File.new_for_path(self.folder).monitor_directory(
+                Gio.FileMonitorFlags.WATCH_MOVES, None
+            )
+        except GLib.Error as e:
+            logger.error("Can't watch %s: %s", self.folder, e)
+            return False
+        self._monitor.connect("changed", self._on_changed)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="folder-watcher")
+        logger.info("Watching %s for new APKs", self.folder)
+
+        if self.include_existing:
+            for path in find_apk_files([self.folder]):
+                self.file_changed(path)
+        return True
+
+    def stop(self):
+        """Stop watching and drop the files not handed over yet"""
+        if self._monitor is not None:
+            self._monitor.cancel()
+            self._monitor = None
+        if self._timer_id is not None:
+            from gi.repository import GLib
+            GLib.source_remove(self._timer_id)
+            self._timer_id = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._settling.clear()
+        self._hashing.clear()
+
+    def _on_changed(self, monitor, file, other_file, event_type):
+        from gi.repository import Gio
+        events = Gio.FileMonitorEvent
+        if event_type in (events.CREATED, events.CHANGED, events.CHANGES_DONE_HINT,
+                          events.ATTRIBUTE_CHANGED, events.MOVED_IN):
+            self.file_changed(file.get_path())
+        elif event_type == events.RENAMED:
+            self.file_removed(file.get_path())
+            self.file_changed(other_file.get_path())
+        elif event_type in (events.DELETED, events.MOVED_OUT):
+            self.file_removed(file.get_path())
+
+    def file_changed(self, path, now=None):
+        """Note that an APK appeared or is still being written"""
+        if not path or not is_apk_name(path) or os.path.dirname(path) != self.folder:
+            return
+        self._settling[path] = (None, None, time.monotonic() if now is None else now)
+        self._schedule()
+
+    def file_removed(self, path):
+        if path:
+            self._settling.pop(path, None)
+
+    def _schedule(self):
+        if self._timer_id is None and self._monitor is not None:
+            from gi.repository import GLib
+            self._timer_id = GLib.timeout_add(SETTLE_INTERVAL, self._on_timer)
+
+    def _on_timer(self):
+        self.poll()
+        if self.busy:
+            return True
+        self._timer_id = None
+        return False
+
+    def settled(self, now=None):
+        """
+        Take the files that stopped changing off the settling list.
+
+        Returns:
+            list: Their paths, in the order they appeared
+        """
+        now = time.monotonic() if now is None else now
+        ready = []
+        for path, (size, mtime_ns, changed_at) in list(self._settling.items()):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                # Gone again (e.g. a temporary file), a later event brings it back
+                del self._settling[path]
+                continue
+            if (stat.st_size, stat.st_mtime_ns) != (size, mtime_ns):
+                self._settling[path] = (stat.st_size, stat.st_mtime_ns, now if size is not None else changed_at)
+            elif now - changed_at >= self.settle_seconds:
+                del self._settling[path]
+                # An empty file is still to be written; its next event brings it back
+                if stat.st_size > 0:
+                    ready.append(path)
+        return ready
+
+    def poll(self, now=None):
+        """
+        Hash the files that settled and hand over the hashed ones.
+
+        Returns:
+            list: The APKs passed to the callback
+        """
+        for path in self.settled(now):
+            if self._executor is not None:
+                self._hashing[path] = self._executor.submit(file_digest, path)
+            else:
+                self._hashing[path] = None
+
+        new_apks = []
+        for path, future in list(self._hashing.items()):
+            if future is not None and not future.done():
+                continue
+            del self._hashing[path]
+            try:
+                digest = future.result() if future is not None else file_digest(path)
+            except OSError as e:
+                logger.warning("Can't read %s: %s", path, e)
+                continue
+            if digest in self._seen_hashes:
+                logger.debug("Skipping %s: same content as an APK already queued", path)
+                continue
+            self._seen_hashes.add(digest)
+            new_apks.append(path)
+
+        if new_apks:
+            logger.info("%d new APK(s) in %s", len(new_apks), self.folder)
+            try:
+                self.callback(new_apks)
+            except Exception:
+                logger.exception("Error handing over new APKs")
+        return new_apks
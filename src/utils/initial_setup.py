@@ -1,10 +1,7 @@
 import gi
 import os
-import subprocess
 import pathlib
 from pathlib import Path
-import shutil
-import json
 import logging
 import sys
 import traceback
@@ -28,8 +25,8 @@ gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
 from gi.repository import Gtk, Adw, GLib
 
-CONFIG_DIR = os.path.join(str(Path.home()), ".config", "atl-gui")
-CONFIG_FILE = os.path.join(CONFIG_DIR, "config.json")
+from src.utils.config_service import get_config
+from src.utils.atl_registry import get_atl_registry
 
 # Global reference to keep the setup dialog alive
 _active_setup_dialog = None
@@ -38,47 +35,10 @@ _active_setup_assistant = None
 class SetupAssistant:
     def __init__(self, window):
         self.window = window
-        self.config = self.load_config()
+        self.config = get_config()
         self.callback = None
         self.dialog = None
     
-    def load_config(self):
-        """Load configuration or create default if it doesn't exist"""
-        if not os.path.exists(CONFIG_DIR):
-            os.makedirs(CONFIG_DIR, exist_ok=True)
-            
-        if os.path.exists(CONFIG_FILE):
-            try:
-                with open(CONFIG_FILE, 'r') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"Error loading config: {e}")
-                return self.get_default_config()
-        else:
-            return self.get_default_config()
-    
-    def get_default_config(self):
-        """Return default configuration"""
-        return {
-            "first_run": True,
-            "atl_executable_path": "",
-            "environment_variables": {
-                "SCALE": "2",
-                "LOG_LEVEL": "debug"
-            },
-            "display_mode": "auto",  # auto, wayland, x11
-            "last_used_directory": str(Path.home()),
-            "recent_apks": []
-        }
-    
-    def save_config(self):
-        """Save configuration to file"""
-        try:
-            with open(CONFIG_FILE, 'w') as f:
-                json.dump(self.config, f, indent=2)
-        except Exception as e:
-            print(f"Error saving config: {e}")
-    
     def show_setup_dialog(self, callback=None):
         """Show the initial setup dialog"""
         global _active_setup_dialog, _active_setup_assistant
@@ -216,7 +176,7 @@ class SetupAssistant:
         self.env_text_view.set_monospace(True)
         
         # Set environment variables from config
-        env_vars = self.config.get("environment_variables", {})
+        env_vars = self.config.get_dict("environment_variables")
         env_text = "\n".join([f"{key}={value}" for key, value in env_vars.items()])
         self.env_text_view.get_buffer().set_text(env_text if env_text else "SCALE=2\nLOG_LEVEL=debug")
         
@@ -318,28 +278,8 @@ class SetupAssistant:
             self.update_atl_status(False, "Not found in PATH")
     
     def find_atl_in_path(self):
-        """Find android-translation-layer in PATH"""
-        try:
-            path = shutil.which("android-translation-layer")
-            if path:
-                return path
-                
-            # Check common locations
-            common_locations = [
-                "/usr/bin/android-translation-layer",
-                "/usr/local/bin/android-translation-layer",
-                f"{str(Path.home())}/bin/android-translation-layer",
-                f"{str(Path.home())}/.local/bin/android-translation-layer"
-            ]
-            
-            for location in common_locations:
-                if os.path.exists(location) and os.access(location, os.X_OK):
-                    return location
-                    
-            return None
-        except Exception as e:
-            print(f"Error finding ATL: {e}")
-            return None
+        """Find android-translation-layer in PATH or a common location"""
+        return get_atl_registry().detect() or None
     
     def check_atl_path(self):
         """Check if the ATL executable path is valid"""
@@ -357,26 +297,16 @@ class SetupAssistant:
             self.update_atl_status(False, "No execute permission")
             return False
             
-        # Try to run with --version
-        try:
-            result = subprocess.run([path, "--version"], 
-                                    capture_output=True, 
-                                    text=True, 
-                                    timeout=2)
-            
-            if result.returncode == 0:
-                version = result.stdout.strip()
-                self.update_atl_status(True, f"Verified: {version}")
-                return True
-            else:
-                self.update_atl_status(False, "Failed to execute")
-                return False
-        except subprocess.TimeoutExpired:
-            self.update_atl_status(False, "Timeout")
+        # Run it with --version, once per build
+        entry = get_atl_registry().probe(path)
+        if entry is None:
+            self.update_atl_status(False, "File not found")
             return False
-        except Exception as e:
-            self.update_atl_status(False, f"Error: {str(e)}")
+        if entry["error"]:
+            self.update_atl_status(False, entry["error"])
             return False
+        self.update_atl_status(True, f"Verified: {entry['version']}")
+        return True
     
     def update_atl_status(self, success, message):
         """Update the ATL status row"""
@@ -404,7 +334,7 @@ class SetupAssistant:
         """Skip setup and close dialog"""
         logger.info("Skip button clicked")
         self.config["first_run"] = False
-        self.save_config()
+        self.config.flush()
         
         # Close dialog and call callback
         self.finish_dialog(True)
@@ -440,9 +370,7 @@ class SetupAssistant:
         
         # Mark setup as completed
         self.config["first_run"] = False
-        
-        # Save config
-        self.save_config()
+        self.config.flush()
         
         # Close dialog and call callback
         self.finish_dialog(True)
@@ -496,9 +424,9 @@ class SetupAssistant:
 
 def check_first_run(window, show_dialog=True):
     """Check if this is the first run and show setup if needed"""
-    print(f"[DEBUG] check_first_run called, show_dialog={show_dialog}")
+    logger.debug(f"check_first_run called, show_dialog={show_dialog}")
     setup = SetupAssistant(window)
-    if setup.config.get("first_run", True) and show_dialog:
-        print("[DEBUG] First run confirmed, showing setup dialog")
+    if setup.config.get_bool("first_run", True) and show_dialog:
+        logger.debug("First run confirmed, showing setup dialog")
         setup.show_setup_dialog()
     return setup.config 
\ No newline at end of file
@@ -0,0 +1,150 @@
+"""
+Launch command construction for android-translation-layer.
+
+Builds the argv list and environment mapping used to start ATL so the
+terminal process can exec the binary directly. A wrapper script is run
+with bash, its arguments passed as argv elements; a sudo password is
+given to sudo on its standard input, never on a command line.
+"""
+import os
+import shlex
+
+
+def build_atl_argv(atl_executable, apk_path, options):
+    """
+    Build the android-translation-layer argument vector.
+
+    Args:
+        atl_executable: Path or name of the ATL binary
+        apk_path: Path to the APK to launch
+        options: Dictionary of launch options (same names as the window attributes)
+
+    Returns:
+        tuple: (argv list, list of human readable flag descriptions)
+    """
+    argv = [atl_executable, apk_path]
+    flags = []
+
+    activity_name = options.get("activity_name")
+    if activity_name:
+        argv.extend(["-l", activity_name])
+        flags.append(f"-l {activity_name}")
+
+    instrumentation_class = options.get("instrumentation_class")
+    if instrumentation_class:
+        argv.extend(["--instrument", instrumentation_class])
+        flags.append(f"--instrument={instrumentation_class}")
+
+    window_width = options.get("window_width")
+    if window_width:
+        argv.extend(["-w", str(window_width)])
+        flags.append(f"-w {window_width}")
+
+    window_height = options.get("window_height")
+    if window_height:
+        argv.extend(["-h", str(window_height)])
+        flags.append(f"-h {window_height}")
+
+    uri_value = options.get("uri_value")
+    if uri_value:
+        argv.extend(["-u", uri_value])
+        flags.append(f"-u {uri_value}")
+
+    for option in options.get("jvm_options") or []:
+        argv.extend(["-X", option])
+        flags.append(f"-X \"{option}\"")
+
+    for key, value in (options.get("string_keys") or {}).items():
+        # Passed as a single argv element, so values may contain spaces,
+        # quotes or '=' without any escaping
+        argv.extend(["-e", f"{key}={value}"])
+        flags.append(f"-e {key}={value}")
+
+    if options.get("install_flag"):
+        argv.append("-i")
+        flags.append("-i (install)")
+
+    if options.get("install_internal"):
+        argv.append("--install-internal")
+        flags.append("--install-internal")
+
+    gapplication_app_id = options.get("gapplication_app_id")
+    if gapplication_app_id:
+        argv.append(f"--gapplication-app-id={gapplication_app_id}")
+        flags.append(f"--gapplication-app-id={gapplication_app_id}")
+
+    return argv, flags
+
+
+def prepare_environment(env_vars, base_env=None):
+    """
+    Merge launch environment variables over the base environment.
+
+    Args:
+        env_vars: Dictionary of variables to set for the launch
+        base_env: Environment to start from (defaults to os.environ)
+
+    Returns:
+        dict: Complete environment mapping suitable for Popen(env=...)
+    """
+    env = dict(os.environ if base_env is None else base_env)
+    env.update({str(key): str(value) for key, value in (env_vars or {}).items()})
+    return env
+
+
+def build_launch_command(argv, env_vars, script_path="", sudo_password=""):
+    """
+    Decide how the terminal process should start ATL.
+
+    Without a wrapper script the argv list is executed directly with the
+    prepared environment. With a wrapper script the script receives the ATL
+    binary and its arguments, run through bash (and sudo when a password
+    is configured).
+
+    Args:
+        argv: ATL argument vector from build_atl_argv()
+        env_vars: Dictionary of launch environment variables
+        script_path: Optional wrapper script path
+        sudo_password: Optional sudo password for the wrapper script
+
+    Returns:
+        dict: {"command": list, "shell": bool, "env": dict, "display": str,
+        "input": text for the standard input of the command, or None}
+    """
+    env_vars = env_vars or {}
+    env = prepare_environment(env_vars)
+    env_display = " ".join(f"{key}={shlex.quote(str(value))}" for key, value in env_vars.items())
+
+    if not script_path:
+        return {
+            "command": list(argv),
+            "shell": False,
+            "env": env,
+            "display": f"{env_display} {shlex.join(argv)}".strip(),
+            "input": None,
+        }
+
+    # The wrapper script gets the binary as its first argument; bash runs
+    # "$0" "$@", so no argument is ever parsed by a shell
+    script_argv = ["bash", "-c", '"$0" "$@"', script_path] + list(argv)
+
+    if sudo_password:
+        # sudo resets the environment, so env sets the variables after it;
+        # -S reads the password from stdin and -p "" drops the prompt
+        command = ["sudo", "-S", "-p", "", "env"] + [f"{key}={value}" for key, value in env_vars.items()] + script_argv
+        return {
+            "command": command,
+            "shell": False,
+            "env": env,
+            # Never show the password
+            "display": shlex.join(command),
+            "input": sudo_password + "\n",
+        }
+
+    return {
+        "command": script_argv,
+        "shell": False,
+        "env": env,
+        "display": f"{env_display} {shlex.join(script_argv)}".strip(),
+        "input": None,
+    }
@@ -0,0 +1,80 @@
+"""
+Launch latency instrumentation for ATL runs.
+
+A LaunchTimeline records when each startup milestone of one ATL launch was
+reached, relative to the moment the command was handed to the terminal
+process. Timestamps come from time.monotonic(), which is shared between
+the GUI process and the terminal process on Linux.
+"""
+import time
+
+# Timeline marks in the order they are expected to happen
+LAUNCH_MARKS = [
+    ("spawn", "Process spawned"),
+    ("first_output", "First output"),
+    ("window_created", "Window created"),
+    ("ui_responsive", "UI responsive"),
+    ("exit", "Exited"),
+]
+
+MARK_LABELS = dict(LAUNCH_MARKS)
+
+
+class LaunchTimeline:
+    """Per-run timing marks, in seconds since the command was sent."""
+
+    def __init__(self, start=None):
+        self.start = time.monotonic() if start is None else start
+        self.marks = {}
+
+    def mark(self, name, timestamp=None):
+        """
+        Record a mark the first time it is reached.
+
+        Args:
+            name: Mark name (see LAUNCH_MARKS)
+            timestamp: time.monotonic() value of the event, defaults to now
+
+        Returns:
+            bool: True if the mark was recorded, False if it already existed
+        """
+        if name in self.marks:
+            return False
+        if timestamp is None:
+            timestamp = time.monotonic()
+        self.marks[name] = max(0.0, timestamp - self.start)
+        return True
+
+    def has_mark(self, name):
+        return name in self.marks
+
+    def elapsed(self, name):
+        """Seconds from launch to the given mark, or None if not reached."""
+        return self.marks.get(name)
+
+    def to_dict(self):
+        """Serializable form: mark name -> milliseconds since launch."""
+        return {name: round(self.marks[name] * 1000, 1) for name, _ in LAUNCH_MARKS if name in self.marks}
+
+
+def format_duration(milliseconds):
+    """Format a millisecond value for display."""
+    if milliseconds is None:
+        return "-"
+    if milliseconds < 1000:
+        return f"{milliseconds:.0f} ms"
+    return f"{milliseconds / 1000:.2f} s"
+
+
+def format_timeline(timings):
+    """
+    Format a timeline dictionary (from LaunchTimeline.to_dict) as text lines.
+
+    Returns:
+        list: One "Label: +time" line per reached mark, in launch order
+    """
+    lines = []
+    for name, label in LAUNCH_MARKS:
+        if name in timings:
+            lines.append(f"{label}: +{format_duration(timings[name])}")
+    return lines
@@ -0,0 +1,437 @@
+"""
+Streaming log analysis for ATL GUI.
+
+One LogAnalyzer pass over a log produces everything the GUI needs:
+
+- the detection score and verdict (see detection_scoring.py)
+- categorized error lines with line numbers and surrounding context
+- error counts per category
+- the first line of each regex pattern rule, when the rules have any
+
+Text can be fed in arbitrary chunks as it arrives from the terminal.
+Complete lines are processed in blocks: every literal indicator of every
+rule is found with a single trie-shaped regular expression per block, and
+only the lines with hits are looked at individually.
+
+This module has no GTK dependency so it can be used from scripts.
+"""
+import re
+from bisect import bisect_right
+from collections import deque
+from itertools import accumulate
+
+from src.utils.detection_scoring import get_default_scorer
+
+# Number of lines kept before and after an error line
+CONTEXT_LINES = 5
+
+# Error categories in priority order: a line is filed under the first
+# category that has a matching indicator
+ERROR_CATEGORIES = [
+    ("File Not Found", ["Failed to open file", "No such file or directory"]),
+    ("Failed Execution", ["Failed execv", "non-0 exit status", "Error terminating process"]),
+    ("Dex Compilation", ["dex2oat", "Failed to compile dex file"]),
+    ("Package Parsing", ["PackageParser", "Unknown element", "Binary XML file"]),
+    ("Java Exceptions", ["java.lang.", "Exception:", "Caused by:"]),
+    ("Native Errors", ["E/", "ERROR:", "Error:", "error:"]),
+    ("Asset Errors", ["AssetsProvider", "Failed to load", "Could not load"]),
+    ("Permissions", ["Permission denied", "requires permission"]),
+]
+
+# Common less important messages that cause noise - never reported as errors
+IGNORED_LINE_MARKERS = [
+    "Gtk-WARNING", "Theme parser error", "gtk.css",
+    "libadwaita", "gtk-application-prefer-dark-theme",
+    "Failed to load module", "Warning: Unable to load",
+]
+
+# Regex rules used by ErrorDetector: (name, category, pattern)
+PATTERN_RULES = [
+    ("runtime", "Runtime Error", r'java\.lang\.RuntimeException|java\.lang\.NullPointerException|java\.lang\.ClassNotFoundException'),
+    ("manifest", "Manifest Error", r'Unknown element under <manifest>|Failed to open file.*AndroidManifest\.xml'),
+    ("dex", "DEX Error", r'Failed to compile dex file|No dex files in zip file'),
+    ("activity", "Activity Error", r'Failed to find Activity to launch URI'),
+    ("permission", "Permission Error", r'uses-permission-sdk-'),
+    ("assets", "Assets Error", r'Failed to open file.*resources\.arsc'),
+]
+
+
+def _trie_pattern(literals):
+    """Build a regex for a set of literals, factored on common prefixes"""
+    root = {}
+    for literal in literals:
+        node = root
+        for char in literal:
+            node = node.setdefault(char, {})
+        node[""] = None
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            # A literal ends here; the greedy ? still prefers the longer ones
+            body = ("(?:" + body + ")" if len(branches) == 1 else body) + "?"
+        return body
+
+    return build(root)
+
+
+class _LiteralMatcher:
+    """
+    Finds every occurrence of a set of literals in one regex pass.
+
+    The regex reports the longest literal at the leftmost position and then
+    continues after it, so literals overlapping a match are recovered from
+    tables computed once per rule set: the literals contained in each
+    literal, and those that start inside it and run past its end.
+    """
+
+    def __init__(self, literals):
+        self.literals = sorted(set(literals))
+        self.regex = re.compile(_trie_pattern(self.literals)) if self.literals else None
+
+        # Every prefix of every literal -> literals starting with it
+        by_prefix = {}
+        for literal in self.literals:
+            for end in range(1, len(literal) + 1):
+                by_prefix.setdefault(literal[:end], []).append(literal)
+
+        self.contained = {}
+        self.straddling = {}
+        for literal in self.literals:
+            contained = []
+            for other in self.literals:
+                offset = literal.find(other)
+                while offset >= 0:
+                    if not (offset == 0 and other == literal):
+                        contained.append((other, offset))
+                    offset = literal.find(other, offset + 1)
+
+            straddling = []
+            for offset in range(1, len(literal)):
+                suffix = literal[offset:]
+                for other in by_prefix.get(suffix, ()):
+                    if len(other) > len(suffix):
+                        straddling.append((other, offset))
+
+            self.contained[literal] = contained
+            self.straddling[literal] = straddling
+
+    def scan(self, text):
+        """Yield (position, literal) for every occurrence in text"""
+        if self.regex is None:
+            return
+        for match in self.regex.finditer(text):
+            start = match.start()
+            literal = match.group()
+            yield start, literal
+            for other, offset in self.contained[literal]:
+                yield start + offset, other
+            for other, offset in self.straddling[literal]:
+                if text.startswith(other, start + offset):
+                    yield start + offset, other
+
+
+class LogRules:
+    """Rule table used by LogAnalyzer"""
+
+    def __init__(self, scorer=None, error_categories=(), ignored_markers=(), pattern_rules=()):
+        """
+        Args:
+            scorer: DetectionScorer whose signals are matched, or None to skip scoring
+            error_categories: List of (category, indicators) in priority order
+            ignored_markers: Lines containing any of these are not reported as errors
+            pattern_rules: List of (name, category, regex) rules
+        """
+        self.scorer = scorer
+        self.error_categories = [(category, list(indicators)) for category, indicators in error_categories]
+        self.ignored_markers = list(ignored_markers)
+        self.pattern_rules = [(name, category, re.compile(pattern)) for name, category, pattern in pattern_rules]
+
+        signals = scorer.signals if scorer else []
+
+        # Case sensitive literals from every rule
+        literals = list(self.ignored_markers)
+        for _, indicators in self.error_categories:
+            literals.extend(indicators)
+        for signal in signals:
+            if not signal.ignore_case:
+                literals.extend(signal.indicators)
+        self.literals = _LiteralMatcher(literals)
+
+        # Case insensitive signal indicators, matched against lowercased text
+        self.folded = _LiteralMatcher(pattern for signal in signals if signal.ignore_case for pattern in signal.patterns)
+
+        # Cheap pre-check before trying the pattern rules one by one
+        self.pattern_any = None
+        if self.pattern_rules:
+            self.pattern_any = re.compile("|".join(f"(?:{regex.pattern})" for _, _, regex in self.pattern_rules))
+
+        self.ignored_set = frozenset(self.ignored_markers)
+
+
+_default_rules = None
+
+def get_default_rules():
+    """Get the rule table with the shipped detection weights and error categories"""
+    global _default_rules
+    if _default_rules is None:
+        _default_rules = LogRules(get_default_scorer(), ERROR_CATEGORIES, IGNORED_LINE_MARKERS)
+    return _default_rules
+
+
+class LogAnalyzer:
+    """Single pass, incremental analysis of one log"""
+
+    def __init__(self, rules=None):
+        self.rules = rules or get_default_rules()
+        self.reset()
+
+    def reset(self):
+        """Forget everything seen so far"""
+        self.line_count = 0
+        self.errors = []
+        self.error_summary = {}
+        self.pattern_hits = {}
+        self.found_literals = set()
+        self.found_folded = set()
+        self._tail = ""
+        self._before = deque(maxlen=CONTEXT_LINES)
+        self._pending = []
+
+    def feed(self, text):
+        """
+        Analyze the next chunk of the log.
+
+        A trailing partial line is kept until the rest of it arrives.
+        """
+        if not text:
+            return
+        data = self._tail + text
+        cut = data.rfind("\n")
+        if cut < 0:
+            self._tail = data
+            return
+        self._tail = data[cut + 1:]
+        self._process_block(data[:cut])
+
+    def finish(self):
+        """
+        Flush the last partial line and return the analysis.
+
+        Returns:
+            dict: See result()
+        """
+        if self._tail:
+            self._process_block(self._tail)
+            self._tail = ""
+        self._pending = []
+        return self.result()
+
+    def _process_block(self, block):
+        """Analyze a block of complete lines (without the final newline)"""
+        rules = self.rules
+        lines = block.split("\n")
+        first_line_number = self.line_count + 1
+        self.line_count += len(lines)
+
+        # Offset of each line in the block, to map matches back to lines
+        line_starts = list(accumulate((len(line) + 1 for line in lines[:-1]), initial=0))
+        if "\r" in block:
+            lines = [line[:-1] if line.endswith("\r") else line for line in lines]
+
+        # Lines following an earlier error are its context
+        if self._pending:
+            still_pending = []
+            for entry, remaining in self._pending:
+                taken = lines[:remaining]
+                entry["details"].extend(taken)
+                if remaining > len(taken):
+                    still_pending.append((entry, remaining - len(taken)))
+            self._pending = still_pending
+
+        # Literal indicators, grouped by line
+        line_hits = {}
+        for position, literal in rules.literals.scan(block):
+            index = bisect_right(line_starts, position) - 1
+            hits = line_hits.get(index)
+            if hits is None:
+                line_hits[index] = {literal}
+            else:
+                hits.add(literal)
+
+        for hits in line_hits.values():
+            self.found_literals |= hits
+
+        if rules.folded.regex is not None:
+            self.found_folded.update(literal for _, literal in rules.folded.scan(block.lower()))
+
+        if rules.error_categories:
+            for index in sorted(line_hits):
+                hits = line_hits[index]
+                if not (hits & rules.ignored_set):
+                    self._categorize(lines, index, first_line_number + index, hits)
+
+        # Pattern rules only matter until their first hit
+        if rules.pattern_any is not None and len(self.pattern_hits) < len(rules.pattern_rules):
+            checked = set()
+            for match in rules.pattern_any.finditer(block):
+                index = bisect_right(line_starts, match.start()) - 1
+                if index in checked:
+                    continue
+                checked.add(index)
+                for name, _, regex in rules.pattern_rules:
+                    if name not in self.pattern_hits and regex.search(lines[index]):
+                        self.pattern_hits[name] = first_line_number + index
+                if len(self.pattern_hits) == len(rules.pattern_rules):
+                    break
+
+        self._before.extend(lines[-CONTEXT_LINES:])
+
+    def _categorize(self, lines, index, line_number, hits):
+        line = lines[index]
+        for category, indicators in self.rules.error_categories:
+            for indicator in indicators:
+                if indicator in hits:
+                    # Context before the line may come from earlier blocks
+                    if index >= CONTEXT_LINES:
+                        details = lines[index - CONTEXT_LINES:index]
+                    else:
+                        earlier = list(self._before)[max(0, len(self._before) - (CONTEXT_LINES - index)):]
+                        details = earlier + lines[:index]
+                    after = lines[index + 1:index + 1 + CONTEXT_LINES]
+                    details.extend(after)
+
+                    entry = {
+                        "type": category,
+                        "cause": extract_error_cause(line, indicator),
+                        "line": line,
+                        "line_number": line_number,
+                        "details": details,
+                    }
+                    self.errors.append(entry)
+                    self.error_summary[category] = self.error_summary.get(category, 0) + 1
+                    if len(after) < CONTEXT_LINES:
+                        self._pending.append((entry, CONTEXT_LINES - len(after)))
+                    return
+
+    def signal_matches(self, name):
+        """Indicators of a detection signal seen so far, in rule order"""
+        scorer = self.rules.scorer
+        signal = scorer.signal(name) if scorer else None
+        if signal is None:
+            return []
+
+        found = self.found_folded if signal.ignore_case else self.found_literals
+        matched = []
+        for indicator, pattern in zip(signal.indicators, signal.patterns):
+            if pattern in found:
+                matched.append(indicator)
+                if len(matched) >= signal.min_matches:
+                    break
+        return matched
+
+    def has_signal(self, name):
+        """Whether a detection signal has reached its minimum number of matches"""
+        scorer = self.rules.scorer
+        signal = scorer.signal(name) if scorer else None
+        return signal is not None and len(self.signal_matches(name)) >= signal.min_matches
+
+    def result(self):
+        """
+        Analysis of the lines processed so far.
+
+        Returns:
+            dict: score, working, verdict and reasons (when the rules have a
+            scorer), errors sorted by category, error_summary, patterns
+            (name -> first line number) and line_count
+        """
+        analysis = {
+            "errors": sorted(self.errors, key=lambda entry: entry["type"]),
+            "error_summary": dict(self.error_summary),
+            "patterns": dict(self.pattern_hits),
+            "line_count": self.line_count,
+        }
+
+        scorer = self.rules.scorer
+        if scorer:
+            matches = {signal.name: self.signal_matches(signal.name) for signal in scorer.signals}
+            scored = scorer.score_matches(matches)
+            analysis.update(scored)
+            analysis["verdict"] = scorer.verdict_for_score(scored["score"])
+
+        return analysis
+
+
+def analyze_text(text, rules=None):
+    """Analyze a complete log in one call"""
+    analyzer = LogAnalyzer(rules)
+    analyzer.feed(text)
+    return analyzer.finish()
+
+
+def extract_error_cause(line, indicator):
+    """Extract a more specific error cause from an error line."""
+    try:
+        # Try to extract what's after the indicator
+        if indicator in line:
+            parts = line.split(indicator, 1)
+            if len(parts) > 1:
+                # Special case for file not found errors - include path
+                if indicator in ["Failed to open file", "No such file or directory"]:
+                    # Try to extract file path
+                    path_match = extract_file_path(parts[1])
+                    if path_match:
+                        return f"Path: {path_match}"
+
+                # Special case for dex file errors
+                if "dex" in indicator.lower():
+                    path_match = extract_file_path(parts[1])
+                    if path_match:
+                        return f"Dex file: {path_match}"
+
+                # Check for asset errors
+                if any(asset_indicator in indicator for asset_indicator in ["Failed to load", "Could not load", "AssetsProvider"]):
+                    path_match = extract_file_path(parts[1])
+                    if path_match:
+                        return f"Asset: {path_match}"
+
+                # Get what's after the indicator until the end of line or first :
+                cause = parts[1].strip()
+                if ":" in cause:
+                    cause = cause.split(":", 1)[0].strip()
+                # Truncate if too long
+                return cause[:50] + ("..." if len(cause) > 50 else "")
+    except Exception:
+        pass
+
+    # If all else fails, return a general message
+    return "See details for more information"
+
+
+def extract_file_path(text):
+    """Extract a file path from text using regex patterns."""
+    # Try different patterns to extract file paths
+    # Pattern 1: Quoted paths
+    path_matches = re.findall(r"['\"]([^'\"]*?(?:/|\\)[^'\"]*?)['\"]", text)
+    if path_matches:
+        return path_matches[0]
+
+    # Pattern 2: Common Unix paths starting with /
+    path_matches = re.findall(r"(/[^ :,\"']*)", text)
+    if path_matches:
+        return path_matches[0]
+
+    # Pattern 3: Paths with extension
+    path_matches = re.findall(r"(\S+\.(apk|dex|so|jar|xml|png|jpg))", text)
+    if path_matches:
+        return path_matches[0][0]
+
+    # Pattern 4: Windows-style paths
+    path_matches = re.findall(r"([A-Za-z]:\\[^ :,\"']*)", text)
+    if path_matches:
+        return path_matches[0]
+
+    return None
@@ -0,0 +1,116 @@
+"""
+Logging setup for ATL GUI.
+
+Modules log through their own logger and let the logging module format
+messages lazily, so a disabled debug message costs one level check:
+
+    logger = logging.getLogger(__name__)
+    logger.debug("Sending execute command: %s", command)
+
+setup_logging() picks the level from the command line (--log-level) or the
+ATL_GUI_LOG_LEVEL environment variable, writes messages at that level to
+stderr and keeps the most recent messages of INFO and above in a ring
+buffer (see recent_log_lines()), so they can be shown or exported after
+something went wrong even when the console is quiet.
+
+This module has no GTK dependency so it can be used from scripts.
+"""
+import os
+import sys
+import logging
+import collections
+
+# Environment variable holding the console log level; it is also how child
+# processes (the terminal worker) inherit the level
+LOG_LEVEL_ENV = "ATL_GUI_LOG_LEVEL"
+
+# Console level when neither the command line nor the environment set one
+DEFAULT_LEVEL = "WARNING"
+
+# Messages kept in memory, and the lowest level kept
+RING_BUFFER_SIZE = 2000
+RING_BUFFER_LEVEL = logging.INFO
+
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+
+LEVEL_NAMES = ("debug", "info", "warning", "error", "critical")
+
+_ring_buffer = None
+
+
+class RingBufferHandler(logging.Handler):
+    """Keeps the last records in memory; formatting is deferred until they are read"""
+
+    def __init__(self, capacity=RING_BUFFER_SIZE, level=RING_BUFFER_LEVEL):
+        super().__init__(level)
+        self.records = collections.deque(maxlen=capacity)
+
+    def emit(self, record):
+        self.records.append(record)
+
+    def lines(self, count=None):
+        """Formatted records, oldest first"""
+        records = list(self.records)
+        if count is not None:
+            records = records[-count:]
+        return [self.format(record) for record in records]
+
+
+def parse_level(name, default=DEFAULT_LEVEL):
+    """Logging level from a name such as "debug" or a number, else the default"""
+    if name is None or str(name).strip() == "":
+        name = default
+    name = str(name).strip()
+    if name.isdigit():
+        return int(name)
+    level = logging.getLevelName(name.upper())
+    if isinstance(level, int):
+        return level
+    print(f"[WARNING] Unknown log level '{name}', using {default}", file=sys.stderr)
+    return logging.getLevelName(default.upper())
+
+
+def setup_logging(level=None):
+    """
+    Configure the root logger once per process.
+
+    Args:
+        level: Console level name; defaults to $ATL_GUI_LOG_LEVEL, else WARNING
+
+    Returns:
+        RingBufferHandler: The in-memory buffer of recent messages
+    """
+    global _ring_buffer
+
+    if level is None:
+        level = os.environ.get(LOG_LEVEL_ENV)
+    console_level = parse_level(level)
+    # Child processes started later use the same level
+    os.environ[LOG_LEVEL_ENV] = logging.getLevelName(console_level)
+
+    root = logging.getLogger()
+    formatter = logging.Formatter(LOG_FORMAT)
+
+    if _ring_buffer is None:
+        console = logging.StreamHandler(sys.stderr)
+        console.setFormatter(formatter)
+        root.addHandler(console)
+
+        _ring_buffer = RingBufferHandler()
+        _ring_buffer.setFormatter(formatter)
+        root.addHandler(_ring_buffer)
+
+    for handler in root.handlers:
+        if isinstance(handler, logging.StreamHandler) and handler.stream is sys.stderr:
+            handler.setLevel(console_level)
+
+    # Records below both handler levels are never created
+    root.setLevel(min(console_level, _ring_buffer.level))
+    return _ring_buffer
+
+
+def recent_log_lines(count=None):
+    """The last messages kept by the ring buffer, formatted (empty before setup_logging)"""
+    if _ring_buffer is None:
+        return []
+    return _ring_buffer.lines(count)
@@ -1,10 +1,53 @@
 import os
 import json
+import sqlite3
 import datetime
+import atexit
+import threading
+import time
 from pathlib import Path
 
-# Maximum number of recent APKs to store
-MAX_RECENT_APKS = 5
+# Rows returned per page by search_recent_apks
+RECENT_PAGE_SIZE = 200
+
+# Seconds the history writer waits for more updates before writing them
+WRITE_DELAY = 0.5
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS recent_apks (
+    path TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    name_lower TEXT NOT NULL,
+    path_lower TEXT NOT NULL,
+    last_run TEXT NOT NULL,
+    status TEXT NOT NULL,
+    run_count INTEGER NOT NULL DEFAULT 1
+);
+DROP INDEX IF EXISTS recent_apks_last_run;
+DROP INDEX IF EXISTS recent_apks_status;
+CREATE INDEX IF NOT EXISTS recent_apks_recent ON recent_apks (last_run, path);
+CREATE INDEX IF NOT EXISTS recent_apks_status_recent ON recent_apks (status, last_run, path);
+CREATE INDEX IF NOT EXISTS recent_apks_name ON recent_apks (name_lower);
+"""
+
+_connection = None
+_connection_lock = threading.Lock()
+
+# Connection of the readers: with WAL they read the last committed state
+# while the writer thread commits, instead of waiting for its fsync
+_read_connection = None
+_read_lock = threading.Lock()
+
+# Write-behind queue: APK path -> (status, timestamp, number of runs).
+# save_recent_apk only updates this dictionary; a background thread writes
+# it to the database, so several saves of the same APK become one write.
+_pending = {}
+# Entries taken off _pending that the writer thread is committing
+_in_flight = {}
+_pending_condition = threading.Condition()
+_flush_requested = False
+_writing = False
+_writer_thread = None
 
 def get_config_dir():
     """Get the configuration directory for the application."""
@@ -13,60 +56,301 @@ def get_config_dir():
     return config_dir
 
 def get_recent_apks_file():
-    """Get the path to the recent APKs file."""
+    """Get the path to the old JSON recent APKs file (imported once into the database)."""
     return os.path.join(get_config_dir(), "recent_apks.json")
 
-def load_recent_apks():
-    """Load recent APKs from the config file."""
+def get_history_db_file():
+    """Get the path to the APK history database."""
+    return os.path.join(get_config_dir(), "history.db")
+
+def _get_connection():
+    """Open the history database once per process, importing the old JSON list"""
+    global _connection
+    if _connection is None:
+        connection = sqlite3.connect(get_history_db_file(), check_same_thread=False)
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=FULL")
+        connection.executescript(_SCHEMA)
+        _import_json_history(connection)
+        _connection = connection
+    return _connection
+
+def _get_read_connection():
+    """Open the connection used by searches (after the database has been set up)"""
+    global _read_connection
+    if _read_connection is None:
+        with _connection_lock:
+            _get_connection()
+        connection = sqlite3.connect(get_history_db_file(), check_same_thread=False)
+        connection.row_factory = sqlite3.Row
+        _read_connection = connection
+    return _read_connection
+
+def _import_json_history(connection):
+    """Move entries of recent_apks.json into the database and rename the file"""
+    recent_file = get_recent_apks_file()
+    if not os.path.exists(recent_file):
+        return
     try:
-        recent_file = get_recent_apks_file()
-        if os.path.exists(recent_file):
-            with open(recent_file, 'r') as f:
-                data = json.load(f)
-                return data.get('recent_apks', [])
-        return []
+        with open(recent_file, 'r') as f:
+            entries = json.load(f).get('recent_apks', [])
+        with connection:
+            for apk in entries:
+                if apk.get('path'):
+                    _upsert(connection, apk['path'], apk.get('status', 'unknown'), apk.get('last_run') or datetime.datetime.now().isoformat())
+        os.replace(recent_file, recent_file + ".imported")
     except Exception as e:
+        print(f"Error importing recent APKs: {e}")
+
+def _upsert(connection, apk_path, status, timestamp, runs=1):
+    name = os.path.basename(apk_path)
+    connection.execute(
+        """
+        INSERT INTO recent_apks (path, name, name_lower, path_lower, last_run, status, run_count)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(path) DO UPDATE SET
+            last_run = excluded.last_run,
+            status = excluded.status,
+            run_count = run_count + excluded.run_count
+        """,
+        (apk_path, name, name.lower(), apk_path.lower(), timestamp, status, runs),
+    )
+
+def _escape_like(text):
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def page_cursor(apk_data):
+    """Position after a row returned by search_recent_apks, for its after argument"""
+    return (apk_data['last_run'], apk_data['path'])
+
+def search_recent_apks(query="", status=None, prefix=False, limit=RECENT_PAGE_SIZE, after=None):
+    """
+    Search the APK history, newest first.
+
+    Pages are read with a cursor instead of an offset, so entries saved
+    while the list is being paged neither shift rows onto the next page
+    twice nor push any off it.
+
+    Args:
+        query (str): Text to look for in the APK name or path (case insensitive)
+        status (str): Only return APKs with this status (working, not_working...)
+        prefix (bool): Match the start of the APK name only; this uses the
+            name index instead of scanning every row
+        limit (int): Page size, or None for all matches
+        after (tuple): page_cursor() of the last row of the previous page,
+            or None for the first page
+
+    Returns:
+        list: Dictionaries with path, name, last_run, status and run_count
+    """
+    query = query.strip().lower()
+    # Saves still waiting in the write-behind queue are newer than their rows
+    queued = _queued_entries()
+    conditions, params = _search_conditions(query, status, prefix)
+    if after:
+        # Row value comparison, so the index seeks straight to the cursor
+        conditions.append("(last_run, path) < (?, ?)")
+        params.extend(after)
+
+    sql = "SELECT path, name, last_run, status, run_count FROM recent_apks"
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    sql += " ORDER BY last_run DESC, path DESC"
+    if limit is not None:
+        # Rows replaced by queued entries are dropped below
+        sql += " LIMIT ?"
+        params.append(limit + len(queued))
+
+    try:
+        with _read_lock:
+            connection = _get_read_connection()
+            rows = [dict(row) for row in connection.execute(sql, params)]
+            stored = _stored_run_counts(connection, queued)
+    except sqlite3.Error as e:
         print(f"Error loading recent APKs: {e}")
         return []
 
+    results = [row for row in rows if row['path'] not in queued]
+    for apk_path, entry in queued.items():
+        row = _queued_row(apk_path, entry, stored.get(apk_path))
+        if _row_matches(row, query, status, prefix) and (not after or page_cursor(row) < tuple(after)):
+            results.append(row)
+    results.sort(key=page_cursor, reverse=True)
+    return results if limit is None else results[:limit]
+
+def count_recent_apks(status=None):
+    """Number of APKs in the history, optionally with a given status."""
+    queued = _queued_entries()
+    conditions, params = _search_conditions("", status, False)
+    if queued:
+        conditions.append(f"path NOT IN ({', '.join('?' * len(queued))})")
+        params.extend(queued)
+    sql = "SELECT COUNT(*) FROM recent_apks"
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    try:
+        with _read_lock:
+            count = _get_read_connection().execute(sql, params).fetchone()[0]
+    except sqlite3.Error as e:
+        print(f"Error counting recent APKs: {e}")
+        return 0
+    return count + sum(1 for entry in queued.values() if not status or entry['status'] == status)
+
+def _search_conditions(query, status, prefix):
+    """SQL conditions and parameters of a history search"""
+    conditions = []
+    params = []
+    if query:
+        if prefix:
+            # A range on the name index (LIKE would not use it)
+            conditions.append("name_lower >= ? AND name_lower < ?")
+            params.extend([query, query + "\U0010ffff"])
+        else:
+            pattern = "%" + _escape_like(query) + "%"
+            conditions.append("(name_lower LIKE ? ESCAPE '\\' OR path_lower LIKE ? ESCAPE '\\')")
+            params.extend([pattern, pattern])
+    if status:
+        conditions.append("status = ?")
+        params.append(status)
+    return conditions, params
+
+def _queued_entries():
+    """
+    Entries saved but not committed yet, by APK path.
+
+    Returns:
+        dict: status, last_run, runs (not committed yet) and the timestamp
+        and runs of the part the writer thread is committing
+    """
+    with _pending_condition:
+        in_flight = dict(_in_flight)
+        pending = dict(_pending)
+    entries = {}
+    for apk_path, (status, timestamp, runs) in in_flight.items():
+        entries[apk_path] = {'status': status, 'last_run': timestamp, 'runs': runs,
+                             'flight_timestamp': timestamp, 'flight_runs': runs}
+    for apk_path, (status, timestamp, runs) in pending.items():
+        entry = entries.setdefault(apk_path, {'runs': 0, 'flight_timestamp': None, 'flight_runs': 0})
+        entry.update(status=status, last_run=timestamp, runs=entry['runs'] + runs)
+    # The writer skips APKs that no longer exist
+    return {apk_path: entry for apk_path, entry in entries.items() if os.path.exists(apk_path)}
+
+def _stored_run_counts(connection, queued):
+    """(last_run, run_count) of the stored rows of queued APKs"""
+    if not queued:
+        return {}
+    sql = f"SELECT path, last_run, run_count FROM recent_apks WHERE path IN ({', '.join('?' * len(queued))})"
+    return {row['path']: (row['last_run'], row['run_count']) for row in connection.execute(sql, list(queued))}
+
+def _queued_row(apk_path, entry, stored):
+    """A search result for a queued entry"""
+    run_count = entry['runs']
+    if stored:
+        stored_last_run, stored_runs = stored
+        # The in-flight part may already be committed
+        if stored_last_run == entry['flight_timestamp']:
+            run_count -= entry['flight_runs']
+        run_count += stored_runs
+    name = os.path.basename(apk_path)
+    return {'path': apk_path, 'name': name, 'last_run': entry['last_run'],
+            'status': entry['status'], 'run_count': run_count}
+
+def _row_matches(row, query, status, prefix):
+    """Whether a result matches a search, like the SQL conditions"""
+    if status and row['status'] != status:
+        return False
+    if not query:
+        return True
+    name = row['name'].lower()
+    if prefix:
+        return name.startswith(query)
+    return query in name or query in row['path'].lower()
+
+def load_recent_apks(limit=None):
+    """Load recent APKs, newest first."""
+    return search_recent_apks(limit=limit)
+
 def save_recent_apk(apk_path, status="unknown"):
     """
-    Add an APK to the recent list with metadata.
-    
+    Add an APK to the history or update its entry.
+
+    The entry is only queued here and written shortly after by a background
+    thread, so this never waits for the disk. Call flush_recent_apks() to
+    make sure queued entries are written.
+
     Args:
         apk_path (str): Path to the APK file
         status (str): Status of the APK (working, not_working, skipped, or unknown)
     """
-    if not os.path.exists(apk_path):
-        return
-        
-    # Load existing recent APKs
-    recent_apks = load_recent_apks()
-    
-    # Get current timestamp
     timestamp = datetime.datetime.now().isoformat()
-    
-    # Create metadata for the APK
-    apk_name = os.path.basename(apk_path)
-    apk_data = {
-        'path': apk_path,
-        'name': apk_name,
-        'last_run': timestamp,
-        'status': status
-    }
-    
-    # Remove this APK if already in the list
-    recent_apks = [apk for apk in recent_apks if apk.get('path') != apk_path]
-    
-    # Add the APK at the beginning of the list
-    recent_apks.insert(0, apk_data)
-    
-    # Limit the number of recent APKs
-    recent_apks = recent_apks[:MAX_RECENT_APKS]
-    
-    # Save the updated list
-    try:
-        with open(get_recent_apks_file(), 'w') as f:
-            json.dump({'recent_apks': recent_apks}, f, indent=2)
-    except Exception as e:
-        print(f"Error saving recent APKs: {e}") 
\ No newline at end of file
+    with _pending_condition:
+        queued = _pending.get(apk_path)
+        runs = queued[2] + 1 if queued else 1
+        _pending[apk_path] = (status, timestamp, runs)
+        _start_writer()
+        _pending_condition.notify_all()
+
+def flush_recent_apks(timeout=None):
+    """
+    Write queued history entries now and wait until they are on disk.
+
+    Args:
+        timeout (float): Maximum seconds to wait, or None to wait until done
+
+    Returns:
+        bool: False if the timeout expired first
+    """
+    global _flush_requested
+    with _pending_condition:
+        if not _pending and not _writing:
+            return True
+        _flush_requested = True
+        _pending_condition.notify_all()
+        return _pending_condition.wait_for(lambda: not _pending and not _writing, timeout)
+
+def _start_writer():
+    """Start the history writer thread (called with _pending_condition held)"""
+    global _writer_thread
+    if _writer_thread is None or not _writer_thread.is_alive():
+        _writer_thread = threading.Thread(target=_write_pending, name="recent-apks-writer", daemon=True)
+        _writer_thread.start()
+
+def _write_pending():
+    """Writer thread: wait for queued entries, coalesce them and write them in one transaction"""
+    global _flush_requested, _writing
+    while True:
+        with _pending_condition:
+            _pending_condition.wait_for(lambda: _pending)
+            deadline = time.monotonic() + WRITE_DELAY
+            while not _flush_requested:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                _pending_condition.wait(remaining)
+            batch = dict(_pending)
+            _pending.clear()
+            _in_flight.update(batch)
+            _writing = True
+
+        try:
+            entries = [(path, entry) for path, entry in batch.items() if os.path.exists(path)]
+            with _connection_lock:
+                connection = _get_connection()
+                # Committing with synchronous=FULL fsyncs the database, and
+                # SQLite replaces the old rows atomically
+                with connection:
+                    for apk_path, (status, timestamp, runs) in entries:
+                        _upsert(connection, apk_path, status, timestamp, runs)
+        except (sqlite3.Error, OSError) as e:
+            print(f"Error saving recent APKs: {e}")
+        finally:
+            with _pending_condition:
+                _in_flight.clear()
+                _writing = False
+                if not _pending:
+                    _flush_requested = False
+                _pending_condition.notify_all()
+
+# Scripts that save history entries exit without losing them
+atexit.register(flush_recent_apks, 5)
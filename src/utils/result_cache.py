@@ -0,0 +1,156 @@
+"""
+Result cache for incremental re-testing.
+
+A verdict only depends on the APK, the ATL build and how ATL was started,
+so it is stored under a key made of:
+
+    - the SHA-256 of the APK
+    - the fingerprint of the ATL build (see atl_registry.py)
+    - the effective launch options
+    - the launch environment variables
+
+When none of them changed since the last run the stored verdict can be
+reused instead of launching the app again. File hashes are remembered
+together with the file size and mtime, so unchanged files are not hashed
+twice.
+
+This module has no GTK dependency so it can be used from scripts.
+"""
+import os
+import json
+import time
+import hashlib
+import threading
+
+from src.utils.recent_apks import get_config_dir
+from src.utils.atl_registry import get_atl_registry, file_digest
+
+# Bump when the key layout changes to drop old entries
+CACHE_VERSION = 1
+
+
+def get_cache_file():
+    """Get the path to the result cache file."""
+    return os.path.join(get_config_dir(), "result_cache.json")
+
+
+def _canonical(value):
+    """
+    Stable JSON text of options and environment dictionaries.
+
+    Unset options are dropped, so {"activity_name": None} and {} give the
+    same key.
+    """
+    value = {key: item for key, item in (value or {}).items() if item not in (None, "", [], {}, False)}
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+
+
+class ResultCache:
+    """Verdicts keyed on everything that can change a launch"""
+
+    def __init__(self, path=None):
+        self.path = path or get_cache_file()
+        self._lock = threading.Lock()
+        self._hashes = {}
+        self._results = {}
+        self._dirty = False
+        self.load()
+
+    def load(self):
+        """Read the cache file (a missing or corrupt file gives an empty cache)"""
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+        if data.get("version") != CACHE_VERSION:
+            return
+        self._hashes = data.get("hashes", {})
+        self._results = data.get("results", {})
+
+    def save(self):
+        """Write the cache atomically if anything changed"""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {"version": CACHE_VERSION, "hashes": self._hashes, "results": self._results}
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w") as f:
+                json.dump(data, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+            self._dirty = False
+
+    def file_hash(self, path):
+        """SHA-256 of a file, reused while its size and mtime are unchanged"""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        stamp = [stat.st_size, stat.st_mtime_ns]
+        with self._lock:
+            known = self._hashes.get(path)
+            if known and known[:2] == stamp:
+                return known[2]
+        digest = file_digest(path)
+        with self._lock:
+            self._hashes[path] = stamp + [digest]
+            self._dirty = True
+        return digest
+
+    def atl_fingerprint(self, atl_executable):
+        """
+        Identify an ATL build.
+
+        Returns:
+            str: Hash of the binary and its version output, or the plain
+            name if the binary could not be found
+        """
+        return get_atl_registry().fingerprint(atl_executable)
+
+    def make_key(self, apk_path, atl_fingerprint, launch_options=None, env_vars=None):
+        """Cache key of one launch"""
+        parts = [
+            self.file_hash(apk_path),
+            atl_fingerprint,
+            _canonical(launch_options),
+            _canonical(env_vars),
+        ]
+        return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+    def lookup(self, key):
+        """Stored entry for a key (dict with result, apk, time...), or None"""
+        with self._lock:
+            return self._results.get(key)
+
+    def store(self, key, apk_path, result, **details):
+        """Remember the verdict of a launch"""
+        entry = {"apk": apk_path, "result": result, "time": time.time()}
+        entry.update(details)
+        with self._lock:
+            self._results[key] = entry
+            self._dirty = True
+
+    def split_changed(self, apk_files, atl_executable, launch_options=None, env_vars=None):
+        """
+        Separate APKs that need a new run from those with a reusable verdict.
+
+        Returns:
+            tuple: (changed APK list, {APK: cached entry}, {APK: cache key})
+        """
+        fingerprint = self.atl_fingerprint(atl_executable)
+        changed = []
+        cached = {}
+        keys = {}
+        for apk_path in apk_files:
+            try:
+                key = self.make_key(apk_path, fingerprint, launch_options, env_vars)
+            except OSError:
+                changed.append(apk_path)
+                continue
+            keys[apk_path] = key
+            entry = self.lookup(key)
+            if entry:
+                cached[apk_path] = entry
+            else:
+                changed.append(apk_path)
+        return changed, cached, keys
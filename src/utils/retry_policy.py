@@ -0,0 +1,85 @@
+"""
+Retry policy for flaky launches.
+
+ATL launches sometimes fail for reasons that have nothing to do with the
+app (GPU initialization races, D-Bus timing...). An automatic "not_working"
+verdict is therefore retried, with a growing delay between attempts,
+until one of the verdicts reaches a quorum of the allowed attempts:
+
+    max_attempts=3, quorum=2
+    not_working, not_working           -> not_working
+    not_working, working, working      -> working (flaky)
+    not_working, working, not_working  -> not_working (flaky)
+
+A first "working" verdict is never retried. A batch where the attempts of
+an APK disagree marks it flaky; the flake rate across runs is computed
+from the run journals (see test_scheduler.load_history).
+
+This module has no GTK dependency so it can be used from scripts.
+"""
+
+# Attempts per APK, including the first one
+DEFAULT_MAX_ATTEMPTS = 3
+
+# Seconds before the first retry, multiplied by BACKOFF_FACTOR after each one
+DEFAULT_BACKOFF = 2.0
+BACKOFF_FACTOR = 2.0
+
+
+class RetryPolicy:
+    """Decides when a failed launch is retried and what the final verdict is"""
+
+    def __init__(self, max_attempts=DEFAULT_MAX_ATTEMPTS, backoff=DEFAULT_BACKOFF, backoff_factor=BACKOFF_FACTOR):
+        self.max_attempts = max(1, int(max_attempts))
+        self.backoff = max(0.0, float(backoff))
+        self.backoff_factor = backoff_factor
+
+    @classmethod
+    def from_config(cls, config):
+        """Policy from the retry_attempts and retry_backoff_seconds settings"""
+        config = config or {}
+        try:
+            return cls(config.get("retry_attempts", DEFAULT_MAX_ATTEMPTS),
+                       config.get("retry_backoff_seconds", DEFAULT_BACKOFF))
+        except (TypeError, ValueError):
+            return cls()
+
+    @property
+    def quorum(self):
+        """Number of agreeing attempts that settles a verdict"""
+        return self.max_attempts // 2 + 1
+
+    def needs_retry(self, attempts):
+        """
+        Whether another attempt is needed.
+
+        Args:
+            attempts: Verdicts so far ("working" / "not_working"), oldest first
+        """
+        if not attempts:
+            return True
+        if attempts == ["working"] or len(attempts) >= self.max_attempts:
+            return False
+        return max(attempts.count("working"), attempts.count("not_working")) < self.quorum
+
+    def delay(self, attempt_count):
+        """Seconds to wait before the next attempt, after attempt_count attempts"""
+        return self.backoff * self.backoff_factor ** max(0, attempt_count - 1)
+
+    def verdict(self, attempts):
+        """
+        Final verdict of the attempts.
+
+        The majority wins. A tie (only possible with an even number of
+        attempts) counts as working, since the app did start at least once;
+        it is still reported as flaky.
+        """
+        if not attempts:
+            return None
+        working = attempts.count("working")
+        return "working" if working * 2 >= len(attempts) else "not_working"
+
+
+def is_flaky(attempts):
+    """Whether the attempts of one APK disagree"""
+    return len(set(attempts)) > 1
@@ -0,0 +1,223 @@
+"""
+Run-to-run comparison for ATL GUI.
+
+Compares two run journals (see run_journal.py) and reports what changed:
+APKs that broke or got fixed, large detection score changes, error
+signatures (see failure_clustering.py) that did not occur in the older
+run, and APKs that were added or removed.
+
+Both runs are indexed on the APK with the last result of every APK
+(the final verdict after retries or a resume) and then joined, so
+comparing two runs costs one pass over each journal. APKs are matched by
+full path, or by file name when the two runs tested different folders.
+
+This module has no GTK dependency so it can be used from scripts.
+"""
+import os
+
+from src.utils.run_journal import iter_events, iter_results, list_runs, is_finished
+
+# Smallest score change worth reporting
+SCORE_DELTA_THRESHOLD = 15
+
+
+def _apk_key(apk_path, by_name):
+    return os.path.basename(apk_path) if by_name else apk_path
+
+
+def index_run(journal_path, by_name=False):
+    """
+    Last result event of every APK in a journal.
+
+    Args:
+        journal_path: Run journal to read
+        by_name: Key on the APK file name instead of its full path, to
+            compare runs of the same APKs stored in different folders
+
+    Returns:
+        dict: APK key -> result event
+    """
+    return {_apk_key(event["apk"], by_name): event for event in iter_results(journal_path)}
+
+
+def run_apk_files(journal_path):
+    """APK paths of a run, including the ones queued while it ran"""
+    apk_files = []
+    for event in iter_events(journal_path):
+        if event.get("event") in ("batch", "enqueue"):
+            apk_files.extend(event.get("apk_files", []))
+    return apk_files
+
+
+def match_by_name(old_path, new_path):
+    """
+    Whether two runs should be compared by APK file name.
+
+    Only when they tested different folders and no run has two APKs with
+    the same file name, which would overwrite each other.
+    """
+    old_files, new_files = run_apk_files(old_path), run_apk_files(new_path)
+    if {os.path.dirname(path) for path in old_files} == {os.path.dirname(path) for path in new_files}:
+        return False
+    return all(len({os.path.basename(path) for path in files}) == len(set(files))
+               for files in (old_files, new_files))
+
+
+def run_atl_build(journal_path):
+    """ATL build a run was made with (fingerprint, version, commit), or {} for older journals"""
+    for event in iter_events(journal_path):
+        if event.get("event") == "batch":
+            return event.get("metadata", {}).get("atl_build") or {}
+        break
+    return {}
+
+
+def diff_runs(old_path, new_path, by_name=None, score_threshold=SCORE_DELTA_THRESHOLD):
+    """
+    Compare two runs.
+
+    Args:
+        by_name: Match APKs by file name (True) or full path (False);
+            None decides with match_by_name()
+
+    Returns:
+        dict with lists newly_broken, newly_fixed (result events of the new
+        run, with "previous" set to the old result), score_deltas
+        ((apk, old score, new score) sorted by largest change), added and
+        removed APK keys, new_signatures (signature -> {"label", "apks"}),
+        common (number of APKs found in both runs), by_name (how APKs
+        were matched) and the ATL builds of both runs (old_atl, new_atl,
+        atl_changed)
+    """
+    if by_name is None:
+        by_name = match_by_name(old_path, new_path)
+    old = index_run(old_path, by_name)
+    new = index_run(new_path, by_name)
+    old_signatures = {event.get("signature") for event in old.values() if event.get("signature")}
+
+    diff = {
+        "old_run": old_path,
+        "new_run": new_path,
+        "newly_broken": [],
+        "newly_fixed": [],
+        "score_deltas": [],
+        "added": [],
+        "removed": [],
+        "new_signatures": {},
+        "common": 0,
+        "by_name": by_name,
+        "old_atl": run_atl_build(old_path),
+        "new_atl": run_atl_build(new_path),
+    }
+    diff["atl_changed"] = bool(diff["old_atl"] and diff["new_atl"]) and \
+        diff["old_atl"].get("fingerprint") != diff["new_atl"].get("fingerprint")
+
+    for key, event in new.items():
+        result = event.get("result")
+        previous = old.get(key)
+
+        signature = event.get("signature")
+        if signature and result == "not_working" and signature not in old_signatures:
+            entry = diff["new_signatures"].setdefault(signature, {"label": event.get("label", ""), "apks": []})
+            entry["apks"].append(event["apk"])
+
+        if previous is None:
+            diff["added"].append(key)
+            continue
+        diff["common"] += 1
+
+        previous_result = previous.get("result")
+        if previous_result == "working" and result == "not_working":
+            diff["newly_broken"].append(dict(event, previous=previous_result))
+        elif previous_result == "not_working" and result == "working":
+            diff["newly_fixed"].append(dict(event, previous=previous_result))
+
+        old_score, new_score = previous.get("score"), event.get("score")
+        if old_score is not None and new_score is not None and abs(new_score - old_score) >= score_threshold:
+            diff["score_deltas"].append((key, old_score, new_score))
+
+    diff["removed"] = [key for key in old if key not in new]
+    diff["score_deltas"].sort(key=lambda delta: -abs(delta[2] - delta[1]))
+    return diff
+
+
+def previous_run(journal_path, runs_dir=None):
+    """The newest finished journal older than journal_path, or None"""
+    runs = list_runs(runs_dir)
+    try:
+        older = runs[runs.index(journal_path) + 1:]
+    except ValueError:
+        older = [path for path in runs if os.path.getmtime(path) < os.path.getmtime(journal_path)]
+    for path in older:
+        if is_finished(path):
+            return path
+    return None
+
+
+def describe_build(build):
+    """Short name of an ATL build: its version and commit, else its fingerprint"""
+    text = build.get("version") or build.get("fingerprint", "")[:12] or "unknown"
+    if build.get("commit") and build["commit"] not in text:
+        text += f" ({build['commit']})"
+    return text
+
+
+def has_changes(diff):
+    """Whether a diff has anything to report"""
+    return any(diff[name] for name in ("newly_broken", "newly_fixed", "score_deltas", "added", "removed", "new_signatures"))
+
+
+def format_diff(diff):
+    """
+    Human readable report of a diff.
+
+    Returns:
+        list: Lines of text
+    """
+    def name(key):
+        return os.path.basename(key)
+
+    lines = [
+        f"Old run: {diff['old_run']}",
+        f"New run: {diff['new_run']}",
+        f"Newly broken: {len(diff['newly_broken'])}, newly fixed: {len(diff['newly_fixed'])}, "
+        f"new error signatures: {len(diff['new_signatures'])}, added: {len(diff['added'])}, removed: {len(diff['removed'])}",
+    ]
+
+    if diff.get("atl_changed"):
+        lines.append(f"ATL build changed: {describe_build(diff['old_atl'])} -> {describe_build(diff['new_atl'])}")
+
+    if diff["newly_broken"]:
+        lines.append("")
+        lines.append("Newly broken:")
+        for event in diff["newly_broken"]:
+            label = f" - {event['label']}" if event.get("label") else ""
+            lines.append(f"    {name(event['apk'])}{label}")
+
+    if diff["newly_fixed"]:
+        lines.append("")
+        lines.append("Newly fixed:")
+        for event in diff["newly_fixed"]:
+            lines.append(f"    {name(event['apk'])}")
+
+    if diff["new_signatures"]:
+        lines.append("")
+        lines.append("New error signatures:")
+        for entry in sorted(diff["new_signatures"].values(), key=lambda entry: -len(entry["apks"])):
+            lines.append(f"    {len(entry['apks'])} x {entry['label']}")
+            for apk_path in entry["apks"]:
+                lines.append(f"        {name(apk_path)}")
+
+    if diff["score_deltas"]:
+        lines.append("")
+        lines.append("Score changes:")
+        for key, old_score, new_score in diff["score_deltas"]:
+            lines.append(f"    {name(key)}: {old_score} -> {new_score} ({new_score - old_score:+g})")
+
+    for title, keys in (("Added", diff["added"]), ("Removed", diff["removed"])):
+        if keys:
+            lines.append("")
+            lines.append(f"{title}:")
+            lines.extend(f"    {name(key)}" for key in keys)
+
+    return lines
@@ -0,0 +1,266 @@
+"""
+Checkpoint journal for APK test batches.
+
+Every batch gets an append-only JSON Lines file in ~/.config/atl-gui/runs/.
+One event is written (and flushed to disk) per step:
+
+    {"event": "batch", "run_id": ..., "apk_files": [...], ...}
+    {"event": "enqueue", "apk_files": [...], "time": ...}
+    {"event": "start", "apk": ..., "time": ...}
+    {"event": "result", "apk": ..., "result": "working", "time": ...}
+    {"event": "finished", "time": ...}
+
+A batch without a "finished" event was interrupted. Loading its journal
+gives the completed results and the APKs still to run, including the one
+that was in flight when the GUI or machine went down.
+
+This module has no GTK dependency so it can be used from scripts.
+"""
+import os
+import json
+import time
+import datetime
+import secrets
+import threading
+
+from src.utils.recent_apks import get_config_dir
+
+# Results that mean an APK does not need to run again on resume
+COMPLETED_RESULTS = ("working", "not_working", "skipped")
+
+# Journals kept in the runs directory; older ones are deleted when a new
+# batch starts
+KEEP_RUNS = 200
+
+
+def get_runs_dir():
+    """Get the directory holding the run journals."""
+    runs_dir = os.path.join(get_config_dir(), "runs")
+    os.makedirs(runs_dir, exist_ok=True)
+    return runs_dir
+
+
+class RunJournal:
+    """Append-only writer for one batch journal"""
+
+    def __init__(self, path, run_id, mode="a"):
+        self.path = path
+        self.run_id = run_id
+        self._lock = threading.Lock()
+        self._file = open(path, mode, encoding="utf-8")
+
+    @classmethod
+    def create(cls, apk_files, metadata=None, runs_dir=None):
+        """
+        Start the journal of a new batch.
+
+        Args:
+            apk_files: APK paths of the batch, in test order
+            metadata: Optional dictionary stored with the batch (ATL path, options...)
+            runs_dir: Directory for the journal (defaults to get_runs_dir())
+
+        Returns:
+            RunJournal: Journal ready for start/result events
+        """
+        runs_dir = runs_dir or get_runs_dir()
+        while True:
+            # Two batches started within the same second get different ids,
+            # and "x" never appends to the journal of another batch
+            run_id = (datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+                      + f"-{os.getpid()}-{secrets.token_hex(3)}")
+            path = os.path.join(runs_dir, f"run-{run_id}.jsonl")
+            try:
+                journal = cls(path, run_id, mode="x")
+                break
+            except FileExistsError:
+                continue
+        prune_runs(runs_dir, keep=KEEP_RUNS, exclude=path)
+        journal.append({
+            "event": "batch",
+            "run_id": run_id,
+            "created": datetime.datetime.now().isoformat(),
+            "apk_files": list(apk_files),
+            "metadata": metadata or {},
+        })
+        return journal
+
+    @classmethod
+    def reopen(cls, path):
+        """Continue writing an existing journal (used when resuming)"""
+        state = load_run(path)
+        return cls(path, state["run_id"])
+
+    def append(self, event):
+        """Write one event and make sure it reaches the disk"""
+        event.setdefault("time", time.time())
+        line = json.dumps(event) + "\n"
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def record_enqueue(self, apk_files):
+        """Record APKs added to the end of the batch while it runs"""
+        self.append({"event": "enqueue", "apk_files": list(apk_files)})
+
+    def record_start(self, apk_path):
+        self.append({"event": "start", "apk": apk_path})
+
+    def record_result(self, apk_path, result, **details):
+        """Record the verdict of an APK, with optional extra fields (duration, score...)"""
+        event = {"event": "result", "apk": apk_path, "result": result}
+        event.update(details)
+        self.append(event)
+
+    def finish(self):
+        """Mark the batch as complete and close the journal"""
+        self.append({"event": "finished"})
+        self.close()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    @property
+    def closed(self):
+        return self._file is None
+
+
+def iter_events(path):
+    """
+    Read the events of a journal.
+
+    A line cut short by a crash while it was being written is ignored.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def iter_results(path):
+    """Yield the result events of a journal, in the order they were written"""
+    for event in iter_events(path):
+        if event.get("event") == "result":
+            yield event
+
+
+def load_run(path):
+    """
+    Rebuild the state of a batch from its journal.
+
+    Returns:
+        dict: run_id, path, apk_files, metadata, results (APK -> last
+        result), in_flight (started but without a result), finished flag
+        and pending (APKs still to run, in batch order)
+    """
+    state = {
+        "run_id": None,
+        "path": path,
+        "created": None,
+        "apk_files": [],
+        "metadata": {},
+        "results": {},
+        "in_flight": [],
+        "finished": False,
+    }
+    started = {}
+
+    for event in iter_events(path):
+        kind = event.get("event")
+        if kind == "batch":
+            state["run_id"] = event.get("run_id")
+            state["created"] = event.get("created")
+            state["apk_files"] = event.get("apk_files", [])
+            state["metadata"] = event.get("metadata", {})
+        elif kind == "enqueue":
+            state["apk_files"] = state["apk_files"] + event.get("apk_files", [])
+        elif kind == "start":
+            started[event["apk"]] = True
+        elif kind == "result":
+            state["results"][event["apk"]] = event.get("result")
+            started.pop(event["apk"], None)
+        elif kind == "finished":
+            state["finished"] = True
+
+    state["in_flight"] = list(started)
+    completed = {apk for apk, result in state["results"].items() if result in COMPLETED_RESULTS}
+    state["pending"] = [apk for apk in state["apk_files"] if apk not in completed]
+    return state
+
+
+def is_finished(path):
+    """Whether a journal ends with a "finished" event, reading only its last line"""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        f.seek(max(0, f.tell() - 4096))
+        lines = f.read().splitlines()
+    for line in reversed(lines):
+        if line.strip():
+            try:
+                return json.loads(line).get("event") == "finished"
+            except ValueError:
+                return False
+    return False
+
+
+def list_runs(runs_dir=None):
+    """Journal paths, newest first"""
+    runs_dir = runs_dir or get_runs_dir()
+    paths = [
+        os.path.join(runs_dir, name)
+        for name in os.listdir(runs_dir)
+        if name.startswith("run-") and name.endswith(".jsonl")
+    ]
+    return sorted(paths, key=os.path.getmtime, reverse=True)
+
+
+def prune_runs(runs_dir=None, keep=KEEP_RUNS, exclude=None):
+    """
+    Delete all but the newest journals.
+
+    Args:
+        keep: Number of journals to keep, besides exclude
+        exclude: Journal never deleted (the batch being started)
+
+    Returns:
+        int: Number of journals deleted
+    """
+    runs = [path for path in list_runs(runs_dir) if path != exclude]
+    deleted = 0
+    for path in runs[keep:]:
+        try:
+            os.remove(path)
+            deleted += 1
+        except OSError:
+            pass
+    return deleted
+
+
+def find_resumable_run(runs_dir=None):
+    """
+    Check whether the most recent batch was interrupted.
+
+    Only the newest journal is considered, so starting a new batch
+    abandons an older interrupted one.
+
+    Returns:
+        dict or None: State of the batch (see load_run), or None if the last
+        batch finished
+    """
+    runs = list_runs(runs_dir)
+    if not runs:
+        return None
+    state = load_run(runs[0])
+    if not state["finished"] and state["pending"]:
+        return state
+    return None
@@ -0,0 +1,80 @@
+"""
+Single instance support for ATL GUI.
+
+The GUI is a unique Gio.Application: the first process owns
+APPLICATION_ID on the session bus, and APKs given to a later
+`atl-gui foo.apk` are opened by that process (added to the queue of the
+batch being tested, or started as a new batch). Folders given with
+--watch are sent the same way, with WATCH_HINT.
+
+forward_to_primary() is what the later invocation runs before anything
+else: it only needs Gio, so the paths reach the running window without
+initializing GTK, importing the views or reading the configuration.
+
+This module has no GTK dependency so it can be used from scripts; Gio is
+only imported by the functions that talk to the session bus.
+"""
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Bus name and application id of the running GUI
+APPLICATION_ID = "org.example.atlgui"
+
+# Milliseconds to wait for the bus daemon to answer
+BUS_TIMEOUT = 1000
+
+# Open hint asking the running instance to watch the folders (--watch)
+# instead of testing what they contain now
+WATCH_HINT = "watch"
+
+
+def primary_instance_running():
+    """Whether an ATL GUI owns APPLICATION_ID on the session bus"""
+    from gi.repository import Gio, GLib
+    try:
+        bus = Gio.bus_get_sync(Gio.BusType.SESSION, None)
+        reply = bus.call_sync(
+            "org.freedesktop.DBus", "/org/freedesktop/DBus", "org.freedesktop.DBus",
+            "NameHasOwner", GLib.Variant("(s)", (APPLICATION_ID,)), GLib.VariantType.new("(b)"),
+            Gio.DBusCallFlags.NONE, BUS_TIMEOUT, None
+        )
+    except GLib.Error as e:
+        logger.debug("Session bus not available: %s", e)
+        return False
+    return reply.unpack()[0]
+
+
+def forward_to_primary(paths, hint=""):
+    """
+    Hand APK files and folders over to the running ATL GUI.
+
+    Args:
+        paths: APK files or folders, relative to the current directory
+        hint: "" to test them, WATCH_HINT for folders to watch
+
+    Returns:
+        bool: True if a running instance took them, False if there is
+        none and this process has to start the GUI itself
+    """
+    if not paths or not primary_instance_running():
+        return False
+
+    from gi.repository import Gio, GLib
+    # A launcher never becomes the primary instance, so a GUI that exits
+    # meanwhile can't leave this process holding the bus name
+    launcher = Gio.Application(
+        application_id=APPLICATION_ID,
+        flags=Gio.ApplicationFlags.IS_LAUNCHER | Gio.ApplicationFlags.HANDLES_OPEN
+    )
+    try:
+        launcher.register(None)
+        launcher.open([Gio.File.new_for_path(os.path.abspath(path)) for path in paths], hint)
+        # open() only queues the D-Bus call; send it before this process exits
+        Gio.bus_get_sync(Gio.BusType.SESSION, None).flush_sync(None)
+    except GLib.Error as e:
+        logger.warning("Could not hand the APKs over to the running ATL GUI: %s", e)
+        return False
+    logger.info("Handed %d path(s) over to the running ATL GUI", len(paths))
+    return True
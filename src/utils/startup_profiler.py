@@ -0,0 +1,94 @@
+"""
+Startup profiler for ATL GUI.
+
+With --profile-startup, the phases of a launch (imports, CSS, each view,
+the first frame) are timed and printed as a timeline once the first frame
+has been drawn:
+
+    with startup_profiler.phase("welcome view"):
+        self.welcome_view = create_welcome_view(self)
+
+Times are measured from the moment this module is imported, which
+atl_gui.py does before anything else. When profiling is off, phase()
+and mark() only check a flag.
+
+This module has no GTK dependency so it can be used from scripts.
+"""
+import sys
+import time
+import contextlib
+
+# Reference point of the timeline
+_start = time.perf_counter()
+
+_enabled = False
+
+# (name, start, end) in seconds since _start; marks have start == end
+_phases = []
+
+
+def enable():
+    """Start recording phases"""
+    global _enabled
+    _enabled = True
+
+
+def is_enabled():
+    return _enabled
+
+
+def elapsed():
+    """Seconds since the start of the timeline"""
+    return time.perf_counter() - _start
+
+
+@contextlib.contextmanager
+def phase(name):
+    """Time the enclosed block as one phase of the timeline"""
+    if not _enabled:
+        yield
+        return
+    start = elapsed()
+    try:
+        yield
+    finally:
+        _phases.append((name, start, elapsed()))
+
+
+def mark(name):
+    """Record a point in time, such as the first frame"""
+    if _enabled:
+        now = elapsed()
+        _phases.append((name, now, now))
+
+
+def timeline():
+    """Recorded phases as (name, start, end), in order of their start"""
+    return sorted(_phases, key=lambda entry: (entry[1], -entry[2]))
+
+
+def format_timeline():
+    """
+    The timeline as text, one phase per line.
+
+    Returns:
+        str: Start and duration of each phase in milliseconds; nested
+            phases are indented below the phase that contains them
+    """
+    lines = [f"{'start ms':>10}{'took ms':>10}  phase"]
+    open_phases = []
+    for name, start, end in timeline():
+        while open_phases and start >= open_phases[-1]:
+            open_phases.pop()
+        indent = "  " * len(open_phases)
+        took = f"{(end - start) * 1000:.1f}" if end > start else "-"
+        lines.append(f"{start * 1000:>10.1f}{took:>10}  {indent}{name}")
+        if end > start:
+            open_phases.append(end)
+    return "\n".join(lines)
+
+
+def report(file=None):
+    """Print the timeline (to stderr by default)"""
+    print("Startup timeline:", file=file or sys.stderr)
+    print(format_timeline(), file=file or sys.stderr)
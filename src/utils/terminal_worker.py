@@ -0,0 +1,402 @@
+"""
+Terminal worker process for ATL GUI.
+
+TerminalManager (terminal_module.py) starts run_terminal_worker() in a
+fresh process through the "forkserver" (or "spawn") start method. That
+process imports this module only, so it never loads GTK, GObject or the
+typelibs of the GUI, and it does not inherit GLib's threads the way a
+fork of the GUI process would.
+
+Only standard library modules and log_setup (also GTK free) may be
+imported here.
+"""
+import os
+import re
+import pty
+import logging
+import time
+import queue
+import fcntl
+import signal
+import struct
+import termios
+import selectors
+import subprocess
+
+from src.utils.log_setup import setup_logging
+
+logger = logging.getLogger(__name__)
+
+# Window size reported to commands run in a pseudo-terminal
+PTY_ROWS = 50
+PTY_COLUMNS = 200
+
+# Seconds to keep reading the output after the command exited
+DRAIN_TIMEOUT = 0.5
+
+# Bytes read from an output stream at a time
+READ_SIZE = 65536
+
+# CSI sequences (colors, cursor movement), OSC sequences (window titles)
+# and two-character escapes
+ANSI_ESCAPE_RE = re.compile(rb"\x1b(?:\[[0-?]*[ -/]*[@-~]|\][^\x07\x1b]*(?:\x07|\x1b\\)|[@-Z\\-_])")
+
+def open_pty(rows=PTY_ROWS, columns=PTY_COLUMNS):
+    """
+    Open a pseudo-terminal for the output of a command.
+    
+    The child sees a TTY and line-buffers its output, so every line reaches
+    us as soon as it is printed instead of when a pipe buffer fills up.
+    
+    Returns:
+        tuple: (master fd, slave fd)
+    """
+    master, slave = pty.openpty()
+    try:
+        fcntl.ioctl(slave, termios.TIOCSWINSZ, struct.pack("HHHH", rows, columns, 0, 0))
+        attributes = termios.tcgetattr(slave)
+        # Keep "\n" as is instead of translating it to "\r\n", and don't echo
+        attributes[1] &= ~termios.OPOST
+        attributes[3] &= ~termios.ECHO
+        termios.tcsetattr(slave, termios.TCSANOW, attributes)
+    except Exception:
+        os.close(master)
+        os.close(slave)
+        raise
+    return master, slave
+
+class TerminalWorker:
+    """
+    Runs terminal commands inside the terminal process.
+    This isolates the terminal functionality so if it crashes,
+    it won't affect the main application.
+    """
+    
+    def __init__(self, command_queue, output_queue, exit_event):
+        """
+        Initialize the terminal worker.
+        
+        Args:
+            command_queue: Queue for receiving commands from the main process
+            output_queue: Queue for sending output back to the main process
+            exit_event: Event to signal when the process should exit
+        """
+        self.command_queue = command_queue
+        self.output_queue = output_queue
+        self.exit_event = exit_event
+        self.current_process = None
+    
+    def run(self):
+        """Main process loop that waits for commands and processes them."""
+        logger.debug("Terminal worker started with PID: %s", os.getpid())
+        try:
+            while not self.exit_event.is_set():
+                try:
+                    # Check for new commands with a timeout to allow checking the exit event
+                    command = self.command_queue.get(timeout=0.1)
+                    logger.debug("Terminal process received command: %s", command['action'])
+                    
+                    if command["action"] == "execute":
+                        self._execute_command(
+                            command["command"],
+                            command["shell"],
+                            command["env_vars"],
+                            command.get("env"),
+                            command.get("pty", False),
+                            command.get("input")
+                        )
+                    elif command["action"] == "terminate":
+                        self._terminate_process()
+                    elif command["action"] == "ping":
+                        # Respond to ping to verify the process is still alive
+                        self.output_queue.put({"status": "alive", "message": "Terminal process is running"})
+                    elif command["action"] == "exit":
+                        # Exit the process
+                        logger.debug("Terminal process received exit command")
+                        self._terminate_process()
+                        break
+                        
+                except queue.Empty:
+                    # No commands in queue, continue waiting
+                    continue
+                except Exception as e:
+                    # Send error back to main process
+                    error_msg = f"Terminal process error: {str(e)}"
+                    logger.warning(error_msg)
+                    self.output_queue.put({"status": "error", "message": error_msg})
+                    
+            # Clean up before exiting
+            logger.debug("Terminal process exiting, cleaning up")
+            self._terminate_process()
+                    
+        except Exception as e:
+            # Log any unexpected errors
+            logger.error("Terminal process crashed with error: %s", e)
+            # Try to notify main process
+            try:
+                self.output_queue.put({"status": "crashed", "message": str(e)})
+            except:
+                pass
+    
+    def _execute_command(self, command, shell=True, env_vars=None, env=None, use_pty=False, input=None):
+        """
+        Execute a command and stream output back to the main process.
+        
+        Output is forwarded as raw bytes, in chunks that end on a line
+        break, and decoded by the receiver (see OutputDecoder). Invalid
+        bytes in the output therefore cannot break the stream.
+        
+        Args:
+            command: Command string, or argv list when shell is False
+            shell: Whether to use shell=True
+            env_vars: Environment variables to add to the current environment
+            env: Complete, already prepared environment (used as-is)
+            use_pty: Give the command pseudo-terminals instead of pipes
+            input: Text for the standard input of the command, which is
+                closed after it (None for no input)
+        """
+        # Terminate any existing process first
+        self._terminate_process()
+        
+        try:
+            # Use the prepared environment directly when the caller built one
+            if env is None:
+                env = os.environ.copy()
+                if env_vars:
+                    env.update(env_vars)
+            
+            logger.debug("Terminal executing command: %s", command)
+            
+            # Start the process; streams maps each output fd to its stream name
+            stdin = subprocess.DEVNULL if input is None else subprocess.PIPE
+            if use_pty:
+                streams = self._start_on_pty(command, shell, env, stdin)
+            else:
+                self.current_process = subprocess.Popen(
+                    command,
+                    shell=shell,
+                    stdin=stdin,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    env=env
+                )
+                streams = {
+                    self.current_process.stdout.fileno(): "stdout",
+                    self.current_process.stderr.fileno(): "stderr"
+                }
+            spawn_time = time.monotonic()
+            
+            if input is not None:
+                self._send_input(input)
+            
+            # Notify main process that command has started
+            self.output_queue.put({
+                "status": "started",
+                "message": f"Command started: {command}",
+                "timestamp": spawn_time
+            })
+            
+            try:
+                exit_time = self._stream_output(streams, use_pty)
+            finally:
+                if use_pty:
+                    for fd in streams:
+                        os.close(fd)
+                elif self.current_process:
+                    self.current_process.stdout.close()
+                    self.current_process.stderr.close()
+            if exit_time is None:
+                # Stopped by the exit event
+                return
+            
+            # Send exit code
+            exit_code = self.current_process.wait()
+            logger.debug("Command completed with exit code %s", exit_code)
+            self.output_queue.put({
+                "status": "completed",
+                "exit_code": exit_code,
+                "message": f"Command completed with exit code {exit_code}",
+                "timestamp": exit_time
+            })
+            
+            # Clear reference to completed process
+            self.current_process = None
+            
+        except Exception as e:
+            error_msg = f"Error executing command: {str(e)}"
+            logger.warning(error_msg)
+            self.output_queue.put({
+                "status": "error",
+                "message": error_msg
+            })
+    
+    def _send_input(self, text):
+        """Write text to the standard input of the current process and close it"""
+        try:
+            self.current_process.stdin.write(text.encode())
+            self.current_process.stdin.close()
+        except OSError as e:
+            logger.warning("Could not write to the command's input: %s", e)
+    
+    def _start_on_pty(self, command, shell, env, stdin=subprocess.DEVNULL):
+        """
+        Start a command with its stdout and stderr on two pseudo-terminals.
+        
+        One terminal per stream keeps the output tagged with its stream
+        while both are line-buffered by the child.
+        
+        Returns:
+            dict: master fd -> stream name
+        """
+        streams = {}
+        slaves = []
+        try:
+            for stream in ("stdout", "stderr"):
+                master, slave = open_pty()
+                streams[master] = stream
+                slaves.append(slave)
+            
+            env = dict(env)
+            env.setdefault("TERM", "dumb")
+            self.current_process = subprocess.Popen(
+                command,
+                shell=shell,
+                stdin=stdin,
+                stdout=slaves[0],
+                stderr=slaves[1],
+                env=env
+            )
+        except Exception:
+            for fd in streams:
+                os.close(fd)
+            raise
+        finally:
+            # The child has its own copies; ours would keep the terminals open
+            for slave in slaves:
+                os.close(slave)
+        return streams
+    
+    def _stream_output(self, streams, strip_escapes=False):
+        """
+        Forward the output of the current process until it exits.
+        
+        Args:
+            streams: Output fd -> stream name
+            strip_escapes: Remove terminal escape sequences (pseudo-terminal output)
+        
+        Returns:
+            float: Exit time of the process, or None if the exit event stopped it
+        """
+        selector = selectors.DefaultSelector()
+        for fd in streams:
+            selector.register(fd, selectors.EVENT_READ)
+        partial = {stream: b"" for stream in streams.values()}
+        exit_time = None
+        
+        def send(stream, data):
+            if strip_escapes:
+                data = ANSI_ESCAPE_RE.sub(b"", data).replace(b"\r\n", b"\n")
+            if data:
+                self.output_queue.put({
+                    "status": "output",
+                    "stream": stream,
+                    "data": data,
+                    "timestamp": time.monotonic()
+                })
+        
+        try:
+            while selector.get_map():
+                # Check if we should exit
+                if self.exit_event.is_set():
+                    self._terminate_process()
+                    return None
+                
+                for key, _ in selector.select(timeout=0.1):
+                    stream = streams[key.fd]
+                    try:
+                        data = os.read(key.fd, READ_SIZE)
+                    except OSError:
+                        # EIO: every writer of a pseudo-terminal has closed it
+                        data = b""
+                    if not data:
+                        selector.unregister(key.fd)
+                        continue
+                    
+                    # Forward complete lines; keep the rest for the next read
+                    # unless it grows too large
+                    data = partial[stream] + data
+                    cut = data.rfind(b"\n") + 1
+                    if cut == 0 and len(data) >= READ_SIZE:
+                        cut = len(data)
+                    partial[stream] = data[cut:]
+                    send(stream, data[:cut])
+                
+                # Background children may keep the streams open - read what
+                # is left for a moment, then stop
+                if exit_time is None and self.current_process.poll() is not None:
+                    exit_time = time.monotonic()
+                if exit_time is not None and time.monotonic() - exit_time > DRAIN_TIMEOUT:
+                    break
+            
+            for stream, data in partial.items():
+                send(stream, data)
+        finally:
+            selector.close()
+        
+        return exit_time if exit_time is not None else time.monotonic()
+    
+    def _terminate_process(self):
+        """Immediately terminate the current process if it exists."""
+        if self.current_process:
+            try:
+                process_pid = self.current_process.pid
+                logger.debug("Forcefully terminating process with PID: %s", process_pid)
+                
+                # Skip graceful termination and use SIGKILL immediately for instant termination
+                try:
+                    # Send SIGKILL for immediate termination
+                    os.kill(process_pid, signal.SIGKILL)
+                    logger.debug("SIGKILL sent to process %s", process_pid)
+                    
+                    # Brief wait to confirm termination
+                    try:
+                        self.current_process.wait(timeout=0.5)
+                    except subprocess.TimeoutExpired:
+                        logger.debug("Process %s still not terminated, trying alternative methods", process_pid)
+                        # Try additional termination techniques as fallback
+                        self.current_process.kill()
+                except Exception as e:
+                    logger.debug("Error during SIGKILL: %s, trying fallback kill", e)
+                    self.current_process.kill()
+                    
+                # Ensure stdout/stderr are closed to prevent hanging
+                try:
+                    if hasattr(self.current_process, 'stdout') and self.current_process.stdout:
+                        self.current_process.stdout.close()
+                    if hasattr(self.current_process, 'stderr') and self.current_process.stderr:
+                        self.current_process.stderr.close()
+                except Exception as e:
+                    logger.debug("Error closing streams: %s", e)
+                    
+                # Notify completion
+                self.output_queue.put({
+                    "status": "terminated",
+                    "message": f"Process {process_pid} forcefully terminated",
+                    "timestamp": time.monotonic()
+                })
+            except Exception as e:
+                error_msg = f"Error terminating process: {str(e)}"
+                logger.warning(error_msg)
+                self.output_queue.put({
+                    "status": "error",
+                    "message": error_msg
+                })
+            finally:
+                self.current_process = None
+
+
+def run_terminal_worker(command_queue, output_queue, exit_event):
+    """Entry point of the terminal process"""
+    # Same level as the GUI, which passes it through the environment
+    setup_logging()
+    TerminalWorker(command_queue, output_queue, exit_event).run()
@@ -0,0 +1,222 @@
+"""
+Test ordering for APK batches.
+
+The order of a batch decides how soon its interesting results show up.
+Each policy sorts the APKs using the history of earlier batches, read from
+the run journals (see run_journal.py):
+
+    listing         - keep the folder order
+    failing_first   - APKs that failed last time first
+    untested_first  - APKs never tested before first
+    shortest_first  - fastest APKs by historical duration first
+    smart           - failing, then untested, then shortest (the default)
+
+Policies are plain functions registered with @register_policy, so new ones
+can be added without touching the callers. pack_workers() splits a batch
+over parallel workers so that they all finish at about the same time.
+
+This module has no GTK dependency so it can be used from scripts.
+"""
+import os
+import heapq
+import logging
+
+from src.utils.run_journal import iter_events, list_runs
+
+logger = logging.getLogger(__name__)
+
+# Number of most recent journals read for the history
+HISTORY_RUNS = 20
+
+# Policy used when none is configured
+DEFAULT_POLICY = "smart"
+
+# Assumed test speed for APKs without any history, in seconds per MB
+SECONDS_PER_MB = 0.5
+
+# Duration assumed for an APK without history or size
+DEFAULT_DURATION = 15.0
+
+POLICIES = {}
+
+
+def register_policy(name):
+    """Decorator adding an ordering function to POLICIES"""
+    def decorator(func):
+        POLICIES[name] = func
+        return func
+    return decorator
+
+
+class ApkHistory:
+    """What earlier batches recorded about one APK"""
+
+    __slots__ = ("last_result", "durations", "runs", "flaky_runs")
+
+    def __init__(self):
+        self.last_result = None
+        self.durations = []
+        self.runs = 0
+        self.flaky_runs = 0
+
+    @property
+    def average_duration(self):
+        if not self.durations:
+            return None
+        return sum(self.durations) / len(self.durations)
+
+    @property
+    def flake_rate(self):
+        """Share of the runs where the attempts of the APK disagreed"""
+        return self.flaky_runs / self.runs if self.runs else 0.0
+
+
+def load_history(runs_dir=None, max_runs=HISTORY_RUNS, atl_fingerprint=None):
+    """
+    Collect per-APK results, durations and flakiness from the newest journals.
+
+    Args:
+        runs_dir: Directory of the journals (defaults to get_runs_dir())
+        max_runs: Number of most recent journals to read
+        atl_fingerprint: ATL build the batch will use (see atl_registry.py);
+            durations measured with this build replace those of other
+            builds for APKs that have both
+
+    Returns:
+        dict: APK path -> ApkHistory
+    """
+    history = {}
+    build_durations = {}
+    try:
+        runs = list_runs(runs_dir)[:max_runs]
+    except OSError:
+        return history
+
+    # Oldest first, so the last result written wins
+    for path in reversed(runs):
+        same_build = False
+        try:
+            for event in iter_events(path):
+                if event.get("event") == "batch":
+                    build = event.get("metadata", {}).get("atl_build") or {}
+                    same_build = atl_fingerprint is not None and build.get("fingerprint") == atl_fingerprint
+                    continue
+                if event.get("event") != "result":
+                    continue
+                entry = history.get(event["apk"])
+                if entry is None:
+                    entry = history[event["apk"]] = ApkHistory()
+                if event.get("result") in ("working", "not_working"):
+                    entry.last_result = event["result"]
+                if event.get("cached"):
+                    continue
+                entry.runs += 1
+                if event.get("flaky"):
+                    entry.flaky_runs += 1
+                if event.get("duration"):
+                    entry.durations.append(event["duration"])
+                    if same_build:
+                        build_durations.setdefault(event["apk"], []).append(event["duration"])
+        except OSError:
+            continue
+
+    for apk_path, durations in build_durations.items():
+        history[apk_path].durations = durations
+    return history
+
+
+def estimate_duration(apk_path, history):
+    """Expected test time of an APK: its average duration, else a guess from its size"""
+    entry = history.get(apk_path)
+    if entry and entry.average_duration is not None:
+        return entry.average_duration
+    try:
+        return max(1.0, os.path.getsize(apk_path) / (1024 * 1024) * SECONDS_PER_MB)
+    except OSError:
+        return DEFAULT_DURATION
+
+
+@register_policy("listing")
+def order_listing(apk_files, history):
+    return list(apk_files)
+
+
+@register_policy("failing_first")
+def order_failing_first(apk_files, history):
+    def failed(apk_path):
+        entry = history.get(apk_path)
+        return entry is not None and entry.last_result == "not_working"
+    return sorted(apk_files, key=lambda apk_path: not failed(apk_path))
+
+
+@register_policy("untested_first")
+def order_untested_first(apk_files, history):
+    return sorted(apk_files, key=lambda apk_path: apk_path in history)
+
+
+@register_policy("shortest_first")
+def order_shortest_first(apk_files, history):
+    return sorted(apk_files, key=lambda apk_path: estimate_duration(apk_path, history))
+
+
+@register_policy("smart")
+def order_smart(apk_files, history):
+    def rank(apk_path):
+        entry = history.get(apk_path)
+        if entry is None:
+            group = 1
+        elif entry.last_result == "not_working":
+            group = 0
+        else:
+            group = 2
+        return group, estimate_duration(apk_path, history)
+    return sorted(apk_files, key=rank)
+
+
+def order_apks(apk_files, policy=DEFAULT_POLICY, history=None):
+    """
+    Sort a batch with a registered policy.
+
+    Args:
+        apk_files: APK paths in folder order
+        policy: Name of the policy (unknown names keep the folder order)
+        history: Result of load_history() (loaded when None)
+
+    Returns:
+        list: APK paths in test order
+    """
+    order = POLICIES.get(policy)
+    if order is None:
+        logger.warning("Unknown test order %r, keeping folder order", policy)
+        return list(apk_files)
+    if history is None:
+        history = load_history()
+    # Python's sort is stable, so ties keep their folder order
+    return order(apk_files, history)
+
+
+def pack_workers(apk_files, workers, history=None):
+    """
+    Split a batch over parallel workers to minimise the total run time.
+
+    Longest APKs are placed first, each on the worker with the least work
+    so far (LPT scheduling). Within a worker the APKs keep the order they
+    had in apk_files, so an ordering policy still applies.
+
+    Returns:
+        list: One list of APK paths per worker
+    """
+    workers = max(1, workers)
+    if history is None:
+        history = load_history()
+
+    durations = {apk_path: estimate_duration(apk_path, history) for apk_path in apk_files}
+    lanes = [[] for _ in range(workers)]
+    heap = [(0.0, index) for index in range(workers)]
+    for apk_path in sorted(apk_files, key=lambda apk_path: -durations[apk_path]):
+        load, index = heapq.heappop(heap)
+        lanes[index].append(apk_path)
+        heapq.heappush(heap, (load + durations[apk_path], index))
+
+    position = {apk_path: index for index, apk_path in enumerate(apk_files)}
+    return [sorted(lane, key=position.__getitem__) for lane in lanes]
@@ -22,6 +22,21 @@ def create_results_view(window):
     
     results_box.append(title_box)
     
+    # Not working applications grouped by root cause (filled by show_test_results)
+    window.failure_clusters_group = Adw.PreferencesGroup()
+    window.failure_clusters_group.set_title("Failure Clusters")
+    window.failure_clusters_group.set_description("Not working applications grouped by the error they fail on")
+    window.failure_clusters_group.set_visible(False)
+    window.failure_cluster_rows = []
+    results_box.append(window.failure_clusters_group)
+    
+    # Differences from the previous batch (filled by show_test_results)
+    window.run_diff_group = Adw.PreferencesGroup()
+    window.run_diff_group.set_title("Changes Since Last Run")
+    window.run_diff_group.set_visible(False)
+    window.run_diff_rows = []
+    results_box.append(window.run_diff_group)
+    
     # Sonuç listesi için kaydırılabilir alan
     scrolled_window = Gtk.ScrolledWindow()
     scrolled_window.set_vexpand(True)
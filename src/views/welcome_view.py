@@ -1,9 +1,24 @@
 import gi
 import os
+import logging
 gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
 from gi.repository import Gtk, Adw, Pango, GLib, Gdk, Gio, GObject
-from src.utils.recent_apks import load_recent_apks
+from src.utils.recent_apks import search_recent_apks, page_cursor, RECENT_PAGE_SIZE
+
+logger = logging.getLogger(__name__)
+
+# Labels of the status drop down and the status they filter on
+RECENT_STATUS_FILTERS = [
+    ("All", None),
+    ("Working", "working"),
+    ("Not working", "not_working"),
+    ("Skipped", "skipped"),
+]
+
+# Searches up to this long match the start of APK names, through the name
+# index; longer ones match any part of the name or path
+RECENT_PREFIX_SEARCH_LENGTH = 2
 
 def create_welcome_view(window):
     # Main container (centers content based on window size)
@@ -39,14 +54,14 @@ def create_welcome_view(window):
             logo.set_from_file(window.logo_path)
             logo.set_pixel_size(128)
         except Exception as e:
-            print(f"Logo loading error: {e}")
+            logger.warning("Logo loading error: %s", e)
             # Use default icon in case of error
             logo = Gtk.Image()
             logo.set_from_icon_name("application-x-executable")
             logo.set_pixel_size(128)
     else:
         # Use default icon if file doesn't exist
-        print(f"Logo file not found: {window.logo_path}")
+        logger.warning("Logo file not found: %s", window.logo_path)
         logo = Gtk.Image()
         logo.set_from_icon_name("application-x-executable")
         logo.set_pixel_size(128)
@@ -225,6 +240,13 @@ def create_welcome_view(window):
     window.recent_search_entry = search_entry
     search_container.append(search_entry)
     
+    # Status filter
+    status_dropdown = Gtk.DropDown.new_from_strings([label for label, status in RECENT_STATUS_FILTERS])
+    status_dropdown.set_tooltip_text("Show only APKs with this result")
+    status_dropdown.connect("notify::selected", lambda dropdown, pspec: filter_recent_apks_by_status(window, dropdown.get_selected()))
+    window.recent_status_dropdown = status_dropdown
+    search_container.append(status_dropdown)
+    
     # Search button with keyboard shortcut (Ctrl+F)
     search_button = Gtk.Button()
     search_button.set_icon_name("system-search-symbolic")
@@ -249,29 +271,56 @@ def create_welcome_view(window):
     # Connect search button with search bar
     search_button.connect("clicked", lambda btn: toggle_search_focus(search_entry))
     
+    # Recent APKs model: holds the pages of the current search read so far;
+    # searching and filtering are done by the history database's indexes
+    window.recent_apks_store = Gio.ListStore(item_type=RecentApkItem)
+    window.recent_query = ""
+    window.recent_status = None
+    window.recent_cursor = None
+    window.recent_has_more = False
+    
+    # The list view is the scrolled window's child, so rows are created
+    # only for the visible items and reused while scrolling
+    factory = Gtk.SignalListItemFactory()
+    factory.connect("setup", on_recent_apk_row_setup, window)
+    factory.connect("bind", on_recent_apk_row_bind)
+    
+    recent_list_view = Gtk.ListView.new(Gtk.NoSelection.new(window.recent_apks_store), factory)
+    recent_list_view.set_margin_start(8)
+    recent_list_view.set_margin_end(8)
+    recent_list_view.set_margin_top(4)
+    recent_list_view.set_margin_bottom(4)
+    window.recent_apks_list = recent_list_view
+    
+    # Shown instead of the list when nothing matches
+    window.recent_empty_label = Gtk.Label(label="No recent applications")
+    window.recent_empty_label.set_halign(Gtk.Align.CENTER)
+    window.recent_empty_label.set_margin_top(24)
+    window.recent_empty_label.set_margin_bottom(24)
+    window.recent_empty_label.add_css_class("dim-label")
+    
     # Create scrollable area for recent APKs
     recent_scroll = Gtk.ScrolledWindow()
     recent_scroll.set_min_content_height(320)
     recent_scroll.set_max_content_height(400)
     recent_scroll.set_propagate_natural_height(True)
-    recent_scroll.set_vexpand(True)
-    recent_scroll.add_css_class("card")
+    recent_scroll.set_child(recent_list_view)
+    
+    # The stack switches between the list and the placeholder
+    recent_stack = Gtk.Stack()
+    recent_stack.set_vexpand(True)
+    recent_stack.add_css_class("card")
+    recent_stack.add_named(recent_scroll, "list")
+    recent_stack.add_named(window.recent_empty_label, "empty")
+    window.recent_stack = recent_stack
+    recent_card.add(recent_stack)
     
-    # Content box for recent APKs
-    apks_content_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=0)
-    apks_content_box.set_margin_start(8)
-    apks_content_box.set_margin_end(8)
-    apks_content_box.set_margin_top(4)
-    apks_content_box.set_margin_bottom(4)
+    # The next page is read when the list is scrolled to its end
+    recent_scroll.connect("edge-reached", lambda scroll, position: position == Gtk.PositionType.BOTTOM and load_recent_apks_page(window))
     
     # Load recent APKs
-    window.recent_apks_list = apks_content_box
-    window.all_recent_apks = []  # Store loaded APKs to allow filtering
     update_recent_apks_list(window)
     
-    recent_scroll.set_child(apks_content_box)
-    recent_card.add(recent_scroll)
-    
     # Setup drag and drop for the entire welcome view
     # Primary drop target for files
     drop_target = Gtk.DropTarget.new(Gio.File, Gdk.DragAction.COPY)
@@ -346,32 +395,60 @@ def on_key_pressed(controller, keyval, keycode, state, search_button, search_ent
     return False
 
 def update_recent_apks_list(window):
-    """Update the list of recent APKs in the welcome view."""
-    # Clear existing children
-    while window.recent_apks_list.get_first_child():
-        window.recent_apks_list.remove(window.recent_apks_list.get_first_child())
-        
-    # Load recent APKs
-    recent_apks = load_recent_apks()
-    window.all_recent_apks = recent_apks
-    
-    if not recent_apks:
-        # No recent APKs found
-        no_recent_label = Gtk.Label(label="No recent applications")
-        no_recent_label.set_halign(Gtk.Align.CENTER)
-        no_recent_label.set_margin_top(24)
-        no_recent_label.set_margin_bottom(24)
-        no_recent_label.add_css_class("dim-label")
-        window.recent_apks_list.append(no_recent_label)
+    """Reload the list of recent APKs in the welcome view from the history database."""
+    window.recent_apks_store.remove_all()
+    window.recent_cursor = None
+    window.recent_has_more = True
+    load_recent_apks_page(window)
+
+def load_recent_apks_page(window):
+    """Append the next page of the current search to the list"""
+    if not window.recent_has_more:
         return
     
-    # Add each recent APK
-    for apk_data in recent_apks:
-        apk_row = create_recent_apk_row(window, apk_data)
-        window.recent_apks_list.append(apk_row)
+    query = window.recent_query
+    page = search_recent_apks(
+        query, window.recent_status,
+        prefix=len(query) <= RECENT_PREFIX_SEARCH_LENGTH,
+        limit=RECENT_PAGE_SIZE, after=window.recent_cursor
+    )
+    window.recent_apks_store.splice(window.recent_apks_store.get_n_items(), 0, [RecentApkItem(apk_data) for apk_data in page])
+    if page:
+        window.recent_cursor = page_cursor(page[-1])
+    window.recent_has_more = len(page) == RECENT_PAGE_SIZE
+    update_recent_empty_state(window)
+
+def update_recent_empty_state(window):
+    """Show a placeholder when no recent APK matches the filters"""
+    empty = window.recent_apks_store.get_n_items() == 0
+    if empty:
+        if window.recent_query:
+            window.recent_empty_label.set_text(f"No APKs matching '{window.recent_query}'")
+        elif window.recent_status:
+            window.recent_empty_label.set_text("No APKs with this result")
+        else:
+            window.recent_empty_label.set_text("No recent applications")
+    window.recent_stack.set_visible_child_name("empty" if empty else "list")
+
+class RecentApkItem(GObject.Object):
+    """One history entry, as an item of the recent APKs list model"""
+    __gtype_name__ = "AtlRecentApkItem"
+
+    path = GObject.Property(type=str, default="")
+    name = GObject.Property(type=str, default="")
+    status = GObject.Property(type=str, default="unknown")
+    last_run = GObject.Property(type=str, default="")
 
-def create_recent_apk_row(window, apk_data):
-    """Create a row for a recent APK."""
+    def __init__(self, apk_data):
+        super().__init__()
+        self.apk_data = apk_data
+        self.path = apk_data.get('path', '')
+        self.name = apk_data.get('name', 'Unknown')
+        self.status = apk_data.get('status', 'unknown')
+        self.last_run = apk_data.get('last_run', '')
+
+def on_recent_apk_row_setup(factory, list_item, window):
+    """Create the widgets of a recent APK row; the item is filled in by on_recent_apk_row_bind"""
     # Create row
     row = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=8)
     row.set_margin_top(4)
@@ -380,22 +457,7 @@ def create_recent_apk_row(window, apk_data):
     row.set_margin_end(4)
     
     # Status icon
-    status = apk_data.get('status', 'unknown')
-    icon_name = "help-about-symbolic"  # Default for unknown
-    css_class = ""
-    
-    if status == "working":
-        icon_name = "emblem-ok-symbolic"
-        css_class = "success"
-    elif status == "not_working":
-        icon_name = "dialog-warning-symbolic"
-        css_class = "error"
-    elif status == "skipped":
-        icon_name = "action-unavailable-symbolic"
-    
-    status_icon = Gtk.Image.new_from_icon_name(icon_name)
-    if css_class:
-        status_icon.add_css_class(css_class)
+    status_icon = Gtk.Image()
     row.append(status_icon)
     
     # APK info
@@ -403,55 +465,83 @@ def create_recent_apk_row(window, apk_data):
     info_box.set_hexpand(True)
     
     # APK name
-    name_label = Gtk.Label(label=apk_data.get('name', 'Unknown'))
+    name_label = Gtk.Label()
     name_label.add_css_class("heading")
     name_label.set_halign(Gtk.Align.START)
     name_label.set_ellipsize(Pango.EllipsizeMode.MIDDLE)
     info_box.append(name_label)
     
     # APK path
-    path_label = Gtk.Label(label=apk_data.get('path', ''))
+    path_label = Gtk.Label()
     path_label.add_css_class("caption")
     path_label.set_halign(Gtk.Align.START)
     path_label.set_ellipsize(Pango.EllipsizeMode.MIDDLE)
     info_box.append(path_label)
     
     # Last run time
-    last_run = apk_data.get('last_run', '')
-    if last_run:
-        try:
-            # Format the timestamp in a simpler way to avoid errors
-            # Just extract date and time from ISO format
-            if "T" in last_run:
-                date_part, time_part = last_run.split("T", 1)
-                if "." in time_part:
-                    time_part = time_part.split(".", 1)[0]
-                formatted_date = f"{date_part} {time_part}"
-                time_label = Gtk.Label(label=f"Last run: {formatted_date}")
-                time_label.add_css_class("caption")
-                time_label.add_css_class("dim-label")
-                time_label.set_halign(Gtk.Align.START)
-                info_box.append(time_label)
-        except Exception as e:
-            print(f"Error formatting timestamp: {e}")
+    time_label = Gtk.Label()
+    time_label.add_css_class("caption")
+    time_label.add_css_class("dim-label")
+    time_label.set_halign(Gtk.Align.START)
+    info_box.append(time_label)
     
     row.append(info_box)
     
+    # Create a button to wrap the row and make it clickable
+    button_row = Gtk.Button()
+    button_row.set_child(row)
+    button_row.add_css_class("card")
+    button_row.set_margin_bottom(4)
+    button_row.connect("clicked", lambda btn: on_recent_apk_clicked(window, btn.apk_data))
+    
     # Run button
     run_button = Gtk.Button()
     run_button.set_icon_name("media-playback-start-symbolic")
     run_button.add_css_class("flat")
     run_button.add_css_class("circular")
-    run_button.connect("clicked", lambda btn: on_recent_apk_clicked(window, apk_data))
+    run_button.connect("clicked", lambda btn: on_recent_apk_clicked(window, button_row.apk_data))
     row.append(run_button)
     
-    # Create a button to wrap the row and make it clickable
-    button_row = Gtk.Button()
-    button_row.set_child(row)
-    button_row.add_css_class("card")
-    button_row.connect("clicked", lambda btn: on_recent_apk_clicked(window, apk_data))
+    button_row.status_icon = status_icon
+    button_row.name_label = name_label
+    button_row.path_label = path_label
+    button_row.time_label = time_label
+    button_row.apk_data = {}
+    list_item.set_child(button_row)
+    list_item.set_activatable(False)
+
+def on_recent_apk_row_bind(factory, list_item):
+    """Show a history entry in a recycled row"""
+    item = list_item.get_item()
+    button_row = list_item.get_child()
+    button_row.apk_data = item.apk_data
     
-    return button_row
+    # Status icon
+    icon_name = "help-about-symbolic"  # Default for unknown
+    css_class = ""
+    
+    if item.status == "working":
+        icon_name = "emblem-ok-symbolic"
+        css_class = "success"
+    elif item.status == "not_working":
+        icon_name = "dialog-warning-symbolic"
+        css_class = "error"
+    elif item.status == "skipped":
+        icon_name = "action-unavailable-symbolic"
+    
+    button_row.status_icon.set_from_icon_name(icon_name)
+    button_row.status_icon.set_css_classes([css_class] if css_class else [])
+    
+    button_row.name_label.set_text(item.name)
+    button_row.path_label.set_text(item.path)
+    
+    # Just extract date and time from ISO format
+    formatted_date = ""
+    if "T" in item.last_run:
+        date_part, time_part = item.last_run.split("T", 1)
+        formatted_date = f"{date_part} {time_part.split('.', 1)[0]}"
+    button_row.time_label.set_text(f"Last run: {formatted_date}")
+    button_row.time_label.set_visible(bool(formatted_date))
 
 def on_recent_apk_clicked(window, apk_data):
     """Handle click on a recent APK item."""
@@ -470,6 +560,7 @@ def on_recent_apk_clicked(window, apk_data):
     window.parse_env_variables()
     
     # Show test view, hide welcome view
+    window.ensure_testing_view()
     window.welcome_view.set_visible(False)
     window.testing_view.set_visible(True)
     
@@ -484,45 +575,13 @@ def on_recent_apk_clicked(window, apk_data):
 
 def filter_recent_apks(window, search_text):
     """Filter recent APKs based on search text."""
-    # Clear existing children
-    while window.recent_apks_list.get_first_child():
-        window.recent_apks_list.remove(window.recent_apks_list.get_first_child())
-    
-    if not window.all_recent_apks:
-        # No APKs to filter
-        no_recent_label = Gtk.Label(label="No recent applications")
-        no_recent_label.set_halign(Gtk.Align.CENTER)
-        no_recent_label.set_margin_top(24)
-        no_recent_label.set_margin_bottom(24)
-        no_recent_label.add_css_class("dim-label")
-        window.recent_apks_list.append(no_recent_label)
-        return
-    
-    # Filter APKs that match the search text
-    search_text = search_text.lower()
-    filtered_apks = []
-    
-    for apk_data in window.all_recent_apks:
-        apk_name = apk_data.get('name', '').lower()
-        apk_path = apk_data.get('path', '').lower()
-        
-        if search_text in apk_name or search_text in apk_path:
-            filtered_apks.append(apk_data)
-    
-    if not filtered_apks:
-        # No matches found
-        no_matches_label = Gtk.Label(label=f"No APKs matching '{search_text}'")
-        no_matches_label.set_halign(Gtk.Align.CENTER)
-        no_matches_label.set_margin_top(24)
-        no_matches_label.set_margin_bottom(24)
-        no_matches_label.add_css_class("dim-label")
-        window.recent_apks_list.append(no_matches_label)
-        return
-    
-    # Add each matching APK
-    for apk_data in filtered_apks:
-        apk_row = create_recent_apk_row(window, apk_data)
-        window.recent_apks_list.append(apk_row)
+    window.recent_query = search_text.strip()
+    update_recent_apks_list(window)
+
+def filter_recent_apks_by_status(window, index):
+    """Filter recent APKs by the status selected in the status drop down."""
+    window.recent_status = RECENT_STATUS_FILTERS[index][1]
+    update_recent_apks_list(window)
 
 def on_welcome_drag_enter(drop_target, x, y, window):
     """Hide buttons and show drop area when dragging begins"""
@@ -595,105 +654,103 @@ def on_drop(drop_target, value, x, y, window):
     
     # Process file or files
     try:
-        print(f"Drop value type: {type(value)}, value: {value}")
+        logger.debug("Drop value type: %s, value: %s", type(value), value)
         
         # Handle case where value might be a GList or other collection wrapper
         if hasattr(value, "get_data") and callable(value.get_data):
             try:
-                print("Trying to get data from GLib.List-like object")
+                logger.debug("Trying to get data from GLib.List-like object")
                 files_list = value.get_data()
-                print(f"Got files list: {files_list} (type: {type(files_list)})")
+                logger.debug("Got files list: %s (type: %s)", files_list, type(files_list))
                 if isinstance(files_list, (list, tuple)):
                     for file_item in files_list:
                         if isinstance(file_item, Gio.File):
                             file_path = file_item.get_path()
                             if file_path and os.path.isfile(file_path) and file_path.lower().endswith('.apk'):
                                 apk_files.append(file_path)
-                                print(f"Added APK from GList: {file_path}")
+                                logger.debug("Added APK from GList: %s", file_path)
             except Exception as e:
-                print(f"Error processing GList-like object: {e}")
+                logger.error("Error processing GList-like object: %s", e)
         
         # Handle standard GFile case
         elif isinstance(value, Gio.File):
             # Single file or directory drop
             file_path = value.get_path()
-            print(f"Got file path: {file_path}")
+            logger.debug("Got file path: %s", file_path)
             
             if file_path:
                 if os.path.isfile(file_path) and file_path.lower().endswith('.apk'):
                     # Single APK file
                     apk_files.append(file_path)
-                    print(f"Added single APK file: {file_path}")
+                    logger.debug("Added single APK file: %s", file_path)
                 elif os.path.isdir(file_path):
                     # Directory - collect all APKs inside
-                    print(f"Scanning directory: {file_path}")
+                    logger.debug("Scanning directory: %s", file_path)
                     for file in os.listdir(file_path):
                         full_path = os.path.join(file_path, file)
                         if os.path.isfile(full_path) and file.lower().endswith('.apk'):
                             apk_files.append(full_path)
-                            print(f"Added APK from directory: {full_path}")
+                            logger.debug("Added APK from directory: %s", full_path)
                 else:
-                    print(f"File is not an APK or directory: {file_path}")
+                    logger.debug("File is not an APK or directory: %s", file_path)
         
         # Handle array-like objects and iterables
         elif isinstance(value, (list, tuple)) or hasattr(value, '__iter__'):
             # Multiple files drop
-            print(f"Processing multiple items, count: {len(value) if hasattr(value, '__len__') else 'unknown'}")
+            logger.debug("Processing multiple items, count: %s", len(value) if hasattr(value, '__len__') else 'unknown')
             for item in value:
-                print(f"Processing item: {item} (type: {type(item)})")
+                logger.debug("Processing item: %s (type: %s)", item, type(item))
                 
                 if isinstance(item, Gio.File):
                     file_path = item.get_path()
-                    print(f"Processing file: {file_path}")
+                    logger.debug("Processing file: %s", file_path)
                     if file_path and os.path.isfile(file_path) and file_path.lower().endswith('.apk'):
                         apk_files.append(file_path)
-                        print(f"Added APK file from list: {file_path}")
+                        logger.debug("Added APK file from list: %s", file_path)
                 elif isinstance(item, str):
-                    print(f"Processing string path: {item}")
+                    logger.debug("Processing string path: %s", item)
                     if os.path.isfile(item) and item.lower().endswith('.apk'):
                         apk_files.append(item)
-                        print(f"Added APK file from string: {item}")
+                        logger.debug("Added APK file from string: %s", item)
                 elif hasattr(item, "get_uri") and callable(item.get_uri):
                     # Handle URI-based items
                     try:
                         uri = item.get_uri()
-                        print(f"Got URI: {uri}")
+                        logger.debug("Got URI: %s", uri)
                         if uri.startswith("file://"):
                             import urllib.parse
                             file_path = urllib.parse.unquote(uri[7:])
                             if os.path.isfile(file_path) and file_path.lower().endswith('.apk'):
                                 apk_files.append(file_path)
-                                print(f"Added APK from URI item: {file_path}")
+                                logger.debug("Added APK from URI item: %s", file_path)
                     except Exception as e:
-                        print(f"Error processing URI item: {e}")
+                        logger.error("Error processing URI item: %s", e)
                 else:
-                    print(f"Unknown item type in list: {type(item)}")
+                    logger.debug("Unknown item type in list: %s", type(item))
                     # Try converting to string as a last resort
                     try:
                         str_item = str(item)
                         if os.path.isfile(str_item) and str_item.lower().endswith('.apk'):
                             apk_files.append(str_item)
-                            print(f"Added APK from string conversion: {str_item}")
+                            logger.debug("Added APK from string conversion: %s", str_item)
                     except:
                         pass
         else:
-            print(f"Unhandled value type: {type(value)}")
+            logger.debug("Unhandled value type: %s", type(value))
             # Try string conversion as a last resort for unknown types
             try:
                 str_value = str(value)
                 if os.path.isfile(str_value) and str_value.lower().endswith('.apk'):
                     apk_files.append(str_value)
-                    print(f"Added APK from string conversion of unknown type: {str_value}")
+                    logger.debug("Added APK from string conversion of unknown type: %s", str_value)
             except:
-                print("Failed to convert unknown type to string")
+                logger.debug("Failed to convert unknown type to string")
     except Exception as e:
-        print(f"Error processing drop: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error processing drop: %s", e)
     
     # Process the collected APK files
     if apk_files:
-        print(f"Found {len(apk_files)} APK files: {apk_files}")
+        logger.debug("Found %s APK files: %s", len(apk_files), apk_files)
         window.apk_files = apk_files
         window.parse_env_variables()
         
@@ -702,7 +759,7 @@ def on_drop(drop_target, value, x, y, window):
         
         return True
     else:
-        print("No APK files found in the dropped items")
+        logger.debug("No APK files found in the dropped items")
         # Show error notification
         toast = Adw.Toast.new("No APK files found in the dropped items")
         window.toast_overlay.add_toast(toast)
@@ -717,6 +774,7 @@ def change_to_test_view(window, apk_files):
         window.set_fixed_size(1000, 700)
     
     # Show test view, hide welcome view
+    window.ensure_testing_view()
     window.welcome_view.set_visible(False)
     window.testing_view.set_visible(True)
     
@@ -735,9 +793,9 @@ def change_to_test_view(window, apk_files):
     window.command_value_label.set_text("-")
     
     # Print information about loaded APKs
-    print(f"\nLoaded {len(apk_files)} APK files:")
+    logger.debug("Loaded %s APK files:", len(apk_files))
     for i, apk in enumerate(apk_files):
-        print(f"{i+1}. {os.path.basename(apk)} - {apk}")
+        logger.debug("%s. %s - %s", i + 1, os.path.basename(apk), apk)
     
     # Start testing
     window.test_next_apk()
@@ -792,7 +850,7 @@ def on_drop_uri_list(drop_target, value, x, y, window):
     
     # Process URI list
     try:
-        print(f"URI drop value type: {type(value)}, value: {value}")
+        logger.debug("URI drop value type: %s, value: %s", type(value), value)
         
         # Handle both URI lists and strings
         uris = []
@@ -804,16 +862,16 @@ def on_drop_uri_list(drop_target, value, x, y, window):
                 uris = value.strip().split("\n")
             else:
                 uris = [value.strip()]
-            print(f"Parsed {len(uris)} URIs from string")
+            logger.debug("Parsed %s URIs from string", len(uris))
         elif isinstance(value, (list, tuple)):
             uris = value
-            print(f"Received {len(uris)} URIs as list/tuple")
+            logger.debug("Received %s URIs as list/tuple", len(uris))
         else:
-            print(f"Unexpected URI list type: {type(value)}")
+            logger.debug("Unexpected URI list type: %s", type(value))
             uris = [str(value)]
             
         for uri in uris:
-            print(f"Processing URI: {uri} (type: {type(uri)})")
+            logger.debug("Processing URI: %s (type: %s)", uri, type(uri))
             
             if isinstance(uri, str) and uri.strip():
                 # Convert URI to file path
@@ -824,39 +882,37 @@ def on_drop_uri_list(drop_target, value, x, y, window):
                     file_path = uri[7:]
                     import urllib.parse
                     file_path = urllib.parse.unquote(file_path)
-                    print(f"Converted URI to path: {file_path}")
+                    logger.debug("Converted URI to path: %s", file_path)
                 else:
                     file_path = uri
-                    print(f"Using direct path: {file_path}")
+                    logger.debug("Using direct path: %s", file_path)
                     
                 if file_path:
                     if os.path.isfile(file_path) and file_path.lower().endswith('.apk'):
                         apk_files.append(file_path)
-                        print(f"Added APK from URI: {file_path}")
+                        logger.debug("Added APK from URI: %s", file_path)
                     elif os.path.isdir(file_path):
                         # Directory - collect all APKs inside
-                        print(f"Scanning directory from URI: {file_path}")
+                        logger.debug("Scanning directory from URI: %s", file_path)
                         for file in os.listdir(file_path):
                             full_path = os.path.join(file_path, file)
                             if os.path.isfile(full_path) and file.lower().endswith('.apk'):
                                 apk_files.append(full_path)
-                                print(f"Added APK from URI directory: {full_path}")
+                                logger.debug("Added APK from URI directory: %s", full_path)
                     else:
-                        print(f"URI path is not an APK or directory: {file_path}")
+                        logger.debug("URI path is not an APK or directory: %s", file_path)
             elif isinstance(uri, Gio.File):
                 file_path = uri.get_path()
-                print(f"Processing Gio.File URI: {file_path}")
+                logger.debug("Processing Gio.File URI: %s", file_path)
                 if file_path and os.path.isfile(file_path) and file_path.lower().endswith('.apk'):
                     apk_files.append(file_path)
-                    print(f"Added APK from Gio.File URI: {file_path}")
+                    logger.debug("Added APK from Gio.File URI: %s", file_path)
     except Exception as e:
-        print(f"Error processing URI drop: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error processing URI drop: %s", e)
     
     # Process the collected APK files
     if apk_files:
-        print(f"Found {len(apk_files)} APK files from URIs: {apk_files}")
+        logger.debug("Found %s APK files from URIs: %s", len(apk_files), apk_files)
         window.apk_files = apk_files
         window.parse_env_variables()
         
@@ -865,7 +921,7 @@ def on_drop_uri_list(drop_target, value, x, y, window):
         
         return True
     else:
-        print("No APK files found in the dropped URI items")
+        logger.debug("No APK files found in the dropped URI items")
         # Show error notification
         toast = Adw.Toast.new("No APK files found in the dropped items")
         window.toast_overlay.add_toast(toast)
@@ -890,7 +946,7 @@ def on_drop_text(drop_target, value, x, y, window):
     
     # Process text that might contain file paths
     try:
-        print(f"Text drop value type: {type(value)}, value: {value}")
+        logger.debug("Text drop value type: %s, value: %s", type(value), value)
         
         if isinstance(value, str):
             # Split by common newline types
@@ -904,17 +960,17 @@ def on_drop_text(drop_target, value, x, y, window):
                 # Single line
                 lines = [value]
                 
-            print(f"Parsed {len(lines)} lines from text")
+            logger.debug("Parsed %s lines from text", len(lines))
             
             for line in lines:
                 line = line.strip()
-                print(f"Processing text line: '{line}'")
+                logger.debug("Processing text line: '%s'", line)
                 
                 if line:
                     # Try as direct file path
                     if os.path.isfile(line) and line.lower().endswith('.apk'):
                         apk_files.append(line)
-                        print(f"Added APK from text line as direct path: {line}")
+                        logger.debug("Added APK from text line as direct path: %s", line)
                     # Try as URI
                     elif line.startswith('file://'):
                         try:
@@ -922,25 +978,23 @@ def on_drop_text(drop_target, value, x, y, window):
                             file_path = urllib.parse.unquote(line[7:])
                             if os.path.isfile(file_path) and file_path.lower().endswith('.apk'):
                                 apk_files.append(file_path)
-                                print(f"Added APK from text line as URI: {file_path}")
+                                logger.debug("Added APK from text line as URI: %s", file_path)
                         except Exception as e:
-                            print(f"Error processing URI in text: {e}")
+                            logger.error("Error processing URI in text: %s", e)
                     # Try as directory
                     elif os.path.isdir(line):
-                        print(f"Scanning directory from text: {line}")
+                        logger.debug("Scanning directory from text: %s", line)
                         for file in os.listdir(line):
                             full_path = os.path.join(line, file)
                             if os.path.isfile(full_path) and file.lower().endswith('.apk'):
                                 apk_files.append(full_path)
-                                print(f"Added APK from text directory: {full_path}")
+                                logger.debug("Added APK from text directory: %s", full_path)
     except Exception as e:
-        print(f"Error processing text drop: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error processing text drop: %s", e)
     
     # Process the collected APK files
     if apk_files:
-        print(f"Found {len(apk_files)} APK files from text: {apk_files}")
+        logger.debug("Found %s APK files from text: %s", len(apk_files), apk_files)
         window.apk_files = apk_files
         window.parse_env_variables()
         
@@ -949,7 +1003,7 @@ def on_drop_text(drop_target, value, x, y, window):
         
         return True
     else:
-        print("No APK files found in the dropped text")
+        logger.debug("No APK files found in the dropped text")
         # Show error notification
         toast = Adw.Toast.new("No APK files found in the dropped text")
         window.toast_overlay.add_toast(toast)
@@ -974,17 +1028,17 @@ def on_drop_file_list(drop_target, value, x, y, window):
     
     # Process file list
     try:
-        print(f"File list drop value type: {type(value)}, value: {value}")
+        logger.debug("File list drop value type: %s, value: %s", type(value), value)
         
         if value is None:
-            print("Received None value in file list drop")
+            logger.debug("Received None value in file list drop")
             return False
             
         # Special handling for GLib.List (common in GTK4 drag and drop)
         if hasattr(value, "get_n_items") and callable(getattr(value, "get_n_items", None)):
             try:
                 n_items = value.get_n_items()
-                print(f"Processing GLib.List-like object with {n_items} items")
+                logger.debug("Processing GLib.List-like object with %s items", n_items)
                 
                 for i in range(n_items):
                     item = value.get_item(i)
@@ -992,142 +1046,136 @@ def on_drop_file_list(drop_target, value, x, y, window):
                         file_path = item.get_path()
                         if file_path and os.path.isfile(file_path) and file_path.lower().endswith('.apk'):
                             apk_files.append(file_path)
-                            print(f"Added APK from GLib.List: {file_path}")
+                            logger.debug("Added APK from GLib.List: %s", file_path)
             except Exception as e:
-                print(f"Error processing GLib.List: {e}")
-                import traceback
-                traceback.print_exc()
+                logger.exception("Error processing GLib.List: %s", e)
             
         # Handle case where value is a GdkFileList
         elif hasattr(value, "get_files") and callable(getattr(value, "get_files", None)):
             try:
                 files = value.get_files()
-                print(f"Got file list with {len(files)} items")
+                logger.debug("Got file list with %s items", len(files))
                 for item in files:
                     if isinstance(item, Gio.File):
                         file_path = item.get_path()
                         if file_path and os.path.isfile(file_path) and file_path.lower().endswith('.apk'):
                             apk_files.append(file_path)
-                            print(f"Added APK from file list get_files: {file_path}")
+                            logger.debug("Added APK from file list get_files: %s", file_path)
             except Exception as e:
-                print(f"Error processing file list get_files: {e}")
-                import traceback
-                traceback.print_exc()
+                logger.exception("Error processing file list get_files: %s", e)
                 
         # Standard list or tuple
         elif isinstance(value, list) or isinstance(value, tuple):
-            print(f"Processing list/tuple with {len(value)} items")
+            logger.debug("Processing list/tuple with %s items", len(value))
             for item in value:
-                print(f"Processing file list item: {item} (type: {type(item)})")
+                logger.debug("Processing file list item: %s (type: %s)", item, type(item))
                 
                 if isinstance(item, Gio.File):
                     file_path = item.get_path()
-                    print(f"Got file path from Gio.File: {file_path}")
+                    logger.debug("Got file path from Gio.File: %s", file_path)
                     
                     if file_path:
                         if os.path.isfile(file_path) and file_path.lower().endswith('.apk'):
                             apk_files.append(file_path)
-                            print(f"Added APK from file list Gio.File: {file_path}")
+                            logger.debug("Added APK from file list Gio.File: %s", file_path)
                         elif os.path.isdir(file_path):
-                            print(f"Scanning directory from file list: {file_path}")
+                            logger.debug("Scanning directory from file list: %s", file_path)
                             for file in os.listdir(file_path):
                                 full_path = os.path.join(file_path, file)
                                 if os.path.isfile(full_path) and file.lower().endswith('.apk'):
                                     apk_files.append(full_path)
-                                    print(f"Added APK from file list directory: {full_path}")
+                                    logger.debug("Added APK from file list directory: %s", full_path)
                 elif isinstance(item, str):
-                    print(f"Processing string path in file list: {item}")
+                    logger.debug("Processing string path in file list: %s", item)
                     if os.path.isfile(item) and item.lower().endswith('.apk'):
                         apk_files.append(item)
-                        print(f"Added APK from file list string: {item}")
+                        logger.debug("Added APK from file list string: %s", item)
                     elif os.path.isdir(item):
-                        print(f"Scanning directory from file list string: {item}")
+                        logger.debug("Scanning directory from file list string: %s", item)
                         for file in os.listdir(item):
                             full_path = os.path.join(item, file)
                             if os.path.isfile(full_path) and file.lower().endswith('.apk'):
                                 apk_files.append(full_path)
-                                print(f"Added APK from file list string directory: {full_path}")
+                                logger.debug("Added APK from file list string directory: %s", full_path)
                 else:
-                    print(f"Unhandled item type in file list: {type(item)}")
+                    logger.debug("Unhandled item type in file list: %s", type(item))
                     # Try to convert to string
                     try:
                         str_item = str(item)
                         if os.path.isfile(str_item) and str_item.lower().endswith('.apk'):
                             apk_files.append(str_item)
-                            print(f"Added APK from file list item conversion: {str_item}")
+                            logger.debug("Added APK from file list item conversion: %s", str_item)
                     except:
                         pass
         # Try to handle as a GObject
         elif hasattr(value, "get_item") and hasattr(value, "get_n_items"):
             # This might be a GListModel or similar
             count = value.get_n_items()
-            print(f"Processing as GListModel with {count} items")
+            logger.debug("Processing as GListModel with %s items", count)
             for i in range(count):
                 item = value.get_item(i)
                 if isinstance(item, Gio.File):
                     file_path = item.get_path()
                     if file_path and os.path.isfile(file_path) and file_path.lower().endswith('.apk'):
                         apk_files.append(file_path)
-                        print(f"Added APK from GListModel Gio.File: {file_path}")
+                        logger.debug("Added APK from GListModel Gio.File: %s", file_path)
         # Attempt to handle GFile array directly
         elif hasattr(value, "__len__") and hasattr(value, "__getitem__"):
             try:
                 array_len = len(value)
-                print(f"Trying to process as array-like with {array_len} items")
+                logger.debug("Trying to process as array-like with %s items", array_len)
                 for i in range(array_len):
                     item = value[i]
                     if isinstance(item, Gio.File):
                         file_path = item.get_path()
                         if file_path and os.path.isfile(file_path) and file_path.lower().endswith('.apk'):
                             apk_files.append(file_path)
-                            print(f"Added APK from array-like: {file_path}")
+                            logger.debug("Added APK from array-like: %s", file_path)
             except Exception as e:
-                print(f"Error processing as array-like: {e}")
+                logger.error("Error processing as array-like: %s", e)
         # Single file case        
         elif isinstance(value, Gio.File):
             file_path = value.get_path()
-            print(f"Processing single Gio.File: {file_path}")
+            logger.debug("Processing single Gio.File: %s", file_path)
             if file_path and os.path.isfile(file_path) and file_path.lower().endswith('.apk'):
                 apk_files.append(file_path)
-                print(f"Added APK from single file: {file_path}")
+                logger.debug("Added APK from single file: %s", file_path)
             elif file_path and os.path.isdir(file_path):
-                print(f"Scanning directory from single file: {file_path}")
+                logger.debug("Scanning directory from single file: %s", file_path)
                 for file in os.listdir(file_path):
                     full_path = os.path.join(file_path, file)
                     if os.path.isfile(full_path) and file.lower().endswith('.apk'):
                         apk_files.append(full_path)
-                        print(f"Added APK from single file directory: {full_path}")
+                        logger.debug("Added APK from single file directory: %s", full_path)
         # String path case
         elif isinstance(value, str):
-            print(f"Processing single string path: {value}")
+            logger.debug("Processing single string path: %s", value)
             if os.path.isfile(value) and value.lower().endswith('.apk'):
                 apk_files.append(value)
-                print(f"Added APK from single string: {value}")
+                logger.debug("Added APK from single string: %s", value)
             elif os.path.isdir(value):
-                print(f"Scanning directory from single string: {value}")
+                logger.debug("Scanning directory from single string: %s", value)
                 for file in os.listdir(value):
                     full_path = os.path.join(value, file)
                     if os.path.isfile(full_path) and file.lower().endswith('.apk'):
                         apk_files.append(full_path)
-                        print(f"Added APK from single string directory: {full_path}")
+                        logger.debug("Added APK from single string directory: %s", full_path)
         else:
-            print(f"Unhandled value type in file list: {type(value)}")
+            logger.debug("Unhandled value type in file list: %s", type(value))
             # Try to convert to string as last resort
             try:
                 str_value = str(value)
                 if os.path.isfile(str_value) and str_value.lower().endswith('.apk'):
                     apk_files.append(str_value)
-                    print(f"Added APK from file list value conversion: {str_value}")
+                    logger.debug("Added APK from file list value conversion: %s", str_value)
             except:
                 pass
     except Exception as e:
-        print(f"Error processing file list drop: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error processing file list drop: %s", e)
     
     # Process the collected APK files
     if apk_files:
-        print(f"Found {len(apk_files)} APK files from file list: {apk_files}")
+        logger.debug("Found %s APK files from file list: %s", len(apk_files), apk_files)
         window.apk_files = apk_files
         window.parse_env_variables()
         
@@ -1136,7 +1184,7 @@ def on_drop_file_list(drop_target, value, x, y, window):
         
         return True
     else:
-        print("No APK files found in the dropped file list")
+        logger.debug("No APK files found in the dropped file list")
         # Show error notification
         toast = Adw.Toast.new("No APK files found in the dropped files")
         window.toast_overlay.add_toast(toast)
@@ -1161,80 +1209,78 @@ def on_drop_wildcard(drop_target, value, x, y, window):
     
     # Try to process value based on its type
     try:
-        print(f"Wildcard drop value type: {type(value)}, value: {value}")
+        logger.debug("Wildcard drop value type: %s, value: %s", type(value), value)
         
         if value is None:
-            print("Received None value in wildcard drop")
+            logger.debug("Received None value in wildcard drop")
             return False
             
         if isinstance(value, Gio.File):
             # Single file
             file_path = value.get_path()
-            print(f"Processing Gio.File in wildcard: {file_path}")
+            logger.debug("Processing Gio.File in wildcard: %s", file_path)
             
             if file_path:
                 if os.path.isfile(file_path) and file_path.lower().endswith('.apk'):
                     apk_files.append(file_path)
-                    print(f"Added APK from wildcard file: {file_path}")
+                    logger.debug("Added APK from wildcard file: %s", file_path)
                 elif os.path.isdir(file_path):
                     # Directory - collect all APKs inside
-                    print(f"Scanning directory from wildcard: {file_path}")
+                    logger.debug("Scanning directory from wildcard: %s", file_path)
                     for file in os.listdir(file_path):
                         full_path = os.path.join(file_path, file)
                         if os.path.isfile(full_path) and file.lower().endswith('.apk'):
                             apk_files.append(full_path)
-                            print(f"Added APK from wildcard directory: {full_path}")
+                            logger.debug("Added APK from wildcard directory: %s", full_path)
         elif isinstance(value, str):
             # Check if it's a file path
-            print(f"Processing string in wildcard: {value}")
+            logger.debug("Processing string in wildcard: %s", value)
             if os.path.isfile(value) and value.lower().endswith('.apk'):
                 apk_files.append(value)
-                print(f"Added APK from wildcard string: {value}")
+                logger.debug("Added APK from wildcard string: %s", value)
             elif os.path.isdir(value):
-                print(f"Scanning directory from wildcard string: {value}")
+                logger.debug("Scanning directory from wildcard string: %s", value)
                 for file in os.listdir(value):
                     full_path = os.path.join(value, file)
                     if os.path.isfile(full_path) and file.lower().endswith('.apk'):
                         apk_files.append(full_path)
-                        print(f"Added APK from wildcard string directory: {full_path}")
+                        logger.debug("Added APK from wildcard string directory: %s", full_path)
         elif isinstance(value, (list, tuple)) or hasattr(value, '__iter__'):
             # Iterable - try to process each item
             try:
                 item_count = len(value) if hasattr(value, '__len__') else "unknown"
-                print(f"Processing iterable in wildcard with {item_count} items")
+                logger.debug("Processing iterable in wildcard with %s items", item_count)
                 
                 for item in value:
-                    print(f"Processing wildcard item: {item} (type: {type(item)})")
+                    logger.debug("Processing wildcard item: %s (type: %s)", item, type(item))
                     
                     if isinstance(item, Gio.File):
                         file_path = item.get_path()
                         if file_path and os.path.isfile(file_path) and file_path.lower().endswith('.apk'):
                             apk_files.append(file_path)
-                            print(f"Added APK from wildcard iterable Gio.File: {file_path}")
+                            logger.debug("Added APK from wildcard iterable Gio.File: %s", file_path)
                     elif isinstance(item, str):
                         if os.path.isfile(item) and item.lower().endswith('.apk'):
                             apk_files.append(item)
-                            print(f"Added APK from wildcard iterable string: {item}")
+                            logger.debug("Added APK from wildcard iterable string: %s", item)
             except Exception as e:
-                print(f"Error processing wildcard iterable: {e}")
+                logger.error("Error processing wildcard iterable: %s", e)
         else:
             # Try to convert to string as last resort
             try:
                 str_value = str(value)
-                print(f"Trying string conversion of unknown type: {str_value}")
+                logger.debug("Trying string conversion of unknown type: %s", str_value)
                 if os.path.isfile(str_value) and str_value.lower().endswith('.apk'):
                     apk_files.append(str_value)
-                    print(f"Added APK from wildcard string conversion: {str_value}")
+                    logger.debug("Added APK from wildcard string conversion: %s", str_value)
             except:
-                print(f"Failed string conversion for type: {type(value)}")
+                logger.debug("Failed string conversion for type: %s", type(value))
     except Exception as e:
-        print(f"Error processing wildcard drop: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error processing wildcard drop: %s", e)
     
     # Process the collected APK files
     if apk_files:
-        print(f"Found {len(apk_files)} APK files from wildcard: {apk_files}")
+        logger.debug("Found %s APK files from wildcard: %s", len(apk_files), apk_files)
         window.apk_files = apk_files
         window.parse_env_variables()
         
@@ -1243,7 +1289,7 @@ def on_drop_wildcard(drop_target, value, x, y, window):
         
         return True
     else:
-        print("No APK files found in the dropped wildcard items")
+        logger.debug("No APK files found in the dropped wildcard items")
         # Show error notification
         toast = Adw.Toast.new("No APK files found in the dropped items")
         window.toast_overlay.add_toast(toast)
@@ -17,6 +17,9 @@ from src.utils.css_provider import setup_css
 from src.utils.display_backend import get_current_backend
 from src.utils.initial_setup import check_first_run
 from src.utils.terminal_module import TerminalManager
+from src.utils.recent_apks import flush_recent_apks
+from src.utils.config_service import flush_config
+from src.utils import startup_profiler
 
 class AtlGUIWindow(Adw.ApplicationWindow):
     def __init__(self, **kwargs):
@@ -26,15 +29,11 @@ class AtlGUIWindow(Adw.ApplicationWindow):
         self.backend_type = get_current_backend()
         print(f"Window created with {self.backend_type} backend")
 
-        # Initialize terminal manager
+        # Initialize terminal manager; the process is started once the
+        # window is up so that it does not delay the first frame
         self.terminal_manager = TerminalManager()
         print("[DEBUG] Terminal manager initialized in window")
-        
-        # Start the terminal process to ensure it's ready when needed
-        if self.terminal_manager.start():
-            print("[DEBUG] Terminal process started successfully from window init")
-        else:
-            print("[DEBUG] Failed to start terminal process from window init")
+        GLib.idle_add(self.start_terminal_process)
         
         # Connect close request to clean up resources
         self.connect("close-request", self.on_window_close)
@@ -49,7 +48,8 @@ class AtlGUIWindow(Adw.ApplicationWindow):
         self.set_icon_from_file()
         
         # CSS Sağlayıcı ayarla - kenarları kaldırmak için
-        setup_css(self)
+        with startup_profiler.phase("css"):
+            setup_css(self)
 
         # Create toast overlay for notifications
         self.toast_overlay = Adw.ToastOverlay()
@@ -101,18 +101,16 @@ class AtlGUIWindow(Adw.ApplicationWindow):
         self.main_content.set_child(content_box)
 
         # Welcome view - shown initially
-        self.welcome_view = create_welcome_view(self)
+        with startup_profiler.phase("welcome view"):
+            self.welcome_view = create_welcome_view(self)
         content_box.append(self.welcome_view)
 
-        # Testing view - shown after selecting a folder
-        self.testing_view = create_testing_view(self)
-        self.testing_view.set_visible(False)
-        content_box.append(self.testing_view)
-
-        # Results view - shown after tests are completed
-        self.results_view = create_results_view(self)
-        self.results_view.set_visible(False)
-        content_box.append(self.results_view)
+        # The testing view (shown after selecting a folder) and the results
+        # view (shown after tests are completed) are added here on first use,
+        # by ensure_testing_view() and ensure_results_view()
+        self.view_box = content_box
+        self.testing_view = None
+        self.results_view = None
 
         # Test control area
         test_control_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=8)
@@ -128,6 +126,7 @@ class AtlGUIWindow(Adw.ApplicationWindow):
         self.env_variables = {}  # Environment variables
         self.current_apk_ready = False  # Test start status
         self.terminal_logs = {}  # APK path: Terminal output - To prevent error
+        self.launch_timings = {}  # APK path: LaunchTimeline of the last run
         self.script_path = ""  # Path to no-internet script
         self.sudo_password = ""  # Sudo password if needed
         self.window_width = None  # Custom window width
@@ -173,7 +172,7 @@ class AtlGUIWindow(Adw.ApplicationWindow):
                 print("[WARNING] ATL executable path is empty in config")
             
             # Set environment variables
-            env_vars = self.config.get("environment_variables", {})
+            env_vars = self.config.get_dict("environment_variables")
             self.env_variables.update(env_vars)
             
             # Update environment variables text field if it exists
@@ -181,18 +180,28 @@ class AtlGUIWindow(Adw.ApplicationWindow):
                 env_text = "\n".join([f"{key}={value}" for key, value in env_vars.items()])
                 if env_text:
                     self.env_text_view.get_buffer().set_text(env_text)
+        
+        # Pick up edits made to config.json while the GUI runs
+        self.config.connect_changed(self.on_config_changed)
+        self.config.watch()
+        
+        # Offer to continue a batch that was interrupted by a crash or reboot
+        GLib.idle_add(self.offer_resume_run)
 
     # Import all methods from the handlers
     from src.handlers.file_handlers import (
         on_file_clicked, on_file_selected, on_folder_clicked, on_folder_selected,
-        parse_env_variables, show_error_dialog, find_apk_files
+        parse_env_variables, show_error_dialog, find_apk_files, open_apk_paths,
+        watch_folder
     )
     
     from src.handlers.test_handlers import (
         test_next_apk, on_skip_clicked, on_finish_all_clicked, on_output,
         auto_mark_as_working, auto_mark_as_not_working, kill_current_process,
         on_working_clicked, on_not_working_clicked, on_start_test_clicked,
-        start_test, show_test_buttons
+        start_test, show_test_buttons, track_launch_signals,
+        schedule_test_prompt, record_test_result, start_run_journal,
+        finish_run_journal, offer_resume_run, resume_run
     )
     
     from src.handlers.terminal_handlers import (
@@ -211,6 +220,35 @@ class AtlGUIWindow(Adw.ApplicationWindow):
         show_full_apk_logs
     )
 
+    def ensure_testing_view(self):
+        """Build the testing view, hidden below the welcome view, if it isn't yet"""
+        if self.testing_view is None:
+            with startup_profiler.phase("testing view"):
+                view = create_testing_view(self)
+            view.set_visible(False)
+            self.view_box.insert_child_after(view, self.welcome_view)
+            self.testing_view = view
+        return self.testing_view
+
+    def ensure_results_view(self):
+        """Build the results view, hidden below the testing view, if it isn't yet"""
+        if self.results_view is None:
+            with startup_profiler.phase("results view"):
+                view = create_results_view(self)
+            view.set_visible(False)
+            self.view_box.insert_child_after(view, self.testing_view or self.welcome_view)
+            self.results_view = view
+        return self.results_view
+
+    def start_terminal_process(self):
+        """Start the terminal process (run from the main loop after startup)"""
+        with startup_profiler.phase("terminal process"):
+            if self.terminal_manager.start():
+                print("[DEBUG] Terminal process started successfully from window init")
+            else:
+                print("[DEBUG] Failed to start terminal process from window init")
+        return False
+
     def set_icon_from_file(self):
         """Set the application icon from the logo file"""
         try:
@@ -446,28 +484,9 @@ class AtlGUIWindow(Adw.ApplicationWindow):
         # Reset settings dialog active flag
         self.mark_settings_dialog_active(False)
         
-        # Reload config
-        from src.utils.initial_setup import check_first_run
-        self.config = check_first_run(self, show_dialog=False)
-        
-        # Explicitly reload the ATL executable path from config
-        try:
-            import os
-            import json
-            from pathlib import Path
-            
-            config_dir = os.path.join(str(Path.home()), ".config", "atl-gui")
-            config_file = os.path.join(config_dir, "config.json")
-            
-            if os.path.exists(config_file):
-                with open(config_file, 'r') as f:
-                    fresh_config = json.load(f)
-                    # Set ATL executable path directly from fresh config
-                    if 'atl_executable_path' in fresh_config:
-                        self.atl_executable_path = fresh_config['atl_executable_path']
-                        print(f"[DEBUG] EXPLICITLY reloaded ATL path: '{self.atl_executable_path}'")
-        except Exception as e:
-            print(f"[ERROR] Failed to reload ATL path: {e}")
+        # The setup dialog changed the shared configuration
+        self.atl_executable_path = self.config.get_str("atl_executable_path")
+        print(f"[DEBUG] Reloaded ATL path: '{self.atl_executable_path}'")
         
         # Show a confirmation toast
         toast = Adw.Toast.new("Settings updated")
@@ -476,6 +495,17 @@ class AtlGUIWindow(Adw.ApplicationWindow):
         
         return False
 
+    def on_config_changed(self, config, keys):
+        """Apply settings changed in config.json by another program"""
+        if "atl_executable_path" in keys:
+            self.atl_executable_path = config.get_str("atl_executable_path")
+        if "environment_variables" in keys:
+            self.env_variables.update(config.get_dict("environment_variables"))
+        
+        toast = Adw.Toast.new("Settings reloaded from config.json")
+        toast.set_timeout(3)
+        self.toast_overlay.add_toast(toast)
+
     def on_apk_selected(self, apk_path):
         """Handle APK selection"""
         if not apk_path:
@@ -567,7 +597,22 @@ class AtlGUIWindow(Adw.ApplicationWindow):
             
         # Kill any running process
         self.kill_current_process()
+
+        # Stop watching hot folders
+        for watcher in getattr(self, 'folder_watchers', {}).values():
+            watcher.stop()
+
+        # Close the batch journal without finishing it, so the batch can be resumed
+        self.finish_run_journal(completed=False)
+
+        # Write recent APK entries still waiting in the write-behind queue
+        if not flush_recent_apks(timeout=5):
+            print("[WARNING] Recent APK history could not be written in time")
         
+        # Write settings changed within the last moment
+        self.config.disconnect_changed(self.on_config_changed)
+        flush_config()
+
         # Let the window close normally
         return False
 